@@ -0,0 +1,5 @@
+"""Automated air traffic control simulator."""
+# stdlib
+import time
+
+IMPORT_TIME = time.perf_counter()  # when the package was first imported
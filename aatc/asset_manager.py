@@ -0,0 +1,136 @@
+"""Module for loading and caching game assets."""
+# stdlib
+import logging
+from pathlib import Path
+
+# external
+import pygame
+
+LOG = logging.getLogger(__name__)
+
+ASSETS_PATH = Path(__file__).parent / "assets"  # independent of the working directory
+
+
+class AssetManager:
+    """Loads every audio and image asset once, on first use, and caches it. Sounds are
+        played on a bounded pool of mixer channels, and repeated requests for the same
+        sound within a frame are coalesced into one.
+
+    The mixer is only initialized when the first sound is played, so that runs which
+    never play a sound never pay for it. Without a working mixer, sound playback is a
+    no-op. Call `load` to initialize the mixer and load every asset up front instead.
+
+    Args:
+        audio_path (pathlib.Path): Directory of `.wav` audio assets.
+        images_path (pathlib.Path): Directory of `.png` image assets.
+        volume (float, optional): Playback volume, from 0 to 1. Defaults to 0.1.
+        channels (int, optional): Number of mixer channels to play sounds on. Sounds
+            requested while every channel is busy are dropped. Defaults to 8.
+        audio (bool, optional): Whether to enable audio. Defaults to True.
+    """
+
+    def __init__(self, audio_path, images_path, volume=0.1, channels=8, audio=True):
+        self.audio_path = Path(audio_path)
+        self.images_path = Path(images_path)
+        self.volume = volume
+        self.channels = channels
+
+        self.sounds = {}  # file name: pygame.mixer.Sound
+        self.images = {}  # file name: pygame.Surface
+        self.sounds_dropped = 0
+
+        self._sounds_played = set()  # file names played this frame
+
+        self.audio = audio  # enabled, and once tried, whether the mixer is available
+        self._mixer_tried = False
+
+    def _init_mixer(self):
+        """Initializes the mixer if needed, the first time audio is used.
+
+        Returns:
+            bool: Whether the mixer is available.
+        """
+        if not self.audio or self._mixer_tried:
+            return self.audio
+        self._mixer_tried = True
+
+        if pygame.mixer.get_init() is None:
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                LOG.warning(f"Audio disabled, mixer unavailable: {e}")
+                self.audio = False
+                return False
+        pygame.mixer.set_num_channels(self.channels)
+
+        return True
+
+    def load(self):
+        """Initializes the mixer and loads all assets into the cache."""
+        if self._init_mixer():
+            for path in sorted(self.audio_path.glob("*.wav")):
+                self.get_sound(path.name)
+
+        for path in sorted(self.images_path.glob("*.png")):
+            self.get_image(path.name)
+
+        LOG.debug(f"Loaded {len(self.sounds)} sounds and {len(self.images)} images")
+
+    def get_image(self, name):
+        """Retrieves an image, loading it into the cache on first use.
+
+        Args:
+            name (pathlib.Path or str): File name of the image.
+
+        Returns:
+            pygame.Surface: The image.
+        """
+        name = str(name)
+        image = self.images.get(name)
+        if image is None:
+            image = self.images[name] = pygame.image.load(str(self.images_path / name))
+
+        return image
+
+    def get_sound(self, name):
+        """Retrieves a sound, loading it into the cache on first use. The mixer must be
+            initialized.
+
+        Args:
+            name (pathlib.Path or str): File name of the sound.
+
+        Returns:
+            pygame.mixer.Sound: The sound.
+        """
+        name = str(name)
+        sound = self.sounds.get(name)
+        if sound is None:
+            sound = self.sounds[name] = pygame.mixer.Sound(str(self.audio_path / name))
+            sound.set_volume(self.volume)
+
+        return sound
+
+    def play(self, name):
+        """Plays a cached sound on a free channel of the pool.
+
+        Args:
+            name (pathlib.Path or str): File name of the sound.
+        """
+        if not self._init_mixer():
+            return
+
+        name = str(name)
+        if name in self._sounds_played:  # coalesce with the same sound this frame
+            return
+
+        channel = pygame.mixer.find_channel()
+        if channel is None:
+            self.sounds_dropped += 1
+            return
+
+        channel.play(self.get_sound(name))
+        self._sounds_played.add(name)
+
+    def end_frame(self):
+        """Marks the end of a frame, allowing already played sounds to play again."""
+        self._sounds_played.clear()
@@ -0,0 +1,288 @@
+"""Benchmarks of the simulation, controller and rendering hot paths."""
+# stdlib
+import argparse
+import json
+import logging
+import math
+import platform
+import sys
+import timeit
+from pathlib import Path
+
+# external
+import numpy as np
+import pygame
+from pygame.math import Vector2
+
+# project
+from aatc import game
+
+LOG = logging.getLogger(__name__)
+
+SIZES = (10, 100, 1000, 10000)
+
+
+def setup_engine(size, seed=0):
+    """Builds a headless game engine with planes spread over the ATC zone, connected to
+        the controller and transmitting telemetry.
+
+    Args:
+        size (int): Number of planes.
+        seed (int, optional): Seed for the random number generator. Defaults to 0.
+
+    Returns:
+        aatc.game.GameEngine: The game engine.
+    """
+    GE = game.GameEngine(screen_size=(500, 500), headless=True, fleet=True, seed=seed)
+    GE.spawn_planes = False
+    angles = GE.RNG.uniform(0, 2 * math.pi, size=size)
+    radii = GE.atc_zone.radius * np.sqrt(GE.RNG.random(size=size))
+    for angle, radius in zip(angles, radii):
+        GE.spawn_plane(
+            spawn_position=Vector2(math.cos(angle), math.sin(angle)) * radius,
+            spawn_heading=GE.RNG.uniform(0, 360),
+        )
+    for _ in range(2):  # connect the planes, then deliver their first telemetry
+        GE.step()
+
+    return GE
+
+
+def _engine_update(GE):
+    def run():
+        GE.update()
+        pygame.event.clear()  # drop the telemetry posted to the controller
+
+    return run
+
+
+def _engine_draw(GE):
+    return GE.draw
+
+
+def _plane_update(GE):
+    state = {"time": GE.time}
+
+    def run():
+        state["time"] += 1000  # msec, every plane is due to transmit
+        for plane in GE.planes:
+            plane.update(state["time"])
+        pygame.event.clear()
+
+    return run
+
+
+def _plane_transmit_telemetry(GE):
+    def run():
+        for plane in GE.planes:
+            plane.transmit_telemetry(GE.time)
+        pygame.event.clear()
+
+    return run
+
+
+def _aatc_update_telemetry(GE):
+    telemetries = [
+        (
+            plane.id,
+            {
+                "time": GE.time,
+                "position": plane.position,
+                "velocity": plane.get_velocity(),
+                "status": plane.status,
+            },
+        )
+        for plane in GE.planes
+    ]
+
+    def run():
+        for plane_id, telemetry in telemetries:
+            GE.atc.update_telemetry(plane_id, telemetry)
+
+    return run
+
+
+def _aatc_get_nearest_open_runway_to_plane(GE):
+    plane_ids = [plane.id for plane in GE.planes]
+
+    def run():
+        for plane_id in plane_ids:
+            GE.atc.get_nearest_open_runway_to_plane(plane_id)
+
+    return run
+
+
+# name: builds the benchmarked operation over the whole fleet of a fresh game engine,
+# and the number of calls per measure, or None to pick it automatically
+BENCHMARKS = {
+    "GameEngine.update": (_engine_update, 20),  # few calls, before planes land
+    "GameEngine.draw": (_engine_draw, None),
+    "Plane.update": (_plane_update, None),
+    "Plane.transmit_telemetry": (_plane_transmit_telemetry, None),
+    "AATC.update_telemetry": (_aatc_update_telemetry, None),
+    "AATC.get_nearest_open_runway_to_plane": (
+        _aatc_get_nearest_open_runway_to_plane,
+        None,
+    ),
+}
+
+
+def time_function(function, repeat=3, number=None):
+    """Times a function.
+
+    Args:
+        function (callable): Function to time.
+        repeat (int, optional): Number of repeats, of which the fastest is kept.
+            Defaults to 3.
+        number (int, optional): Number of calls per repeat. Defaults to enough calls
+            for a stable measure.
+
+    Returns:
+        float: Time per call in sec.
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_benchmarks(sizes=SIZES, names=None, repeat=3):
+    """Times each benchmarked operation at each fleet size.
+
+    Args:
+        sizes (list(int), optional): Fleet sizes. Defaults to `SIZES`.
+        names (list(str), optional): Benchmarks to run. Defaults to all of
+            `BENCHMARKS`.
+        repeat (int, optional): Number of repeats per measure. Defaults to 3.
+
+    Returns:
+        dict: Environment info under "meta", and the time per call in sec of each
+            benchmark at each fleet size under "results", as {name: {size: time}}.
+    """
+    names = list(BENCHMARKS) if names is None else names
+    results = {name: {} for name in names}
+    for size in sizes:
+        for name in names:
+            build, number = BENCHMARKS[name]
+            with setup_engine(size) as GE:
+                seconds = time_function(build(GE), repeat=repeat, number=number)
+            results[name][str(size)] = seconds
+            LOG.info(f"{name} with {size} planes: {seconds * 1000:.3f}ms")
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(benchmarks, baseline, threshold=0.2):
+    """Compares benchmark results against a baseline.
+
+    Args:
+        benchmarks (dict): Results of `run_benchmarks`.
+        baseline (dict): Baseline results of `run_benchmarks`.
+        threshold (float, optional): Relative slowdown beyond which a benchmark is a
+            regression. Defaults to 0.2.
+
+    Returns:
+        list(dict): Comparison of each benchmark and size present in both, with the
+            baseline and current time per call, their ratio, and whether it regressed.
+    """
+    comparisons = []
+    for name, times in benchmarks["results"].items():
+        times_baseline = baseline["results"].get(name, {})
+        for size, seconds in times.items():
+            if size not in times_baseline:
+                continue
+            ratio = seconds / times_baseline[size]
+            comparisons.append(
+                {
+                    "name": name,
+                    "size": int(size),
+                    "baseline": times_baseline[size],
+                    "current": seconds,
+                    "ratio": ratio,
+                    "regression": ratio > 1 + threshold,
+                }
+            )
+
+    return comparisons
+
+
+def main(args=None):
+    """Run the benchmarks from the command line.
+
+    Returns:
+        int: Exit status, 1 if any benchmark regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the simulation, controller and rendering hot paths."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(SIZES), help="fleet sizes"
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=None,
+        help="benchmarks to run (default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per measure")
+    parser.add_argument("--save", type=Path, default=None, help="file to save to")
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="baseline file to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown flagged as a regression",
+    )
+    args = parser.parse_args(args)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.getLogger("aatc").setLevel(logging.ERROR)  # silence the simulations
+    LOG.setLevel(logging.INFO)
+
+    benchmarks = run_benchmarks(
+        sizes=args.sizes, names=args.benchmarks, repeat=args.repeat
+    )
+
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w") as file:
+            json.dump(benchmarks, file, indent=2)
+        LOG.info(f"Saved benchmarks to {args.save}")
+
+    if args.compare is None:
+        return 0
+
+    with open(args.compare) as file:
+        baseline = json.load(file)
+    comparisons = compare(benchmarks, baseline, threshold=args.threshold)
+    for comparison in comparisons:
+        LOG.log(
+            logging.WARNING if comparison["regression"] else logging.INFO,
+            f"{comparison['name']} with {comparison['size']} planes: "
+            f"{comparison['baseline'] * 1000:.3f}ms -> "
+            f"{comparison['current'] * 1000:.3f}ms ({comparison['ratio']:.2f}x)"
+            + (" REGRESSION" if comparison["regression"] else ""),
+        )
+    regressions = sum(comparison["regression"] for comparison in comparisons)
+    LOG.info(f"{regressions} regressions beyond {args.threshold:.0%}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Monte Carlo runway capacity study, running many headless simulations in parallel."""
+# stdlib
+import argparse
+import itertools
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# external
+import numpy as np
+
+# project
+from aatc import game
+
+LOG = logging.getLogger(__name__)
+
+SWEEP_PARAMETERS = (
+    "spawn_planes_interval_avg",
+    "spawn_planes_interval_min",
+    "spawn_planes_interval_max",
+)
+
+
+def get_mean_p95(samples):
+    """Calculates the mean and 95th percentile of some samples.
+
+    Args:
+        samples (list(float)): The samples.
+
+    Returns:
+        tuple(float, float): Mean and 95th percentile, or None for both if there are
+            no samples.
+    """
+    if not samples:
+        return None, None
+
+    return float(np.mean(samples)), float(np.percentile(samples, 95))
+
+
+def count_waiting(GE):
+    """Counts the planes waiting to land: those without a flight plan yet, and those
+        holding.
+
+    Args:
+        GE (aatc.game.GameEngine): The game engine.
+
+    Returns:
+        int: Number of planes waiting.
+    """
+    return sum(plane.status in ("CRUISING", "HOLDING") for plane in GE.planes)
+
+
+def run_trial(trial):
+    """Runs one headless simulation and measures its traffic statistics.
+
+    Args:
+        trial (dict): Trial configuration, with the simulated `duration` in sec, the
+            random number generator `seed`, and a value for each of
+            `SWEEP_PARAMETERS`.
+
+    Returns:
+        dict: The trial configuration, updated with the statistics of the run.
+    """
+    with game.GameEngine(
+        screen_size=(100, 100), headless=True, fleet=True, seed=trial["seed"]
+    ) as GE:
+        for name in SWEEP_PARAMETERS:
+            setattr(GE, name, trial[name])
+
+        queue_lengths = []
+        time_start = time.perf_counter()
+        for _ in range(int(trial["duration"])):
+            GE.simulate(duration=1)  # sec
+            queue_lengths.append(count_waiting(GE))
+        time_elapsed = time.perf_counter() - time_start
+
+    # from spawn to landing, and from the first ETA to landing, in sec
+    flight_time_mean, flight_time_p95 = get_mean_p95(GE.flight_times)
+    landing_delay_mean, landing_delay_p95 = get_mean_p95(GE.atc.landing_delays)
+    planes_spawned = GE.planes_spawned
+    hours = trial["duration"] / 3600
+
+    return {
+        **trial,
+        "planes_spawned": planes_spawned,
+        "planes_landed": GE.planes_landed,
+        "throughput": GE.planes_landed / hours,  # landings per hour
+        "queue_length_mean": float(np.mean(queue_lengths)),
+        "queue_length_max": int(np.max(queue_lengths)),  # planes waiting or holding
+        "flight_time_mean": flight_time_mean,
+        "flight_time_p95": flight_time_p95,
+        "landing_delay_mean": landing_delay_mean,
+        "landing_delay_p95": landing_delay_p95,
+        "separation_losses": GE.separation_losses,
+        "separation_losses_per_hour": GE.separation_losses / hours,
+        "time_elapsed": time_elapsed,  # sec of wall time
+    }
+
+
+def get_trials(sweep, runs, duration, seed):
+    """Builds the trials of a parameter sweep, each with its own seed.
+
+    Args:
+        sweep (dict): Values to sweep for each of `SWEEP_PARAMETERS`.
+        runs (int): Number of runs per combination of parameter values.
+        duration (float): Simulated time per run in sec.
+        seed (int): Seed from which the seed of every run is derived.
+
+    Returns:
+        list(dict): Trial configurations, for `run_trial`.
+    """
+    combinations = list(itertools.product(*(sweep[name] for name in SWEEP_PARAMETERS)))
+    seeds = np.random.SeedSequence(seed).spawn(len(combinations) * runs)
+
+    trials = []
+    for i, (values, run) in enumerate(itertools.product(combinations, range(runs))):
+        trials.append(
+            {
+                **dict(zip(SWEEP_PARAMETERS, values)),
+                "run": run,
+                "duration": duration,
+                "seed": int(seeds[i].generate_state(1)[0]),
+            }
+        )
+
+    return trials
+
+
+def summarize(results):
+    """Aggregates trial results per combination of parameter values.
+
+    Args:
+        results (list(dict)): Results of `run_trial`.
+
+    Returns:
+        list(dict): Mean and standard deviation of each statistic across the runs of
+            each combination.
+    """
+    statistics = (
+        "throughput",
+        "queue_length_mean",
+        "queue_length_max",
+        "flight_time_mean",
+        "flight_time_p95",
+        "landing_delay_mean",
+        "landing_delay_p95",
+        "separation_losses_per_hour",
+    )
+    groups = {}
+    for result in results:
+        key = tuple(result[name] for name in SWEEP_PARAMETERS)
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for key, group in groups.items():
+        entry = {**dict(zip(SWEEP_PARAMETERS, key)), "runs": len(group)}
+        for name in statistics:
+            values = np.array(
+                [result[name] for result in group if result[name] is not None]
+            )
+            entry[f"{name}_mean"] = float(values.mean()) if len(values) else None
+            entry[f"{name}_std"] = float(values.std()) if len(values) else None
+        summary.append(entry)
+
+    return summary
+
+
+def run_capacity_study(sweep, runs, duration, seed=0, processes=None, output=None):
+    """Runs a parameter sweep of independent headless simulations across a process
+        pool, and aggregates their statistics.
+
+    Args:
+        sweep (dict): Values to sweep for each of `SWEEP_PARAMETERS`.
+        runs (int): Number of runs per combination of parameter values.
+        duration (float): Simulated time per run in sec.
+        seed (int, optional): Seed from which the seed of every run is derived.
+            Defaults to 0.
+        processes (int, optional): Number of worker processes. Defaults to the number
+            of CPUs.
+        output (pathlib.Path, optional): JSON file to save the results to. Defaults to
+            None.
+
+    Returns:
+        dict: The study configuration, per-trial results, and summary.
+    """
+    trials = get_trials(sweep, runs=runs, duration=duration, seed=seed)
+    LOG.info(f"Running {len(trials)} trials of {duration}s")
+
+    time_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(run_trial, trials))
+    time_elapsed = time.perf_counter() - time_start
+    LOG.info(f"Ran {len(trials)} trials in {time_elapsed:.1f}s")
+
+    study = {
+        "config": {
+            "sweep": sweep,
+            "runs": runs,
+            "duration": duration,
+            "seed": seed,
+            "processes": processes,
+            "time_elapsed": time_elapsed,
+        },
+        "trials": results,
+        "summary": summarize(results),
+    }
+    if output is not None:
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as file:
+            json.dump(study, file, indent=2)
+        LOG.info(f"Saved capacity study to {output}")
+
+    return study
+
+
+def main(args=None):
+    """Run a capacity study from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Run a Monte Carlo runway capacity study over plane spawn rates."
+    )
+    parser.add_argument(
+        "--interval-avg",
+        type=float,
+        nargs="+",
+        default=[5],
+        help="average sec between plane spawns, one run set per value",
+    )
+    parser.add_argument(
+        "--interval-min", type=float, nargs="+", default=[1], help="min sec per spawn"
+    )
+    parser.add_argument(
+        "--interval-max", type=float, nargs="+", default=[30], help="max sec per spawn"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=4, help="runs per combination of spawn intervals"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=3600, help="simulated sec per run"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="root random seed")
+    parser.add_argument(
+        "--processes", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("logs/capacity/capacity.json"),
+        help="results file",
+    )
+    args = parser.parse_args(args)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.getLogger("aatc").setLevel(logging.ERROR)  # silence the simulations
+    LOG.setLevel(logging.INFO)
+
+    run_capacity_study(
+        sweep={
+            "spawn_planes_interval_avg": args.interval_avg,
+            "spawn_planes_interval_min": args.interval_min,
+            "spawn_planes_interval_max": args.interval_max,
+        },
+        runs=args.runs,
+        duration=args.duration,
+        seed=args.seed,
+        processes=args.processes,
+        output=args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""Module for detecting losses of separation between planes."""
+# stdlib
+import functools
+import logging
+import math
+from collections import namedtuple
+
+# external
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+PredictedConflict = namedtuple(
+    "PredictedConflict", ["plane_id_a", "plane_id_b", "time", "distance"]
+)
+PredictedConflict.__doc__ = """A forecast loss of separation between two planes, with
+    the time in sec until their closest point of approach and their distance in km at
+    that point."""
+
+
+def _expand_ranges(starts, counts):
+    """Concatenates the integer ranges [start, start + count) for each element.
+
+    Args:
+        starts (numpy.ndarray): Range start indices.
+        counts (numpy.ndarray): Range lengths.
+
+    Returns:
+        numpy.ndarray: Concatenated ranges.
+    """
+    offsets = np.cumsum(counts) - counts
+    return np.arange(counts.sum()) - np.repeat(offsets - starts, counts)
+
+
+class SpatialHash:
+    """A uniform grid over the plane positions used as a broad-phase for proximity
+        queries. Positions are bucketed by cell and sorted by cell key, so that
+        neighbouring cells can be looked up in bulk with binary searches.
+
+    Points can be split into independent layers, e.g. snapshots at different times,
+    so that only points in the same layer are paired up.
+
+    Args:
+        cell_size (float): Grid cell width in km. Should be at least the largest
+            radius used with `get_pairs_within`.
+    """
+
+    _KEY_STRIDE = 2 ** 32
+    _LAYER_STRIDE = 2 ** 20  # cells, keeps layers out of each other's neighbourhood
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.positions = np.empty((0, 2))
+
+        self._cells = np.empty((0, 2), dtype=np.int64)
+        self._order = np.empty(0, dtype=np.int64)
+        self._keys_sorted = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _get_keys(self, cells):
+        return cells[:, 0] * self._KEY_STRIDE + cells[:, 1]
+
+    def build(self, positions, layers=None):
+        """Rebuilds the grid from a set of positions.
+
+        Args:
+            positions (numpy.ndarray): Positions of shape (n, 2) in km.
+            layers (numpy.ndarray, optional): Layer index of each position. Only
+                points in the same layer are paired. Defaults to a single layer.
+        """
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self._cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+        if layers is not None:
+            self._cells[:, 0] += np.asarray(layers, dtype=np.int64) * self._LAYER_STRIDE
+        keys = self._get_keys(self._cells)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys_sorted = keys[self._order]
+
+    def _get_cell_members(self, cells):
+        """Finds the points in each of the given cells.
+
+        Args:
+            cells (numpy.ndarray): Cell coordinates of shape (m, 2).
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): For every member found, the index of
+                the queried cell and the index of the member point.
+        """
+        keys = self._get_keys(cells)
+        starts = np.searchsorted(self._keys_sorted, keys, side="left")
+        counts = np.searchsorted(self._keys_sorted, keys, side="right") - starts
+        cell_index = np.repeat(np.arange(len(cells)), counts)
+        member_index = self._order[_expand_ranges(starts, counts)]
+
+        return cell_index, member_index
+
+    def get_candidate_pairs(self):
+        """Finds every pair of points sharing a cell or lying in adjacent cells. Each
+            pair is reported once.
+
+        Neighbouring cells are looked up once per occupied cell rather than once per
+        point, all in one batch.
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): Indices of the first and second point
+                of each pair.
+        """
+        keys_sorted = self._keys_sorted
+        if not len(keys_sorted):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        starts = np.flatnonzero(
+            np.concatenate(([True], keys_sorted[1:] != keys_sorted[:-1]))
+        )
+        counts = np.diff(np.append(starts, len(keys_sorted)))
+        keys = keys_sorted[starts]
+        # half of the 3x3 neighbourhood, so that each cell pair is visited once, all
+        # looked up at once; the first block of cells is paired with itself
+        offsets = np.array((0, -1 + self._KEY_STRIDE, self._KEY_STRIDE))
+        offsets = np.append(offsets, (1 + self._KEY_STRIDE, 1))
+        keys_other = (keys[None] + offsets[:, None]).ravel()
+        starts_other = np.searchsorted(keys_sorted, keys_other, "left")
+        counts_other = np.searchsorted(keys_sorted, keys_other, "right") - starts_other
+        starts = np.tile(starts, len(offsets))
+        counts = np.tile(counts, len(offsets))
+
+        # every member of a cell against every member of its neighbour
+        pair_counts = counts * counts_other
+        cell = np.repeat(np.arange(len(keys_other)), pair_counts)
+        k = _expand_ranges(np.zeros_like(pair_counts), pair_counts)
+        counts_other = counts_other[cell]
+        i = starts[cell] + k // counts_other
+        j = starts_other[cell] + k % counts_other
+        keep = (cell >= len(keys)) | (i < j)
+
+        return self._order[i[keep]], self._order[j[keep]]
+
+    def get_pairs_within(self, radius):
+        """Finds every pair of points closer than a radius.
+
+        Args:
+            radius (float): Separation distance in km. Must not exceed the cell size.
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray): Indices of the first
+                and second point of each pair, and their distance.
+        """
+        i, j = self.get_candidate_pairs()
+        distance = np.linalg.norm(self.positions[i] - self.positions[j], axis=1)
+        close = distance < radius
+
+        return i[close], j[close], distance[close]
+
+    def query(self, position, radius):
+        """Finds the points closer than a radius to a position.
+
+        Args:
+            position (list-like): Query position in km.
+            radius (float): Query radius in km.
+
+        Returns:
+            numpy.ndarray: Indices of the points found.
+        """
+        position = np.asarray(position, dtype=float)
+        reach = math.ceil(radius / self.cell_size)
+        center = np.floor(position / self.cell_size).astype(np.int64)
+        span = np.arange(-reach, reach + 1)
+        cells = center + np.stack(np.meshgrid(span, span), axis=-1).reshape(-1, 2)
+
+        _, members = self._get_cell_members(cells)
+        distance = np.linalg.norm(self.positions[members] - position, axis=1)
+
+        return members[distance < radius]
+
+
+class ConflictDetector:
+    """Tracks losses of separation between planes, i.e. planes within one another's
+        protected radius.
+
+    Args:
+        separation (float): Minimum separation distance between planes in km.
+    """
+
+    def __init__(self, separation):
+        self.separation = separation
+        self.grid = SpatialHash(cell_size=separation)
+        self.plane_ids = []
+        self.conflicts = {}  # (plane id, plane id): distance
+
+    def update(self, plane_ids, positions):
+        """Rebuilds the detector from the latest plane positions.
+
+        Args:
+            plane_ids (list): Plane IDs, in the same order as `positions`.
+            positions (numpy.ndarray): Plane positions of shape (n, 2) in km.
+
+        Returns:
+            list(tuple): Plane ID pairs which lost separation since the last update.
+        """
+        self.plane_ids = list(plane_ids)
+        self.grid.build(positions)
+        i, j, distance = self.grid.get_pairs_within(self.separation)
+
+        conflicts_prev = self.conflicts
+        self.conflicts = {}
+        for a, b, d in zip(i.tolist(), j.tolist(), distance.tolist()):
+            pair = tuple(sorted((self.plane_ids[a], self.plane_ids[b])))
+            self.conflicts[pair] = d
+
+        return [pair for pair in self.conflicts if pair not in conflicts_prev]
+
+    def get_conflicts(self, plane_id=None):
+        """Retrieves the current losses of separation.
+
+        Args:
+            plane_id (optional): Only report conflicts involving this plane. Defaults
+                to None.
+
+        Returns:
+            dict: Distance in km between each conflicting pair of plane IDs.
+        """
+        if plane_id is None:
+            return dict(self.conflicts)
+        return {
+            pair: distance
+            for pair, distance in self.conflicts.items()
+            if plane_id in pair
+        }
+
+    def query(self, position, radius=None):
+        """Retrieves the planes near a position.
+
+        Args:
+            position (list-like): Query position in km.
+            radius (float, optional): Query radius in km. Defaults to the separation
+                distance.
+
+        Returns:
+            list: IDs of the planes found.
+        """
+        radius = self.separation if radius is None else radius
+        return [self.plane_ids[i] for i in self.grid.query(position, radius)]
+
+
+class ConflictPredictor:
+    """Forecasts losses of separation over a look-ahead horizon by extrapolating each
+        plane's current velocity and finding the closest point of approach (CPA) of
+        every nearby pair.
+
+    The horizon is split into `slices` equal time slices, and every plane's position
+    at the middle of each slice is hashed into one layer of a spatial hash per slice.
+    Two planes can only lose separation during a slice if their positions at its
+    middle are within the separation plus the distance both fly in half a slice, so
+    only those pairs are kept before the CPA is computed. Thinner slices prune more
+    pairs, at the cost of hashing more points.
+
+    Args:
+        separation (float): Minimum separation distance between planes in km.
+        horizon (float, optional): Look-ahead horizon in sec. Defaults to 30.
+        slices (int, optional): Number of time slices of the broad phase. Defaults
+            to 3.
+    """
+
+    def __init__(self, separation, horizon=30, slices=3):
+        self.separation = separation
+        self.horizon = horizon
+        self.slices = slices
+        self.grid = SpatialHash(cell_size=separation)
+        self.pairs_checked = 0  # pairs kept by the broad phase in the last prediction
+
+    def predict(self, plane_ids, positions, velocities, horizon=None):
+        """Finds the pairs of planes which will lose separation within the horizon.
+
+        Args:
+            plane_ids (list): Plane IDs, in the same order as `positions`.
+            positions (numpy.ndarray): Plane positions of shape (n, 2) in km.
+            velocities (numpy.ndarray): Plane velocities of shape (n, 2) in km/s.
+            horizon (float, optional): Look-ahead horizon in sec. Defaults to the
+                predictor's horizon.
+
+        Returns:
+            list(PredictedConflict): Predicted conflicts, soonest first.
+        """
+        horizon = self.horizon if horizon is None else horizon
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 2)
+        if len(positions) < 2:
+            self.pairs_checked = 0
+            return []
+
+        # broad phase: each plane's position at the middle of each time slice, one
+        # hash layer per slice
+        n = len(positions)
+        speeds = np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+        slice_duration = horizon / self.slices
+        times = (np.arange(self.slices) + 0.5) * slice_duration
+        points = (positions[None] + velocities[None] * times[:, None, None]).reshape(
+            -1, 2
+        )
+        self.grid.cell_size = self.separation + speeds.max() * slice_duration
+        self.grid.build(points, layers=np.repeat(np.arange(self.slices), n))
+        i, j = self.grid.get_candidate_pairs()
+
+        # keep the pairs within separation plus the distance both fly in half a slice
+        x, y = points[:, 0].copy(), points[:, 1].copy()
+        dx, dy = x[j] - x[i], y[j] - y[i]
+        keep = dx * dx + dy * dy < self.grid.cell_size ** 2  # cheap first cut
+        i, j, dx, dy = i[keep] % n, j[keep] % n, dx[keep], dy[keep]
+        reach = self.separation + (speeds[i] + speeds[j]) * (slice_duration / 2)
+        keep = dx * dx + dy * dy < reach * reach
+        i, j = i[keep], j[keep]
+        pairs = np.sort(np.minimum(i, j) * n + np.maximum(i, j))
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        pairs = pairs[first]
+        i, j = pairs // n, pairs % n  # in input order, each pair once
+        self.pairs_checked = len(pairs)
+
+        dx = positions[j, 0] - positions[i, 0]
+        dy = positions[j, 1] - positions[i, 1]
+        dvx = velocities[j, 0] - velocities[i, 0]
+        dvy = velocities[j, 1] - velocities[i, 1]
+        dv_squared = dvx * dvx + dvy * dvy
+        closing = dx * dvx + dy * dvy
+
+        # closest point of approach within the horizon
+        # planes moving in parallel have no closing speed, and their CPA is now
+        time = np.clip(-1 * closing / np.maximum(dv_squared, 1e-12), 0, horizon)
+        distance = np.hypot(dx + dvx * time, dy + dvy * time)
+
+        conflict = distance < self.separation
+        i, j = i[conflict], j[conflict]
+        time, distance = time[conflict], distance[conflict]
+        order = np.lexsort((distance, time))
+
+        get_id = plane_ids.__getitem__
+        return list(
+            map(
+                functools.partial(tuple.__new__, PredictedConflict),  # skips checks
+                zip(
+                    map(get_id, i[order].tolist()),
+                    map(get_id, j[order].tolist()),
+                    time[order].tolist(),
+                    distance[order].tolist(),
+                ),
+            )
+        )
@@ -1,31 +1,76 @@
 """Module for AATC."""
 # stdlib
 import logging
-from collections import deque
+import math
 from pprint import pformat
 
 # external
-from aatc.game_objects import Path
+import numpy as np
 import pygame
 
+# project
+from aatc.conflict import ConflictDetector, ConflictPredictor
+from aatc.game_objects import Plane
+from aatc.log import allow
+from aatc.planner import FlightPlanner
+from aatc.sequencer import LandingSequencer
+from aatc.telemetry import TelemetryTable
+
 LOG = logging.getLogger(__name__)
 
 
 class AATC:
     """The automated air traffic controller. Responsible for managing air space traffic.
 
+    Planes are addressed by their handle (see `aatc.identity.PlaneHandles`), which
+    indexes the controller's telemetry table directly. Callsigns are only used for
+    display and recording.
+
     Args:
         channels (dict): Dictionary of pygame event channels to be used to communicate
             with the planes.
         runways (list): List of runway game objects present in the simulation.
+        separation (float, optional): Minimum separation distance between planes in km.
+            Defaults to 0.5.
+        horizon (float, optional): Look-ahead horizon in sec over which to forecast
+            losses of separation. Defaults to 30.
+        history (int, optional): Number of telemetry samples of history to keep per
+            plane. Defaults to 100.
+        recorder (aatc.telemetry.TelemetryRecorder, optional): Recorder to stream all
+            received telemetry to. Defaults to None.
+        interval (float, optional): Minimum time between landings on a runway in sec.
+            Defaults to 10.
     """
 
-    def __init__(self, channels, runways):
+    def __init__(
+        self,
+        channels,
+        runways,
+        separation=0.5,
+        horizon=30,
+        history=100,
+        recorder=None,
+        interval=10,
+    ):
         self.channels = channels
-        self.planes = {}
-        self.queue = deque()  # plane queue
+        self.conflict_detector = ConflictDetector(separation=separation)
+        self.conflict_predictor = ConflictPredictor(
+            separation=separation, horizon=horizon
+        )
+        self.conflicts_predicted = []  # soonest first
+        self.time = 0  # msec, simulation time of the latest update
+        self.planes = TelemetryTable(history=history)
+        self.recorder = recorder
+        self.sequencer = LandingSequencer(interval=interval)  # landing queue
         self.runways = self._build_runway_dict(runways)
-        self.paths = [Path([(-5,-5),(-2,-4),(0.5,-0.5)])]  # list of active paths
+        self._runways_open = None  # cached open runway IDs and entry coordinates
+        self.planner = FlightPlanner(
+            runways=self.runways, speed=Plane.SPEED, turn_rate=Plane.TURN_RATE
+        )
+        self.flight_plans = {}  # plane handle: flight plan sent to the plane
+        self.landing_delays = []  # sec from first ETA to landing of each landed plane
+        self.paths = []  # list of active paths
+        self.outbox = None  # queue to publish commands to instead of the event queue
 
     def __str__(self):
         string = (f"AATC Info:\nActive connections:\t{len(self.planes)}\nPlanes:\n"
@@ -33,6 +78,26 @@ class AATC:
         return string
         
 
+    def log_state(self):
+        """Logs the controller's state, from the thread the controller runs on."""
+        LOG.info(self)
+
+    def log_next_landing(self):
+        """Logs the plane with the earliest ETA, its nearest open runway and its
+        landing slot, from the thread the controller runs on."""
+        plane_id = self.sequencer.peek()
+        if plane_id is None:
+            return
+        runway_id = self.get_nearest_open_runway_to_plane(plane_id)
+        LOG.info(f"Nearest open runway: {runway_id}")
+        LOG.info(f"Landing slot: {self.sequencer.slots.get(plane_id)}")
+
+    @property
+    def queue(self):
+        """list(int): Handles of the planes waiting to land, in landing order as of the
+        last slot allocation."""
+        return self.sequencer.sequence
+
     @staticmethod
     def _build_runway_dict(runways):
         """Builds a dictionary of runways from their gameobject information."""
@@ -45,73 +110,307 @@ class AATC:
             }
         return strip_dict
 
-    def get_nearest_open_runway_to_plane(self, plane_id):
-        """Retrieves the nearest open runway to the plane.
+    def update(self, time):
+        """Advance the controller to the current simulation time. Called once per
+            simulation step.
+
+        Args:
+            time (num): Current simulation time in msec.
+        """
+        self.time = time
+        self.update_conflicts()
+        self.conflicts_predicted = self.predict_conflicts()
+        self.dispatch_flight_plans()
+
+    def dispatch_flight_plans(self):
+        """Send a flight plan to the runway of its landing slot to every queued plane
+            which has none yet, in landing order."""
+        slots = self.sequencer.allocate_slots(self._get_open_runways()[0])
+        for plane_id in self.sequencer.sequence:
+            if plane_id in self.flight_plans or plane_id not in slots:
+                continue
+            runway_id, _ = slots[plane_id]
+            plan = self.generate_flight_plan(plane_id, runway_id=runway_id)
+            if plan is not None:
+                self.send_flight_plan(plane_id, plan, runway_id=runway_id)
+
+    def update_conflicts(self):
+        """Rebuild the conflict detector from the latest plane telemetry. Conflicts and
+            nearby planes can then be queried through `conflict_detector`.
+
+        Returns:
+            list(tuple): Plane handle pairs which lost separation since the last
+                update.
+        """
+        plane_ids, positions, _ = self.planes.get_tracked()
+        conflicts_new = self.conflict_detector.update(
+            plane_ids=plane_ids, positions=positions
+        )
+        for plane_id_a, plane_id_b in conflicts_new:
+            LOG.warning(
+                "Loss of separation between planes '%s' and '%s'",
+                self.planes.callsigns[plane_id_a],
+                self.planes.callsigns[plane_id_b],
+            )
+
+        return conflicts_new
+
+    def predict_conflicts(self, horizon=None):
+        """Forecast which planes will lose separation from their latest telemetry.
+
+        Args:
+            horizon (float, optional): Look-ahead horizon in sec. Defaults to the
+                predictor's horizon.
+
+        Returns:
+            list(aatc.conflict.PredictedConflict): Predicted conflicts, soonest first.
+        """
+        plane_ids, positions, velocities = self.planes.get_tracked()
+        return self.conflict_predictor.predict(
+            plane_ids=plane_ids,
+            positions=positions,
+            velocities=velocities,
+            horizon=horizon,
+        )
+
+    def set_runway_status(self, runway_id, status):
+        """Set the status of a runway. Runway statuses must only be changed through
+            this method, as it invalidates the cache of open runways.
+
+        Args:
+            runway_id (str): ID of the runway.
+            status (str): New status of the runway, e.g. "OPEN" or "CLOSED".
+        """
+        if self.runways[runway_id]["status"] != status:
+            self.runways[runway_id]["status"] = status
+            self._runways_open = None
+            self.sequencer.invalidate()
+
+    def _get_open_runways(self):
+        """Retrieves the open runways, rebuilding the cache if a status changed.
+
+        Returns:
+            tuple(list, numpy.ndarray): IDs of the open runways, and their entry
+                coordinates of shape (m, 2).
+        """
+        if self._runways_open is None:
+            runway_ids = [
+                runway_id
+                for runway_id, runway in self.runways.items()
+                if runway["status"] == "OPEN"
+            ]
+            entry_coords = np.array(
+                [
+                    tuple(self.runways[runway_id]["entry_coord"])
+                    for runway_id in runway_ids
+                ]
+            ).reshape(-1, 2)
+            self._runways_open = (runway_ids, entry_coords)
+
+        return self._runways_open
+
+    def get_nearest_open_runways(self, plane_ids, chunk=4096):
+        """Retrieves the nearest open runway to each of many planes at once.
 
         Args:
-            plane_id (str): ID of the plane of interest.
+            plane_ids (list(int)): Handles of the planes of interest.
+            chunk (int, optional): Number of planes to compute distances for at once,
+                bounding memory use. Defaults to 4096.
 
         Returns:
-            str: ID of nearest open runway.
+            list(str): ID of the nearest open runway to each plane, or None for planes
+                which have not transmitted yet, and for every plane if no runway is
+                open.
+
+        Raises:
+            KeyError: If a plane is not connected.
         """
-        plane_position = self.planes[plane_id]["position"]
+        rows = self.planes.get_rows(plane_ids)
+        runway_ids, entry_coords = self._get_open_runways()
+        nearest_runways = [None] * len(rows)
+        if not runway_ids:
+            return nearest_runways
+
+        received = np.flatnonzero(self.planes.received[rows])
+        plane_positions = self.planes.positions[rows[received]]
+        nearest = np.empty(len(received), dtype=np.int64)
+        for start in range(0, len(received), chunk):
+            offsets = (
+                plane_positions[start : start + chunk, None, :] - entry_coords[None]
+            )
+            distances_squared = np.einsum("ijk,ijk->ij", offsets, offsets)
+            nearest[start : start + chunk] = distances_squared.argmin(axis=1)
 
-        runways_open = [
-            runway_id
-            for runway_id in self.runways
-            if self.runways[runway_id]["status"] == "OPEN"
-        ]  # TODO: use .items()
+        for index, i in zip(received.tolist(), nearest.tolist()):
+            nearest_runways[index] = runway_ids[i]
 
-        distances = {}
-        for runway_open_id in runways_open:
-            runway_position = self.runways[runway_open_id]["entry_coord"]
-            distance = (plane_position - runway_position).length()
-            distances[runway_open_id] = distance
+        return nearest_runways
 
-        nearest_runway_id = min(distances, key=distances.get)
+    def get_nearest_open_runway_to_plane(self, plane_id):
+        """Retrieves the nearest open runway to the plane.
+
+        Args:
+            plane_id (int): Handle of the plane of interest.
+
+        Returns:
+            str: ID of nearest open runway, or None if the plane has not transmitted
+                yet or no runway is open.
 
-        return nearest_runway_id
+        Raises:
+            KeyError: If the plane is not connected.
+        """
+        return self.get_nearest_open_runways([plane_id])[0]
 
-    def add_plane(self, plane_id):
+    def add_plane(self, plane_id, callsign=None):
         """Add a plane to the ATC database of planes and insert to the landing queue.
 
         Args:
-            plane_id (str): ID of the plane to be added.
+            plane_id (int): Handle of the plane to be added.
+            callsign (str, optional): Callsign of the plane. Defaults to the handle.
         """
+        if callsign is None:
+            callsign = str(plane_id)
         LOG.info(
-            f"Received connection request from plane '{plane_id}'. "
+            f"Received connection request from plane '{callsign}'. "
             "Adding to planes and queue."
         )
-        self.planes[plane_id] = {"position": None, "status": None}
-        self.queue.append(plane_id)
-        event_connection_confirmation = pygame.event.Event(
-            self.channels["CONNECTIONCONFIRMATION"], plane_id=plane_id
+        self.planes.add(plane_id, callsign=callsign)
+        self.sequencer.add(plane_id)
+        self.post("CONNECTIONCONFIRMATION", plane_id=plane_id)
+
+    def remove_plane(self, plane_id, time=None):
+        """Remove a plane which left the air space from the ATC database of planes, the
+            landing queue, and the active paths.
+
+        Args:
+            plane_id (int): Handle of the plane to be removed.
+            time (num, optional): Simulation time the plane landed at in msec, to
+                measure its landing delay from its first ETA. Defaults to None, for
+                planes which did not land.
+        """
+        LOG.info(
+            f"Plane '{self.planes.callsigns[plane_id]}' disconnected. "
+            "Removing from planes and queue."
         )
-        pygame.event.post(event_connection_confirmation)
+        self.planes.remove(plane_id)
+        if plane_id in self.sequencer:
+            eta = self.sequencer.first_etas.get(plane_id)
+            if time is not None and eta is not None:
+                self.landing_delays.append((time - eta) / 1000)
+            self.sequencer.remove(plane_id)
+        plan = self.flight_plans.pop(plane_id, None)
+        if plan is not None:
+            self.paths.remove(plan)
 
     def update_telemetry(self, plane_id, telemetry):
         """Update the telemetry of a plane in the database from new data.
 
         Args:
-            plane_id (str): ID of the plane to be updated.
+            plane_id (int): Handle of the plane to be updated.
             telemetry (dict): Dictionary of telemetry data.
         """
-        LOG.debug(f"Received telemetry from plane '{plane_id}'.")
-        self.planes[plane_id]["position"] = telemetry["position"]
-        self.planes[plane_id]["status"] = telemetry["status"]
+        if not self.planes.update(plane_id, **telemetry):
+            return  # sent before the plane disconnected
+        if LOG.isEnabledFor(logging.DEBUG) and allow("telemetry"):
+            LOG.debug(
+                "Received telemetry from plane '%s'.", self.planes.callsigns[plane_id]
+            )
+        self.sequencer.update(
+            plane_id,
+            telemetry["time"],
+            telemetry["position"],
+            telemetry["velocity"],
+            *self._get_open_runways(),
+        )
+        if self.recorder is not None:
+            self.recorder.append(self.planes.callsigns[plane_id], **telemetry)
 
-    def generate_flight_plan(self, start, end, steps):
-        raise NotImplementedError()
+    def ingest_telemetry_frame(self, frame):
+        """Update the telemetry of every plane in a telemetry frame at once.
+
+        Args:
+            frame (aatc.telemetry.TelemetryFrame): Frame of telemetry data.
+        """
+        frame = self.planes.update_frame(frame)  # without disconnected planes
+        if LOG.isEnabledFor(logging.DEBUG) and allow("telemetry"):
+            LOG.debug("Received telemetry frame from %d planes.", len(frame.plane_ids))
+        self.sequencer.update_frame(
+            frame.time,
+            np.asarray(frame.plane_ids).tolist(),
+            frame.positions,
+            frame.velocities,
+            *self._get_open_runways(),
+        )
+        if self.recorder is not None:
+            self.recorder.append_frame(
+                frame, callsigns=self.planes.callsigns[frame.plane_ids]
+            )
+
+    def generate_flight_plan(self, plane_id, runway_id=None):
+        """Generate a flight plan from a plane's latest telemetry to a runway.
+
+        Args:
+            plane_id (int): Handle of the plane to be planned for.
+            runway_id (str, optional): ID of the runway to land on. Defaults to the
+                nearest open runway.
+
+        Returns:
+            aatc.game_objects.Path: The flight plan, or None if the plane has not sent
+                telemetry yet or no runway is open.
+        """
+        telemetry = self.planes[plane_id]
+        callsign = self.planes.callsigns[plane_id]
+        if telemetry["position"] is None:
+            LOG.warning(f"Cannot plan for plane '{callsign}' without telemetry")
+            return None
+        if runway_id is None:
+            runway_id = self.get_nearest_open_runway_to_plane(plane_id)
+            if runway_id is None:
+                LOG.warning(f"Cannot plan for plane '{callsign}', no runway is open")
+                return None
+
+        velocity = telemetry["velocity"]
+        heading = math.degrees(math.atan2(-1 * velocity.x, velocity.y))
+        LOG.info(f"Planning plane '{callsign}' to runway '{runway_id}'")
+
+        return self.planner.plan(telemetry["position"], heading, runway_id)
 
     def hold_plane(self, plane_id):
         """Instruct a plane to hold at its currnent position.
 
         Args:
-            plane_id (str): ID of the plane to be held.
+            plane_id (int): Handle of the plane to be held.
+        """
+        LOG.info(f"Holding plane '{self.planes.callsigns[plane_id]}'")
+        self.post("HOLD", plane_id=plane_id)
+
+    def send_flight_plan(self, plane_id, plan, runway_id=None):
+        """Send a flight plan to a plane.
+
+        Args:
+            plane_id (int): Handle of the plane to receive the flight plan.
+            plan (aatc.game_objects.Path): The flight plan.
+            runway_id (str, optional): ID of the runway the plan lands on, which the
+                plane's landing slot is then kept on. Defaults to None.
         """
-        LOG.info(f"Holding plane '{plane_id}'")
-        event_hold = pygame.event.Event(self.channels["HOLD"], plane_id=plane_id)
-        pygame.event.post(event_hold)
+        LOG.info(f"Sending flight plan to plane '{self.planes.callsigns[plane_id]}'")
+        plan_prev = self.flight_plans.get(plane_id)
+        if plan_prev is not None:
+            self.paths.remove(plan_prev)
+        self.flight_plans[plane_id] = plan
+        self.paths.append(plan)
+        if runway_id is not None:
+            self.sequencer.assign(plane_id, runway_id, plan)
+        self.post("FLIGHTPLAN", plane_id=plane_id, plan=plan)
+
+    def post(self, channel, **attributes):
+        """Publish a message to the planes, on the event queue or, if set, the outbox.
 
-    def send_flight_plan(self, plane_id, plan):
-        raise NotImplementedError()
+        Args:
+            channel (str): Name of the event channel.
+            **attributes: Attributes of the message.
+        """
+        if self.outbox is not None:
+            self.outbox.put((channel, attributes))
+            return
+        pygame.event.post(pygame.event.Event(self.channels[channel], **attributes))
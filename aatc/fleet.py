@@ -0,0 +1,295 @@
+"""Module for the array-backed fleet state engine."""
+# stdlib
+import logging
+
+# external
+import numpy as np
+from pygame.math import Vector2
+
+LOG = logging.getLogger(__name__)
+
+STATUSES = ("CRUISING", "NAVIGATING", "HOLDING", "LANDING")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class FleetAttribute:
+    """Descriptor which stores a plane attribute on the plane itself or, once the
+        plane is attached to a fleet, in the fleet's array row for that plane.
+
+    The unbound value lives in the private attribute of the same name (e.g.
+    `_position` for `position`).
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.private_name = "_" + name
+
+    def __get__(self, plane, owner=None):
+        if plane is None:
+            return self
+        if plane._fleet is None:
+            return getattr(plane, self.private_name)
+        return plane._fleet.get(self.name, plane._fleet_row)
+
+    def __set__(self, plane, value):
+        if plane._fleet is None:
+            setattr(plane, self.private_name, value)
+        else:
+            plane._fleet.set(self.name, plane._fleet_row, value)
+
+
+class Fleet:
+    """Holds the kinematic state of every plane in contiguous numpy arrays so that the
+        whole fleet can be advanced in a single batched step.
+
+    Each attached plane owns the row of the arrays at its handle (see
+    `aatc.identity.PlaneHandles`), so that planes are looked up by plain indexing. Rows
+    are freed when planes detach and taken again when their handle is reissued, and
+    the arrays double in size until they fit the largest handle.
+
+    Args:
+        capacity (int, optional): Number of plane rows to preallocate. Defaults to 64.
+    """
+
+    def __init__(self, capacity=64):
+        self.position = np.zeros((capacity, 2))  # km
+        self.heading = np.zeros(capacity)  # °
+        self.speed = np.zeros(capacity)  # km/s
+        self.status = np.zeros(capacity, dtype=np.int8)  # index into STATUSES
+        self.transmit = np.zeros(capacity, dtype=bool)
+        self.transmit_frequency = np.ones(capacity)  # Hz
+        self.transmit_time_prev = np.zeros(capacity)  # msec
+        self.turn_rate = np.zeros(capacity)  # °/s
+        self.plan = np.empty(capacity, dtype=object)  # aatc.game_objects.Path
+        self.waypoint_index = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+
+        # next waypoint of each plan, cached from the plan's segment arrays
+        self.target = np.zeros((capacity, 2))  # km
+        self.target_direction = np.zeros((capacity, 2))  # unit entry direction
+        self.target_radius = np.zeros(capacity)  # km
+
+        self._size = 0  # rows up to the highest handle attached so far
+
+    _ATTRIBUTES = (
+        "position",
+        "heading",
+        "speed",
+        "status",
+        "transmit",
+        "transmit_frequency",
+        "transmit_time_prev",
+        "turn_rate",
+        "plan",
+        "waypoint_index",
+        "active",
+        "target",
+        "target_direction",
+        "target_radius",
+    )
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active[: self._size]))
+
+    @property
+    def capacity(self):
+        """int: Number of allocated rows."""
+        return len(self.active)
+
+    def _grow(self):
+        """Doubles the number of allocated rows."""
+        capacity = self.capacity * 2
+        LOG.debug(f"Growing fleet arrays to {capacity} rows")
+        for name in self._ATTRIBUTES:
+            array = getattr(self, name)
+            if array.dtype == object:
+                grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            else:
+                grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    def add(self, plane_id, **state):
+        """Takes the row of a plane's handle and initializes it with the plane's state.
+
+        Args:
+            plane_id (int): Handle of the plane.
+            **state: Initial value of each of the plane's fleet attributes (e.g.
+                `position`, `heading`, `speed`, `status`), in the types used by
+                `Plane`.
+
+        Returns:
+            int: Row index of the plane, its handle.
+        """
+        row = plane_id
+        while row >= self.capacity:
+            self._grow()
+        if self.active[row]:
+            raise ValueError(f"Fleet row {row} is already taken")
+        self._size = max(self._size, row + 1)
+
+        self.active[row] = True
+        for name, value in state.items():
+            self.set(name, row, value)
+
+        return row
+
+    def remove(self, row):
+        """Frees a plane's row so that it is no longer advanced.
+
+        Args:
+            row (int): Row index of the plane.
+        """
+        self.active[row] = False
+        self.transmit[row] = False
+        self.plan[row] = None
+
+    def get(self, name, row):
+        """Reads a plane attribute from its row.
+
+        Args:
+            name (str): Name of the attribute.
+            row (int): Row index of the plane.
+
+        Returns:
+            The attribute value, converted to the type used by `Plane`.
+        """
+        if name == "position":
+            return Vector2(*self.position[row])
+        if name == "status":
+            return STATUSES[self.status[row]]
+        if name == "plan":
+            return self.plan[row]
+        return getattr(self, name)[row].item()
+
+    def set(self, name, row, value):
+        """Writes a plane attribute to its row.
+
+        Args:
+            name (str): Name of the attribute.
+            row (int): Row index of the plane.
+            value: The attribute value, in the type used by `Plane`.
+        """
+        if name == "status":
+            value = STATUS_CODES[value]
+        getattr(self, name)[row] = value
+        if name in ("plan", "waypoint_index"):
+            self._set_target(row)
+
+    def _set_target(self, row):
+        """Caches the next waypoint of a plane's flight plan in the target arrays. The
+            first waypoint is approached from the plane's current position, like
+            `Plane.receive_flight_plan`.
+
+        Args:
+            row (int): Row index of the plane.
+        """
+        plan = self.plan[row]
+        index = self.waypoint_index[row]
+        if plan is None or index >= len(plan.points):
+            return
+        self.target[row] = plan.points[index]
+        if index == 0:
+            offset = plan.points[0] - self.position[row]
+            length = np.hypot(*offset)
+            self.target_direction[row] = offset / length if length > 0 else 0
+        else:
+            self.target_direction[row] = plan.entry_directions[index]
+        self.target_radius[row] = plan.radius
+
+    def get_velocity(self, rows=None):
+        """Calculates the velocity of the given rows.
+
+        Args:
+            rows (numpy.ndarray, optional): Row indices. Defaults to every row.
+
+        Returns:
+            numpy.ndarray: Velocity vectors of shape (rows, 2) in km/s. Inactive rows
+                are zero.
+        """
+        rows = slice(self._size) if rows is None else rows
+        heading = np.radians(self.heading[rows])
+        speed = self.speed[rows] * self.active[rows]
+
+        return np.stack((-1 * np.sin(heading) * speed, np.cos(heading) * speed), axis=1)
+
+    def navigate(self, dt):
+        """Steers every navigating plane towards the next waypoint of its flight plan
+            and every holding plane around its holding circle, following the same rules
+            as `Plane.navigate`.
+
+        Navigating planes which reached or passed their next waypoint advance to the
+        following one, and planes past their last waypoint start landing.
+
+        Args:
+            dt (float): Timestep in seconds.
+
+        Returns:
+            numpy.ndarray: Row indices of the planes which reached the last waypoint of
+                their flight plan.
+        """
+        n = self._size
+        active = self.active[:n]
+
+        rows = np.flatnonzero(active & (self.status[:n] == STATUS_CODES["HOLDING"]))
+        self.heading[rows] = (self.heading[rows] + self.turn_rate[rows] * dt) % 360
+
+        rows = np.flatnonzero(active & (self.status[:n] == STATUS_CODES["NAVIGATING"]))
+        offsets = self.target[rows] - self.position[rows]
+        reached = (
+            np.einsum("ij,ij->i", offsets, offsets) <= self.target_radius[rows] ** 2
+        ) | (np.einsum("ij,ij->i", offsets, self.target_direction[rows]) < 0)
+
+        rows_landed = []
+        for row in rows[reached].tolist():  # only planes at a waypoint this step
+            self.waypoint_index[row] += 1
+            if self.waypoint_index[row] == len(self.plan[row].points):
+                self.status[row] = STATUS_CODES["LANDING"]
+                rows_landed.append(row)
+            else:
+                self._set_target(row)
+        if reached.any():
+            rows = rows[self.status[rows] == STATUS_CODES["NAVIGATING"]]
+            offsets = self.target[rows] - self.position[rows]
+
+        heading_target = np.degrees(np.arctan2(-1 * offsets[:, 0], offsets[:, 1]))
+        turn = (heading_target - self.heading[rows] + 180) % 360 - 180
+        turn_max = self.turn_rate[rows] * dt
+        self.heading[rows] = (
+            self.heading[rows] + np.clip(turn, -1 * turn_max, turn_max)
+        ) % 360
+
+        return np.array(rows_landed, dtype=np.int64)
+
+    def step(self, dt):
+        """Advances the position of every active plane.
+
+        Args:
+            dt (float): Timestep in seconds.
+        """
+        self.position[: self._size] += self.get_velocity() * dt
+
+    def poll_transmit(self, time):
+        """Finds the transmitting planes which are due to send telemetry, following the
+            same schedule as `Plane.poll_transmit`, and resets their transmit timers.
+
+        Args:
+            time (num): Current simulation time in msec.
+
+        Returns:
+            numpy.ndarray: Row indices of the planes due to transmit.
+        """
+        n = self._size
+        due = (
+            self.active[:n]
+            & self.transmit[:n]
+            & (
+                time
+                >= self.transmit_time_prev[:n]
+                + (1 / self.transmit_frequency[:n]) * 1000
+            )
+        )
+        rows = np.flatnonzero(due)
+        self.transmit_time_prev[rows] = time
+
+        return rows
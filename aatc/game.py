@@ -2,8 +2,8 @@
 # stdlib
 import logging
 import math
-import random
-import string
+import os
+import time
 from pathlib import Path
 
 # external
@@ -12,8 +12,18 @@ import pygame
 from pygame.math import Vector2
 
 # project
+import aatc
 from aatc import controller
+from aatc.asset_manager import ASSETS_PATH, AssetManager
+from aatc.conflict import ConflictDetector
+from aatc.fleet import STATUS_CODES, Fleet
 from aatc.game_objects import ATCZone, Plane, Runway
+from aatc.identity import PlaneHandles
+from aatc.profiler import FrameProfiler
+from aatc.recording import Recording
+from aatc.renderer import Renderer
+from aatc.telemetry import TelemetryFrame, TelemetryRecorder
+from aatc.worker import ControllerWorker
 
 LOG = logging.getLogger(__name__)
 
@@ -25,9 +35,37 @@ class GameEngine:
     Args:
         screen_size (tuple, optional): Screen width and height in pixels to render.
             Defaults to (500, 500).
+        fleet (bool, optional): Whether to advance planes through the array-backed
+            fleet state engine instead of one at a time. Defaults to False.
+        headless (bool, optional): Whether to run without a display or audio, stepping
+            a simulated clock by a fixed timestep as fast as possible. Defaults to
+            False.
+        record_telemetry (pathlib.Path, optional): File to record all telemetry
+            received by the controller to, finalized by `close`. Defaults to None.
+        seed (int, optional): Seed for the random number generator. Headless runs with
+            the same seed are identical. Defaults to None.
+        record (bool, optional): Whether to record the run's spawns and commands to
+            `recording`, for replay. Only headless runs step by the fixed timestep a
+            replay needs, so they alone can be recorded. Defaults to False.
+        replay (aatc.recording.Recording, optional): Recording whose spawns and
+            commands to replay instead of spawning planes at random and acting on
+            the controller's commands. Defaults to None.
+        controller_thread (bool, optional): Whether to run the controller on a worker
+            thread, so that the frame loop never waits on controller work. Runs are
+            then no longer reproducible. Defaults to False.
     """
 
-    def __init__(self, screen_size=(500, 500)):
+    def __init__(
+        self,
+        screen_size=(500, 500),
+        fleet=False,
+        headless=False,
+        record_telemetry=None,
+        seed=None,
+        record=False,
+        replay=None,
+        controller_thread=False,
+    ):
         # region config
         # screen
         self.screen_color = (0, 0, 0)  # rgb
@@ -40,11 +78,12 @@ class GameEngine:
         self.program_icon = Path("paper_plane.png")
 
         # images
-        self.assets_images_path = Path("aatc/assets/images")
+        self.assets_images_path = ASSETS_PATH / "images"
 
         # audio
         self.audio_volume = 0.1
-        self.assets_audio_path = Path("aatc/assets/audio")
+        self.audio_channels = 8  # max sounds playing at once
+        self.assets_audio_path = ASSETS_PATH / "audio"
         self.plane_crash_audio = Path("plane_crash.wav")
         self.plane_land_audio = Path("plane_land.wav")
         self.plane_spawn_audio = Path("plane_spawn.wav")
@@ -56,16 +95,26 @@ class GameEngine:
 
         # simulation
         self.paused = False
+        self.headless = headless
+        self.timestep = 1 / self.screen_fps  # sec, fixed step used when headless
+        self.time = 0  # msec, simulation time
+        self.time_to_first_frame = None  # sec from importing aatc to the first frame
 
         # GUI
         self.draw_gizmos = True
+        self.draw_profiler = False  # overlay the frame profiler
 
         # world
         self.origin = self.screen_size // 2
 
+        self._screen_transform = None
+        self._screen_transform_key = None  # camera the transform was built for
+
         # planes
         self.plane_protected_radius = 0.5  # km
         self.spawn_planes = True
+        self.telemetry_batching = True  # publish one telemetry frame per tick
+        self.telemetry_history = 100  # samples kept per plane by the controller
         self.spawn_planes_interval_avg = 5  # avg sec per plane
         self.spawn_planes_interval_max = 30  # sec
         self.spawn_planes_interval_min = 1  # sec
@@ -79,24 +128,61 @@ class GameEngine:
             "CONNECTIONREQUEST": pygame.event.custom_type(),
             "CONNECTIONCONFIRMATION": pygame.event.custom_type(),
             "TELEMETRY": pygame.event.custom_type(),
+            "TELEMETRYFRAME": pygame.event.custom_type(),
             "FLIGHTPLAN": pygame.event.custom_type(),
             "HOLD": pygame.event.custom_type(),
         }
+        self.event_handlers = {
+            self.events["CONNECTIONREQUEST"]: self._handle_connection_request,
+            self.events["CONNECTIONCONFIRMATION"]: self._handle_connection_confirmation,
+            self.events["TELEMETRY"]: self._handle_telemetry,
+            self.events["TELEMETRYFRAME"]: self._handle_telemetry_frame,
+            self.events["FLIGHTPLAN"]: self._handle_flight_plan,
+            self.events["HOLD"]: self._handle_hold,
+        }
 
         # region setup
-        self.RNG = np.random.default_rng()
-
-        # initalize pygame
-        pygame.init()
+        self.profiler = FrameProfiler(
+            event_names={event: name for name, event in self.events.items()}
+        )
+        self.RNG = np.random.default_rng(seed)
+        if record and not self.headless:
+            raise ValueError("Only headless runs with a fixed timestep can be recorded")
+        self.recording = (
+            Recording(seed=seed, timestep=self.timestep) if record else None
+        )  # kept in memory for the whole run
+        self._replay = replay
+        self._replay_spawn_index = 0
+        self._replay_command_index = 0
+
+        # initalize pygame, only the subsystems needed up front
         self.clock = pygame.time.Clock()
-        self.screen = pygame.display.set_mode(self.screen_size)
-        pygame.display.set_caption("AATC - David Maranto 2021")
-        pygame.display.set_icon(
-            pygame.image.load(self.assets_images_path / self.program_icon)
+        if self.headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()  # the event queue requires the video subsystem
+        self._screen = None  # window opened on first use
+
+        self.assets = AssetManager(
+            audio_path=self.assets_audio_path,
+            images_path=self.assets_images_path,
+            volume=self.audio_volume,
+            channels=self.audio_channels,
+            audio=not self.headless,
         )
 
         # instantiate game objects
         self.planes = []
+        self.plane_registry = {}  # plane handle: plane
+        self.handles = PlaneHandles(rng=self.RNG)
+        self.fleet = Fleet() if fleet else None
+        self.conflict_detector = ConflictDetector(
+            separation=self.plane_protected_radius
+        )
+        self.separation_losses = 0  # count of pairs which lost separation
+        self.planes_spawned = 0
+        self.planes_landed = 0
+        self.flight_times = []  # sec from spawn to landing of each landed plane
+        self._spawn_times = {}  # plane handle: time added to the simulation in msec
 
         self.runways = [
             Runway(
@@ -113,35 +199,195 @@ class GameEngine:
 
         self.atc_zone = ATCZone()
 
-        self.atc = controller.AATC(channels=self.events, runways=self.runways)
+        self.atc = controller.AATC(
+            channels=self.events,
+            runways=self.runways,
+            separation=self.plane_protected_radius,
+            history=self.telemetry_history,
+            recorder=(
+                TelemetryRecorder(record_telemetry)
+                if record_telemetry is not None
+                else None
+            ),
+        )
+
+        self.atc_worker = None
+        if controller_thread:
+            self.atc_worker = ControllerWorker(self.atc)
+            self.atc_worker.start()
+
+        self.renderer = Renderer(self)
+        self._closed = False
         # endregion
 
-    def spawn_plane(self):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self, timeout=None):
+        """Stops the controller's worker thread and closes the telemetry recorder,
+            trimming its file to the records written. Does nothing if already closed.
+
+        Args:
+            timeout (float, optional): Time to wait for the worker thread to stop in
+                sec. Defaults to waiting until it stops.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self.atc_worker is not None:
+            self.atc_worker.stop(timeout)
+        if self.atc.recorder is not None:
+            self.atc.recorder.close()
+
+    @property
+    def screen(self):
+        """pygame.Surface: Surface the simulation is rendered to. The window, or an
+        off-screen surface when headless, is created on first use."""
+        if self._screen is None:
+            if self.headless:
+                self._screen = pygame.Surface(self.screen_size)
+            else:
+                pygame.display.set_caption("AATC - David Maranto 2021")
+                pygame.display.set_icon(self.assets.get_image(self.program_icon))
+                self._screen = pygame.display.set_mode(self.screen_size)
+
+        return self._screen
+
+    def spawn_plane(self, callsign=None, spawn_position=None, spawn_heading=None):
         """Spawns a plane at a random position along the air traffic control zone
-        ring."""
-        plane_id = self.generate_id()
-        spawn_angle = self.RNG.random(1) * 2 * math.pi  # random angle in radians
-        spawn_position = (
-            Vector2(math.cos(spawn_angle), math.sin(spawn_angle)) * self.atc_zone.radius
-        )
-        spawn_heading = math.degrees(
-            math.pi - math.atan2(spawn_position.x, spawn_position.y)
-        )  # set the plane's initial heading to the center of the ATC zone
+            ring, and issues it a handle.
+
+        Args:
+            callsign (str, optional): Callsign of the plane. Defaults to a generated
+                callsign.
+            spawn_position (pygame.Vector2, optional): Spawn position. Defaults to a
+                random position along the ring.
+            spawn_heading (num, optional): Spawn heading in degrees. Defaults to the
+                heading towards the center of the ATC zone.
+        """
+        plane_id = self.handles.allocate(callsign)
+        callsign = self.handles.get_callsign(plane_id)
+        if spawn_position is None:
+            spawn_angle = self.RNG.random() * 2 * math.pi  # random angle in radians
+            spawn_position = (
+                Vector2(math.cos(spawn_angle), math.sin(spawn_angle))
+                * self.atc_zone.radius
+            )
+        if spawn_heading is None:
+            spawn_heading = math.degrees(
+                math.pi - math.atan2(spawn_position.x, spawn_position.y)
+            )  # set the plane's initial heading to the center of the ATC zone
         LOG.info(
-            f"Spawning plane '{plane_id}' at {spawn_position} with heading "
+            f"Spawning plane '{callsign}' at {spawn_position} with heading "
             f"{round(spawn_heading)}°"
         )
-        self.planes.append(
-            Plane(
-                plane_id=plane_id,
+        plane = Plane(
+            plane_id=plane_id,
+            position=spawn_position,
+            heading=spawn_heading,
+            channels=self.events,
+            callsign=callsign,
+        )
+        self.add_plane(plane)
+        self.planes_spawned += 1
+        if self.recording is not None:
+            self.recording.record_spawn(
+                self.time,
+                plane_id=callsign,
                 position=spawn_position,
                 heading=spawn_heading,
-                channels=self.events,
             )
-        )
 
         self.play_audio(self.plane_spawn_audio)
 
+    def add_plane(self, plane):
+        """Adds a plane to the simulation.
+
+        Args:
+            plane (aatc.game_objects.Plane): The plane to add.
+        """
+        if self.fleet is not None:
+            plane.attach(self.fleet)
+        self.planes.append(plane)
+        self.plane_registry[plane.id] = plane
+        self._spawn_times[plane.id] = self.time
+
+    def remove_plane(self, plane_id):
+        """Removes a plane from the simulation. Its handle is released once the
+            controller has disconnected it, see `land_plane`.
+
+        Args:
+            plane_id (int): Handle of the plane to remove.
+
+        Returns:
+            aatc.game_objects.Plane: The removed plane.
+        """
+        plane = self.plane_registry.pop(plane_id)
+        self.planes.remove(plane)
+        self._spawn_times.pop(plane_id)
+        plane.detach()
+
+        return plane
+
+    def land_plane(self, plane_id):
+        """Lands a plane which reached the end of its flight plan, removing it from the
+            simulation and disconnecting it from the controller.
+
+        Args:
+            plane_id (int): Handle of the plane to land.
+        """
+        LOG.info(f"Plane '{self.handles.get_callsign(plane_id)}' landed")
+        self.flight_times.append((self.time - self._spawn_times[plane_id]) / 1000)
+        self.remove_plane(plane_id)
+        self.call_controller("remove_plane", plane_id, self.time)
+        self.handles.release(plane_id)
+        self.planes_landed += 1
+        self.play_audio(self.plane_land_audio)
+
+    def get_plane(self, plane_id):
+        """Retrieves a plane by its handle.
+
+        Args:
+            plane_id (int): Handle of the plane of interest.
+
+        Returns:
+            aatc.game_objects.Plane: The plane.
+        """
+        return self.plane_registry[plane_id]
+
+    def _get_screen_transform(self):
+        """Retrieves the affine transform from game to screen coordinates, rebuilding
+            it if the camera moved.
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): Linear part of shape (2, 2) and offset
+                of shape (2,), such that `screen = game @ matrix + offset`.
+        """
+        key = (self.origin.x, self.origin.y, self.screen_scale)
+        if key != self._screen_transform_key:
+            matrix = np.array([[self.screen_scale, 0], [0, -1 * self.screen_scale]])
+            offset = np.array([self.origin.x, self.origin.y])
+            self._screen_transform = (matrix, offset)
+            self._screen_transform_key = key
+
+        return self._screen_transform
+
+    def vectors_to_screen(self, vectors):
+        """Transforms many vectors in game coordinates to screen coordinates at once.
+
+        Args:
+            vectors (array-like): 2D vectors in game coordinates, of shape (n, 2) or
+                (2,).
+
+        Returns:
+            numpy.ndarray: The vectors in screen coordinates, of shape (n, 2).
+        """
+        matrix, offset = self._get_screen_transform()
+        return np.asarray(vectors, dtype=float).reshape(-1, 2) @ matrix + offset
+
     def vector_to_screen(self, vector):
         """Transforms a vector in game coordinates to screen coordinates.
 
@@ -151,21 +397,26 @@ class GameEngine:
         Returns:
             pygame.math.Vector2D: The vector represented in screen coordinates.
         """
-        v = Vector2(vector) if not isinstance(vector, Vector2) else vector
-        v = Vector2(v.x * -1, v.y) * self.screen_scale
-        v_screen = self.origin - v
+        return Vector2(*self.vectors_to_screen(vector)[0])
+
+    def get_plane_positions(self):
+        """Gathers the positions of all planes.
 
-        return v_screen
+        Returns:
+            numpy.ndarray: Plane positions of shape (n, 2) in km, in the same order as
+                `planes`.
+        """
+        if self.fleet is not None:
+            return self.fleet.position[[plane._fleet_row for plane in self.planes]]
+        return np.array([tuple(plane.position) for plane in self.planes]).reshape(-1, 2)
 
     def play_audio(self, audio):
-        """Plays an audio file.
+        """Plays a cached audio file.
 
         Args:
             audio (pathlib.Path): Name of the audio file to play.
         """
-        sound = pygame.mixer.Sound(str(self.assets_audio_path / audio))
-        sound.set_volume(self.audio_volume)
-        sound.play()
+        self.assets.play(audio)
 
     def _get_spawn_interval(self):
         spawn_interval = self.RNG.normal(
@@ -181,89 +432,267 @@ class GameEngine:
 
         return spawn_interval
 
-    @staticmethod
-    def generate_id(size=6, chars=string.ascii_uppercase + string.digits):
-        """Generates a random string of given size and characters. Used to generate
-            unique plane IDs.
+    def handle_event(self, event):
+        """Routes a simulation channel event between the planes and the controller.
 
         Args:
-            size (int, optional): Number of elemnents in ID. Defaults to 6.
-            chars (list(str), optional): Characters to include in ID. Defaults to
-                string.ascii_uppercase+string.digits.
+            event (pygame.event.Event): The event to handle.
+        """
+        handler = self.event_handlers.get(event.type)
+        if handler is not None:
+            handler(event)
 
-        Returns:
-            str: An ID.
+    def call_controller(self, method, *args, droppable=False):
+        """Calls a controller method, or submits the call to the controller's worker
+            thread if it runs on one.
+
+        Args:
+            method (str): Name of the controller method to call.
+            *args: Arguments of the call.
+            droppable (bool, optional): Whether the worker may drop the call when it
+                falls behind, because a later call supersedes it. Defaults to False.
+        """
+        with self.profiler.phase("controller"):
+            if self.atc_worker is not None:
+                self.atc_worker.submit(method, *args, droppable=droppable)
+            else:
+                getattr(self.atc, method)(*args)
+
+    def _handle_connection_request(self, event):
+        self.call_controller("add_plane", event.plane_id, event.callsign)
+
+    def _handle_connection_confirmation(self, event):
+        plane = self.plane_registry.get(event.plane_id)
+        if plane is not None:  # the plane may have left the simulation since
+            plane.transmit = True
+
+    def _handle_telemetry(self, event):
+        self.call_controller(
+            "update_telemetry", event.plane_id, event.telemetry, droppable=True
+        )
+
+    def _handle_telemetry_frame(self, event):
+        self.call_controller("ingest_telemetry_frame", event.frame, droppable=True)
+
+    def _handle_flight_plan(self, event):
+        if self._replay is None:  # when replaying, recorded commands are used instead
+            self._command_plane("FLIGHTPLAN", event.plane_id, plan=event.plan)
+
+    def _handle_hold(self, event):
+        if self._replay is None:
+            self._command_plane("HOLD", event.plane_id)
+
+    def _command_plane(self, channel, plane_id, plan=None):
+        """Delivers a controller command to a plane and records it.
 
-        TODO: Ensure unique IDs
+        Args:
+            channel (str): Name of the command's event channel.
+            plane_id (int): Handle of the commanded plane.
+            plan (aatc.game_objects.Path, optional): Flight plan sent with the
+                command. Defaults to None.
         """
-        return "".join(random.choice(chars) for _ in range(size))
+        plane = self.plane_registry.get(plane_id)
+        if plane is None:  # the plane may have left the simulation since
+            return
+
+        if self.recording is not None:
+            self.recording.record_command(self.time, channel, plane_id, plan=plan)
+        if channel == "FLIGHTPLAN":
+            plane.follow_plan(plan)
+        elif channel == "HOLD":
+            plane.hold()
+
+    def _replay_commands(self):
+        """Delivers the recorded commands due by the current simulation time."""
+        commands = self._replay.commands
+        while (
+            self._replay_command_index < len(commands)
+            and commands[self._replay_command_index][0] <= self.time
+        ):
+            _, channel, plane_id, payload = commands[self._replay_command_index]
+            plan = Recording.decode_plan(payload) if payload is not None else None
+            self._command_plane(channel, plane_id, plan=plan)
+            self._replay_command_index += 1
+
+    def _replay_spawns(self):
+        """Spawns the recorded planes due by the current simulation time."""
+        spawns = self._replay.spawns
+        while (
+            self._replay_spawn_index < len(spawns)
+            and spawns[self._replay_spawn_index][0] <= self.time
+        ):
+            _, callsign, x, y, heading = spawns[self._replay_spawn_index]
+            self.spawn_plane(
+                callsign=callsign,
+                spawn_position=Vector2(x, y),
+                spawn_heading=heading,
+            )
+            self._replay_spawn_index += 1
+
+    def transmit_telemetry_frame(self):
+        """Collects the telemetry of every plane due to transmit into a single frame
+        and posts it to the telemetry frame channel."""
+        if self.fleet is not None:
+            rows = self.fleet.poll_transmit(self.time)
+            plane_ids = rows  # fleet rows are plane handles
+            positions = self.fleet.position[rows]
+            velocities = self.fleet.get_velocity(rows)
+            statuses = self.fleet.status[rows]
+        else:
+            planes = [plane for plane in self.planes if plane.poll_transmit(self.time)]
+            plane_ids = np.array([plane.id for plane in planes], dtype=np.int64)
+            positions = np.array([tuple(plane.position) for plane in planes])
+            velocities = np.array([tuple(plane.get_velocity()) for plane in planes])
+            statuses = np.array(
+                [STATUS_CODES[plane.status] for plane in planes], dtype=np.int8
+            )
+
+        if not len(plane_ids):
+            return
+
+        frame = TelemetryFrame(
+            time=self.time,
+            plane_ids=plane_ids,
+            positions=positions.reshape(-1, 2),
+            velocities=velocities.reshape(-1, 2),
+            statuses=statuses,
+        )
+        event_frame = pygame.event.Event(self.events["TELEMETRYFRAME"], frame=frame)
+        pygame.event.post(event_frame)
+
+    def step(self):
+        """Handles pending simulation events and advances the simulation by one frame.
+        Used to drive the simulation when headless."""
+        self.profiler.start_frame(planes=len(self.planes))
+        with self.profiler.phase("events"):
+            events = pygame.event.get()
+            for event in events:
+                self.handle_event(event)
+            if self._replay is not None:
+                self._replay_commands()
+        self.profiler.count_events(events)
+        self.update()
+
+    def simulate(self, duration):
+        """Runs the headless simulation for a span of simulated time, as fast as
+            possible.
+
+        Args:
+            duration (float): Simulated time to advance by in seconds.
+        """
+        if self.recording is not None:
+            self.recording.timestep = self.timestep
+        time_end = self.time + duration * 1000
+        while self.time < time_end:
+            self.step()
+
+    @classmethod
+    def replay(cls, recording, duration=None, **kwargs):
+        """Replays a recorded run headless, as fast as possible.
+
+        Args:
+            recording (aatc.recording.Recording or pathlib.Path): The recording, or a
+                file to load it from.
+            duration (float, optional): Simulated time to replay in sec. Defaults to
+                the duration of the recorded run.
+            **kwargs: Extra keyword arguments passed to the game engine.
+
+        Returns:
+            GameEngine: The game engine at the end of the replay.
+        """
+        if not isinstance(recording, Recording):
+            recording = Recording.load(recording)
+
+        GE = cls(headless=True, seed=recording.seed, replay=recording, **kwargs)
+        GE.timestep = recording.timestep
+        if duration is None:
+            while GE.time < recording.time_end:
+                GE.step()
+        else:
+            GE.simulate(duration)
+
+        return GE
 
     def update(self):
         """Executes the per-frame logic of the simulation."""
-        time = pygame.time.get_ticks()
+        with self.profiler.phase("update"):
+            self._update()
+
+    def _update(self):
+        if self.headless:
+            dt = self.timestep
+            self.time += dt * 1000
+        else:
+            dt = self.clock.get_time() * 10 ** -3
+            self.time = pygame.time.get_ticks()
+
+        if self.recording is not None:
+            self.recording.time_end = self.time
 
         # spawn plane
-        if (
+        if self._replay is not None:
+            self._replay_spawns()
+        elif (
             self.spawn_planes is True
-            and time
+            and self.time
             >= self._spawn_planes_time_prev + self._spawn_planes_interval * 1000
         ):
             self.spawn_plane()
-            self._spawn_planes_time_prev = time
+            self._spawn_planes_time_prev = self.time
 
             self._spawn_planes_interval = self._get_spawn_interval()
             LOG.debug(f"Spawning next plane in {self._spawn_planes_interval}s")
 
         # update planes
-        for plane in self.planes:
-            plane.position += plane.get_velocity() * (
-                self.clock.get_time() * 10 ** -3
-            )  # apply physics
-            plane.update()
+        if self.fleet is not None:
+            rows_landed = self.fleet.navigate(dt)  # steer the whole fleet at once
+            self.fleet.step(dt)  # apply physics to the whole fleet at once
+            planes_landed = rows_landed.tolist()  # fleet rows are plane handles
+        else:
+            planes_landed = []
+            for plane in self.planes:
+                if plane.navigate(dt):
+                    planes_landed.append(plane.id)
+                plane.position += plane.get_velocity() * dt  # apply physics
+        for plane_id in planes_landed:
+            self.land_plane(plane_id)
+
+        if self.telemetry_batching:
+            self.transmit_telemetry_frame()
+        else:
+            for plane in self.planes:
+                plane.update(self.time)
+
+        # detect losses of separation
+        conflicts_new = self.conflict_detector.update(
+            plane_ids=[plane.id for plane in self.planes],
+            positions=self.get_plane_positions(),
+        )
+        for plane_id_a, plane_id_b in conflicts_new:
+            LOG.warning(
+                "Planes '%s' and '%s' lost separation",
+                self.handles.get_callsign(plane_id_a),
+                self.handles.get_callsign(plane_id_b),
+            )
+        if conflicts_new:
+            self.separation_losses += len(conflicts_new)
+            self.play_audio(self.plane_crash_audio)
+
+        self.call_controller("update", self.time, droppable=True)
+        if self.atc_worker is not None:
+            self.atc_worker.poll()  # deliver the commands the controller published
 
     def draw(self):
         """Draw gameobjects and other graphical elements to the scene."""
-        self.screen.fill(self.screen_color)
-
-        self.atc_zone.draw(
-            surface=self.screen,
-            position=self.vector_to_screen((0, 0)),
-            scale=self.screen_scale,
-        )
-
-        for plane in self.planes:
-            plane.draw(
-                surface=self.screen,
-                position=self.vector_to_screen(plane.position),
-                scale=self.screen_scale,
-            )
-            if self.draw_gizmos:  # draw the plane's protected radius
-                pygame.draw.circle(
-                    surface=self.screen,
-                    color=(0, 0, 255),
-                    center=self.vector_to_screen(plane.position),
-                    radius=self.plane_protected_radius * self.screen_scale,
-                    width=1,
-                )
-
-        for runway in self.runways:
-            runway.draw(
-                surface=self.screen,
-                position_start=self.vector_to_screen(runway.entry_coord),
-                position_end=self.vector_to_screen(runway.exit_coord),
-            )
+        with self.profiler.phase("draw"):
+            self.renderer.draw()
 
-        if self.draw_gizmos:
+            self.assets.end_frame()
 
-            for path in self.atc.paths:  # draw path lines
-                waypoints_tranformed = [
-                    self.vector_to_screen(waypoint) for waypoint in path.waypoints
-                ]
-                path.draw(
-                    surface=self.screen,
-                    waypoints_tranformed=waypoints_tranformed,
-                    scale=self.screen_scale,
-                )
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = time.perf_counter() - aatc.IMPORT_TIME
+            LOG.info(f"First frame drawn {self.time_to_first_frame:.3f}s after import")
 
-        pygame.display.flip()
-        self.clock.tick(self.screen_fps)
+        if not self.headless:
+            with self.profiler.phase("idle"):  # waiting on the frame rate cap
+                self.clock.tick(self.screen_fps)
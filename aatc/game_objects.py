@@ -2,33 +2,139 @@
 # stdlib
 import logging
 import math
+from collections import OrderedDict
 
 # external
 import numpy as np
 import pygame
 from pygame.math import Vector2
 
+# project
+from aatc.fleet import FleetAttribute
+from aatc.log import allow
+
 LOG = logging.getLogger(__name__)
 
 
+class GlyphCache:
+    """Bounded cache of a polygon rotated to headings and scaled to the screen, so that
+        drawing it is a single offset add.
+
+    Headings are quantized to a fixed resolution, and glyphs are evicted least recently
+    used first. The cache is cleared whenever it is asked for a new screen scale.
+
+    Args:
+        shape (list(pygame.Vector2)): Polygon points at heading 0, in km.
+        resolution (float, optional): Heading quantization in degrees. Defaults to 1.
+        size (int, optional): Max number of glyphs to keep. Defaults to 360.
+    """
+
+    def __init__(self, shape, resolution=1, size=360):
+        self.shape = np.array([tuple(point) for point in shape], dtype=float)
+        self.resolution = resolution
+        self.size = size
+        self.scale = None
+        self.hits = 0
+        self.misses = 0
+
+        self._glyphs = OrderedDict()  # quantized heading: polygon offsets
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def get(self, heading, scale):
+        """Retrieves the glyph for a heading and screen scale, building it if needed.
+
+        Args:
+            heading (num): Heading in degrees.
+            scale (num): Screen scale factor.
+
+        Returns:
+            numpy.ndarray: Polygon offsets from the position in screen coordinates, of
+                shape (points, 2).
+        """
+        if scale != self.scale:  # zoomed
+            self._glyphs.clear()
+            self.scale = scale
+
+        steps = round(360 / self.resolution)
+        key = round(heading / self.resolution) % steps
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self._glyphs.move_to_end(key)
+            self.hits += 1
+            return glyph
+
+        self.misses += 1
+        angle = math.radians(-1 * key * self.resolution + 180)
+        rotation = np.array(
+            [
+                [math.cos(angle), math.sin(angle)],
+                [-1 * math.sin(angle), math.cos(angle)],
+            ]
+        )  # rotates row vectors counterclockwise, like pygame.Vector2.rotate
+        glyph = self.shape @ rotation * scale
+        if len(self._glyphs) >= self.size:
+            self._glyphs.popitem(last=False)
+        self._glyphs[key] = glyph
+
+        return glyph
+
+
 class Plane:
     """The plane game object. Handles flight, telemetry, and path-following logic.
 
     Args:
-        plane_id (str): Unique ID to assign the plane.
+        plane_id (int): Handle to assign the plane, see `aatc.identity.PlaneHandles`.
         position (pygame.Vector2): Initial position.
         heading (num): Initial heading in degrees. From 0 to 360, where 0 is due north,
             increasing counterclockwise.
         channels (dict): Dictionary of pygame channel event codes.
+        callsign (str, optional): Display callsign of the plane. Defaults to the
+            handle.
     """
 
-    def __init__(self, plane_id, position, heading, channels):
+    SPEED = 0.140  # km/s
+    TURN_RATE = 0.1  # °/s
+
+    color = (0, 255, 0)
+    shape = (Vector2(-0.1, 0), Vector2(0, 0.2), Vector2(0.1, 0))  # km
+    glyphs = GlyphCache(shape)  # shared by every plane
+
+    position = FleetAttribute()
+    heading = FleetAttribute()
+    speed = FleetAttribute()
+    status = FleetAttribute()
+    transmit = FleetAttribute()
+    transmit_frequency = FleetAttribute()
+    transmit_time_prev = FleetAttribute()
+    turn_rate = FleetAttribute()
+    plan = FleetAttribute()
+    waypoint_index = FleetAttribute()
+
+    _fleet_attributes = (
+        "position",
+        "heading",
+        "speed",
+        "status",
+        "transmit",
+        "transmit_frequency",
+        "transmit_time_prev",
+        "turn_rate",
+        "plan",
+        "waypoint_index",
+    )
+
+    def __init__(self, plane_id, position, heading, channels, callsign=None):
+        self._fleet = None
+        self._fleet_row = None
+
         # region config
         self.id = plane_id
-        self.color = (0, 255, 0)
+        self.callsign = str(plane_id) if callsign is None else callsign
         self.position = Vector2(position)
-        self.speed = 0.140  # km/s
-        self.turn_rate = 0.1  # °/s
+        self.speed = self.SPEED
+        self.turn_rate = self.TURN_RATE
         self.heading = heading
         self.status = (
             "CRUISING"  # one of "CRUISING", "NAVIGATING", "HOLDING", "LANDING"
@@ -36,16 +142,40 @@ class Plane:
         self.channels = channels
         self.transmit_frequency = 10  # Hz
         self.transmit = False
-        self.shape = [Vector2(-0.1, 0), Vector2(0, 0.2), Vector2(0.1, 0)]
-        self._transmit_time_prev = 0
+        self.transmit_time_prev = 0  # msec
+        self.plan = None  # flight plan being followed
+        self.waypoint_index = 0  # index of the next waypoint of the flight plan
+        self.entry_direction = Vector2()  # approach to the plan's first waypoint
         # endregion
 
         self.request_connection()
 
     def __str__(self):
-        return f"""Plane '{self.id}'\n\tPos: {self.position}\n\tHead: {self.heading}rad
+        return f"""Plane '{self.callsign}'\n\tPos: {self.position}\n\tHead: {self.heading}rad
         \n\tVel: {self.get_velocity()}"""
 
+    def attach(self, fleet):
+        """Move the plane's kinematic and transmit state into a fleet row. The plane
+            then acts as a view over that row.
+
+        Args:
+            fleet (aatc.fleet.Fleet): The fleet to attach to.
+        """
+        state = {name: getattr(self, name) for name in self._fleet_attributes}
+        self._fleet_row = fleet.add(plane_id=self.id, **state)
+        self._fleet = fleet
+
+    def detach(self):
+        """Copy the plane's state out of its fleet row and free the row."""
+        if self._fleet is None:
+            return
+        fleet, row = self._fleet, self._fleet_row
+        state = {name: getattr(self, name) for name in self._fleet_attributes}
+        self._fleet, self._fleet_row = None, None
+        fleet.remove(row)
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def get_velocity(self):
         """Calculate the velocity of the plane.
 
@@ -61,45 +191,136 @@ class Plane:
         )
 
     def request_connection(self):
-        """Send connection event to ATC with plane's ID."""
-        LOG.info(f"Plane '{self.id}' requesting connection with ATC.")
+        """Send connection event to ATC with plane's handle and callsign."""
+        LOG.info(f"Plane '{self.callsign}' requesting connection with ATC.")
         event_connection = pygame.event.Event(
-            self.channels["CONNECTIONREQUEST"], plane_id=self.id
+            self.channels["CONNECTIONREQUEST"],
+            plane_id=self.id,
+            callsign=self.callsign,
         )
         pygame.event.post(event_connection)
 
-    def transmit_telemetry(self):
-        """Post plane telemetry to telemetry channel."""
+    def transmit_telemetry(self, time):
+        """Post plane telemetry to telemetry channel.
+
+        Args:
+            time (num): Current simulation time in msec.
+        """
+        telemetry = {
+            "time": time,
+            "position": self.position,
+            "velocity": self.get_velocity(),
+            "status": self.status,
+        }
         transmit_event = pygame.event.Event(
-            self.channels["TELEMETRY"],
-            plane_id=self.id,
-            telemetry={"position": self.position, "status": self.status},
+            self.channels["TELEMETRY"], plane_id=self.id, telemetry=telemetry
         )
-        LOG.debug(f"Plane '{self.id}' transmitting telemetry: {transmit_event}.")
+        if LOG.isEnabledFor(logging.DEBUG) and allow("telemetry"):
+            LOG.debug(
+                "Plane '%s' transmitting telemetry at %s msec: position %s, status %s.",
+                self.callsign,
+                time,
+                telemetry["position"],
+                telemetry["status"],
+            )
 
         pygame.event.post(transmit_event)
 
     def receive_flight_plan(self, plan):
-        raise NotImplementedError()
+        """Store a flight plan, to be followed from its first waypoint. The first
+            waypoint is approached from the plane's current position.
 
-    def navigate(self):
-        raise NotImplementedError()
+        Args:
+            plan (aatc.game_objects.Path): The flight plan.
+        """
+        LOG.info(f"Plane '{self.callsign}' received flight plan.")
+        self.plan = plan
+        self.waypoint_index = 0
+        offset = Vector2(*plan.points[0]) - self.position
+        self.entry_direction = (
+            offset.normalize() if offset.length_squared() > 0 else Vector2()
+        )
+
+    def navigate(self, dt):
+        """Steer the plane for one timestep. Navigating planes turn towards the next
+            waypoint of their flight plan, and holding planes circle at their turn
+            rate. Follows the same rules as `aatc.fleet.Fleet.navigate`.
+
+        Args:
+            dt (float): Timestep in seconds.
+
+        Returns:
+            bool: Whether the plane reached the last waypoint of its flight plan.
+        """
+        if self.status == "HOLDING":
+            self.heading = (self.heading + self.turn_rate * dt) % 360
+            return False
+        if self.status != "NAVIGATING":
+            return False
+
+        plan = self.plan
+        offset = Vector2(*plan.points[self.waypoint_index]) - self.position
+        entry_direction = (
+            self.entry_direction
+            if self.waypoint_index == 0
+            else Vector2(*plan.entry_directions[self.waypoint_index])
+        )
+        if offset.length_squared() <= plan.radius ** 2 or (
+            offset.dot(entry_direction) < 0
+        ):  # reached or passed the waypoint
+            self.waypoint_index += 1
+            if self.waypoint_index == len(plan.points):
+                self.status = "LANDING"
+                return True
+            offset = Vector2(*plan.points[self.waypoint_index]) - self.position
+
+        heading_target = math.degrees(math.atan2(-1 * offset.x, offset.y))
+        turn = (heading_target - self.heading + 180) % 360 - 180
+        turn_max = self.turn_rate * dt
+        self.heading = (self.heading + max(-turn_max, min(turn_max, turn))) % 360
+
+        return False
 
     def hold(self):
-        raise NotImplementedError()
+        """Stop following the flight plan and circle in place."""
+        LOG.info(f"Plane '{self.callsign}' holding.")
+        self.status = "HOLDING"
+
+    def poll_transmit(self, time):
+        """Check whether the plane is due to transmit telemetry, and if so, reset its
+            transmit timer.
 
-    def update(self):
-        """Schedule and execute telemtry updates."""
-        time = pygame.time.get_ticks()
+        Args:
+            time (num): Current simulation time in msec.
+
+        Returns:
+            bool: Whether telemetry is due.
+        """
         if (
             self.transmit
-            and time >= self._transmit_time_prev + (1 / self.transmit_frequency) * 1000
+            and time >= self.transmit_time_prev + (1 / self.transmit_frequency) * 1000
         ):
-            self.transmit_telemetry()
-            self._transmit_time_prev = time
+            self.transmit_time_prev = time
+            return True
+        return False
+
+    def update(self, time):
+        """Schedule and execute telemtry updates.
 
-    def follow_plan(self):
-        raise NotImplementedError()
+        Args:
+            time (num): Current simulation time in msec.
+        """
+        if self.poll_transmit(time):
+            self.transmit_telemetry(time)
+
+    def follow_plan(self, plan):
+        """Receive a flight plan and start navigating along it.
+
+        Args:
+            plan (aatc.game_objects.Path): The flight plan.
+        """
+        self.receive_flight_plan(plan)
+        self.status = "NAVIGATING"
 
     def draw(self, surface, position, scale):
         """Render plane game object on screen.
@@ -108,14 +329,13 @@ class Plane:
             surface (pygame.Surface): The pygame window on which to render the plane.
             position (Vector2): Plane position in screen coordinates.
             scale (num): screen scale factor.
+
+        Returns:
+            pygame.Rect: Area of the surface drawn over.
         """
-        shape_oriented = np.array(
-            [point.rotate(-1 * self.heading + 180) for point in self.shape]
-        )  # rotate plane shape to heading
-        shape_scaled = shape_oriented * scale
-        shape_translated = shape_scaled + position
+        shape_translated = self.glyphs.get(self.heading, scale) + position
 
-        pygame.draw.polygon(
+        return pygame.draw.polygon(
             surface=surface,
             color=self.color,
             points=shape_translated,
@@ -183,6 +403,14 @@ class Path:
     """The Path object is a convenience class for keeping track of a series of
         waypoints.
 
+    The waypoints are also stored as arrays of the path's segments, which
+    path-following reads from: `points` of shape (n, 2), the unit `directions` and
+    `lengths` of the n - 1 segments, the cumulative `distances` along the path to each
+    waypoint, and the `entry_directions` along which each waypoint is approached. A
+    plane has passed a waypoint once it is ahead of it along its entry direction.
+    Planes approach the first waypoint from wherever they received the path instead,
+    so that single waypoint paths can be passed too.
+
     Args:
         waypoints (list(pygame.Vector2)): List of waypoints coordinates which comprise
             the path, in order.
@@ -191,11 +419,28 @@ class Path:
     """
 
     def __init__(self, waypoints, radius=0.1):
-
         self.waypoints = waypoints
         self.radius = radius
         self.color = (0, 0, 255)
 
+        self.points = np.array(
+            [tuple(waypoint) for waypoint in waypoints], dtype=float
+        ).reshape(-1, 2)
+        segments = np.diff(self.points, axis=0)
+        self.lengths = np.hypot(segments[:, 0], segments[:, 1])
+        self.directions = np.divide(
+            segments,
+            self.lengths[:, None],
+            out=np.zeros_like(segments),
+            where=self.lengths[:, None] > 0,
+        )
+        self.distances = np.concatenate(([0], np.cumsum(self.lengths)))
+        self.entry_directions = np.concatenate(
+            (self.directions[:1], self.directions)
+        )  # the first waypoint is approached along the first segment
+        if len(self.entry_directions) < len(self.points):  # single waypoint
+            self.entry_directions = np.zeros_like(self.points)
+
     def draw(self, surface, waypoints_tranformed, scale):
         """Render path game object on screen.
 
@@ -0,0 +1,117 @@
+"""Module for issuing plane identities."""
+# stdlib
+import logging
+import string
+import sys
+from collections import deque
+
+LOG = logging.getLogger(__name__)
+
+CALLSIGN_CHARS = string.ascii_uppercase + string.digits
+
+
+class PlaneHandles:
+    """Issues each plane a dense integer handle, which the simulation and the
+        controller index their per-plane tables and arrays by, and a unique display
+        callsign.
+
+    Released handles are reissued first in first out, and only once more than
+    `quarantine` handles are free, so that a handle is not reused while messages
+    addressed to its previous plane may still be in flight. Handles therefore stay
+    below the peak number of planes plus `quarantine`.
+
+    Callsigns are drawn without collisions or retries: the n-th callsign spells out
+    `(n * multiplier + offset) % len(CALLSIGN_CHARS) ** size`, a permutation of the
+    callsign space, so callsigns look random but never repeat until the space of
+    36^6, over two billion callsigns by default, is exhausted. Callsigns are interned.
+
+    Args:
+        size (int, optional): Number of characters per callsign. Defaults to 6.
+        rng (numpy.random.Generator, optional): Random number generator to draw the
+            callsign permutation from. Defaults to the identity permutation.
+        quarantine (int, optional): Number of free handles kept back from reuse.
+            Defaults to 16.
+    """
+
+    def __init__(self, size=6, rng=None, quarantine=16):
+        self.size = size
+        self.quarantine = quarantine
+        self.space = len(CALLSIGN_CHARS) ** size
+
+        self.callsigns = []  # handle: callsign of the plane holding it, or None
+        self.issued = 0  # callsigns issued
+
+        self._multiplier, self._offset = 1, 0
+        if rng is not None:
+            # any multiplier coprime with the space, 2^12 * 3^12 by default, permutes it
+            multiplier = int(rng.integers(self.space // 3, self.space)) | 1
+            while multiplier % 3 == 0:
+                multiplier += 2
+            self._multiplier = multiplier % self.space
+            self._offset = int(rng.integers(self.space))
+        self._free = deque()  # released handles, oldest first
+
+    def __len__(self):
+        return len(self.callsigns) - len(self._free)
+
+    def generate_callsign(self):
+        """Generates the next callsign.
+
+        Returns:
+            str: The callsign.
+        """
+        if self.issued == self.space:
+            raise RuntimeError(f"All {self.space} callsigns were issued")
+
+        number = (self.issued * self._multiplier + self._offset) % self.space
+        self.issued += 1
+        chars = []
+        for _ in range(self.size):
+            number, digit = divmod(number, len(CALLSIGN_CHARS))
+            chars.append(CALLSIGN_CHARS[digit])
+
+        return sys.intern("".join(reversed(chars)))
+
+    def allocate(self, callsign=None):
+        """Issues a handle to a new plane.
+
+        Args:
+            callsign (str, optional): Callsign of the plane. Defaults to a generated
+                callsign.
+
+        Returns:
+            int: The handle.
+        """
+        if callsign is None:
+            callsign = self.generate_callsign()
+        else:
+            callsign = sys.intern(callsign)
+
+        if len(self._free) > self.quarantine:
+            handle = self._free.popleft()
+            self.callsigns[handle] = callsign
+        else:
+            handle = len(self.callsigns)
+            self.callsigns.append(callsign)
+
+        return handle
+
+    def release(self, handle):
+        """Returns a plane's handle for reuse.
+
+        Args:
+            handle (int): The handle.
+        """
+        self.callsigns[handle] = None
+        self._free.append(handle)
+
+    def get_callsign(self, handle):
+        """Retrieves the callsign of the plane holding a handle.
+
+        Args:
+            handle (int): The handle.
+
+        Returns:
+            str: The callsign, or None if the handle is free.
+        """
+        return self.callsigns[handle]
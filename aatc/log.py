@@ -0,0 +1,176 @@
+"""Module for the non-blocking logging pipeline."""
+# stdlib
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+
+LOG = logging.getLogger(__name__)
+
+FORMAT = "%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# pass as `extra` to tag a record with a rate limited category
+TELEMETRY = {"category": "telemetry"}
+
+_rate_limiter = None  # shared by `allow` and the filter set up by configure_logging
+
+
+class RateLimiter:
+    """Token bucket rate limits per category, so that high frequency log sites can stay
+        enabled without flooding the log.
+
+    Each limited category allows at most `burst` records at once, refilled at `rate`
+    records per second, and counts the records it drops. Unlimited categories are
+    always allowed.
+
+    Args:
+        rates (dict): Records per second allowed for each limited category.
+        burst (int, optional): Number of records allowed at once before limiting.
+            Defaults to 10.
+    """
+
+    def __init__(self, rates, burst=10):
+        self.rates = dict(rates)
+        self.burst = burst
+        self.suppressed = {category: 0 for category in self.rates}
+
+        self._tokens = {category: float(burst) for category in self.rates}
+        self._time_prev = {category: time.monotonic() for category in self.rates}
+        self._lock = threading.Lock()  # checked from the logging threads
+
+    def allow(self, category):
+        """Takes a token from a category's bucket, if it has one.
+
+        Args:
+            category (str): Category of the record, or None.
+
+        Returns:
+            bool: Whether the record is allowed.
+        """
+        rate = self.rates.get(category)
+        if rate is None:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(
+                self.burst,
+                self._tokens[category] + (now - self._time_prev[category]) * rate,
+            )
+            self._time_prev[category] = now
+            if tokens < 1:
+                self._tokens[category] = tokens
+                self.suppressed[category] += 1
+                return False
+            self._tokens[category] = tokens - 1
+
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Rate limits log records per category, for records tagged with a category
+        through the `extra` argument of the logging call, e.g.
+        `LOG.debug("...", extra=TELEMETRY)`. Untagged records always pass.
+
+    The record and its arguments are built before a filter runs, so hot log sites
+    should check `allow` before the logging call instead.
+
+    Args:
+        rates (dict): Records per second passed for each limited category.
+        burst (int, optional): Number of records passed at once before limiting.
+            Defaults to 10.
+        limiter (RateLimiter, optional): Limiter to share. Defaults to a new one
+            from `rates` and `burst`.
+    """
+
+    def __init__(self, rates=None, burst=10, limiter=None):
+        super().__init__()
+        self.limiter = RateLimiter(rates, burst) if limiter is None else limiter
+
+    @property
+    def suppressed(self):
+        """dict: Number of records dropped per limited category."""
+        return self.limiter.suppressed
+
+    def filter(self, record):
+        return self.limiter.allow(getattr(record, "category", None))
+
+
+def allow(category):
+    """Checks the rate limit of a category before a record is created, so that
+        records over the limit cost no record, argument evaluation or formatting.
+        Check the level first, so that disabled records take no tokens:
+
+        `if LOG.isEnabledFor(logging.DEBUG) and allow("telemetry"): LOG.debug(...)`
+
+    Args:
+        category (str): Category of the record.
+
+    Returns:
+        bool: Whether the record is allowed, always True before `configure_logging`.
+    """
+    if _rate_limiter is None:
+        return True
+
+    return _rate_limiter.allow(category)
+
+
+class _QueueListener(QueueListener):
+    def stop(self):
+        if self._thread is not None:  # may be stopped before exit
+            super().stop()
+
+
+def configure_logging(path=None, level=logging.INFO, rates=None, stdout=True):
+    """Routes every log record through a queue to a background writer thread, so that
+        logging never blocks the frame loop on file or console output.
+
+    The calling thread only filters, formats and enqueues records, and the writer
+    thread does the file and console output. Lazily formatted records
+    (`LOG.debug("%s", value)`) are only formatted once they pass the level check and
+    the rate limits, so that disabled and dropped records cost next to nothing. Hot
+    log sites check the rate limits with `allow` before logging, to skip building
+    records altogether.
+
+    Args:
+        path (pathlib.Path, optional): Path of the log file, overwritten if it exists.
+            Defaults to no log file.
+        level (int, optional): Level of the root logger. Defaults to logging.INFO.
+        rates (dict, optional): Records per second passed for each rate limited
+            category, see `RateLimiter`. Defaults to 10 telemetry records per sec.
+        stdout (bool, optional): Whether to also log to stdout. Defaults to True.
+
+    Returns:
+        logging.handlers.QueueListener: The started writer, stopped and flushed at
+            exit if not stopped before.
+    """
+    formatter = logging.Formatter(fmt=FORMAT, datefmt=DATE_FORMAT)
+    handlers = []
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.FileHandler(filename=path, mode="w"))
+    if stdout:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    global _rate_limiter
+    _rate_limiter = RateLimiter(rates if rates is not None else {"telemetry": 10})
+
+    records = queue.SimpleQueue()
+    handler_queue = QueueHandler(records)
+    handler_queue.addFilter(RateLimitFilter(limiter=_rate_limiter))
+    listener = _QueueListener(records, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler_queue)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
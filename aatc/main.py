@@ -1,5 +1,6 @@
 """Main program entry script."""
 # stdlib
+import argparse
 import logging
 import sys
 from pathlib import Path
@@ -9,114 +10,138 @@ import pygame
 
 # project
 from aatc import game
-
-# region log config
-log_path = Path("logs/main")
-log_path.mkdir(parents=True, exist_ok=True)
-handler_file = logging.FileHandler(
-    filename=(log_path / Path(__file__).stem).with_suffix(".log"), mode="w"
-)
-handler_stdout = logging.StreamHandler(sys.stdout)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[handler_file, handler_stdout],
-)
+from aatc.log import configure_logging
 
 LOG = logging.getLogger(__name__)
-# endregion
 
+LOG_PATH = Path("logs/main")
 
-def run():
-    """Run the simulator."""
 
-    GE = game.GameEngine()
+def run(args=None):
+    """Run the simulator."""
+    parser = argparse.ArgumentParser(description="Run the air traffic simulator.")
+    parser.add_argument(
+        "--record-telemetry",
+        type=Path,
+        default=None,
+        help="file to record the telemetry received by the controller to",
+    )
+    args = parser.parse_args(args)
+
+    log_listener = configure_logging(
+        path=(LOG_PATH / Path(__file__).stem).with_suffix(".log"), level=logging.INFO
+    )
+
+    GE = game.GameEngine(controller_thread=True, record_telemetry=args.record_telemetry)
+    event_queue = []
+
+    # region event handlers
+    def quit_simulation(event):
+        GE.close(timeout=1)  # stop the controller and finish the telemetry file
+        log_listener.stop()  # flush the log
+        pygame.quit()
+        sys.exit()
+
+    def handle_keydown(event):
+        handler = key_handlers.get(event.key)
+        if handler is not None:
+            handler()
+
+    def print_atc_state():
+        GE.call_controller("log_state")  # read on the controller's thread
+        LOG.info(f"Controller worker: {GE.atc_worker.get_metrics()}")
+        GE.play_audio(GE.user_interact_audio)
+
+    def toggle_pause():
+        GE.paused = not GE.paused
+        LOG.info(f"Simulation paused: {GE.paused}")
+        GE.play_audio(GE.user_interact_audio)
+
+    def toggle_gizmos():
+        GE.draw_gizmos = not GE.draw_gizmos
+        LOG.info(f"Drawing gizmos: {GE.draw_gizmos}")
+        GE.play_audio(GE.user_interact_audio)
+
+    def print_event_queue():
+        LOG.debug("Event queue: %s", event_queue)
+        GE.play_audio(GE.user_interact_audio)
+
+    def print_frame_times():
+        LOG.info(
+            f"Planes drawn: {GE.renderer.planes_drawn}, mean frame time per level of "
+            f"detail (msec): {GE.renderer.get_frame_times()}"
+        )
+        GE.play_audio(GE.user_interact_audio)
+
+    def toggle_bulk_rendering():
+        GE.renderer.bulk = not GE.renderer.bulk
+        LOG.info(f"Bulk rendering: {GE.renderer.bulk}")
+        GE.play_audio(GE.user_interact_audio)
+
+    def toggle_profiler():
+        GE.draw_profiler = not GE.draw_profiler
+        LOG.info(f"Drawing frame profiler: {GE.draw_profiler}")
+        GE.play_audio(GE.user_interact_audio)
+
+    def export_profile():
+        GE.profiler.export(LOG_PATH / "frames.csv")
+        GE.play_audio(GE.user_interact_audio)
+
+    def debug():
+        GE.call_controller("log_next_landing")  # read on the controller's thread
+        GE.play_audio(GE.user_interact_audio)
+
+    def pan(axis, direction, name):
+        def handler():
+            LOG.debug(f"Panning {name}")
+            GE.origin[axis] += direction * GE.pan_amount * GE.screen_scale
+
+        return handler
+
+    def zoom(direction, name):
+        def handler():
+            LOG.debug(f"{name} zoom")
+            GE.screen_scale += direction * GE.zoom_amount
+
+        return handler
+
+    key_handlers = {
+        pygame.K_F1: print_atc_state,
+        pygame.K_F2: toggle_pause,
+        pygame.K_F3: toggle_gizmos,
+        pygame.K_F4: print_event_queue,
+        pygame.K_F5: print_frame_times,
+        pygame.K_F6: toggle_bulk_rendering,
+        pygame.K_F7: toggle_profiler,
+        pygame.K_F8: export_profile,
+        pygame.K_F12: debug,
+        pygame.K_UP: pan(axis=1, direction=1, name="up"),
+        pygame.K_DOWN: pan(axis=1, direction=-1, name="down"),
+        pygame.K_LEFT: pan(axis=0, direction=1, name="left"),
+        pygame.K_RIGHT: pan(axis=0, direction=-1, name="right"),
+        pygame.K_KP_PLUS: zoom(direction=1, name="Incrementing"),
+        pygame.K_KP_MINUS: zoom(direction=-1, name="Decrementing"),
+    }
+
+    event_handlers = {
+        pygame.QUIT: quit_simulation,
+        pygame.KEYDOWN: handle_keydown,
+        **GE.event_handlers,
+    }
+    # endregion
 
     while True:
 
+        GE.profiler.start_frame(planes=len(GE.planes))
+
         # region event handling
-        event_queue = pygame.event.get()
-        for event in event_queue:
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_F1:  # print ATC state
-                    LOG.info(GE.atc)
-                    GE.play_audio(GE.user_interact_audio)
-
-                elif event.key == pygame.K_F2:  # pause simulation
-                    GE.paused = not GE.paused
-                    LOG.info(f"Simulation paused: {GE.paused}")
-                    GE.play_audio(GE.user_interact_audio)
-
-                elif event.key == pygame.K_F3:  # toggle gizmos
-                    GE.draw_gizmos = not GE.draw_gizmos
-                    LOG.info(f"Drawing gizmos: {GE.draw_gizmos}")
-                    GE.play_audio(GE.user_interact_audio)
-
-                elif event.key == pygame.K_F4:  # print pygame event queue
-                    LOG.debug(f"Event queue: {event_queue}")
-                    GE.play_audio(GE.user_interact_audio)
-
-                elif event.key == pygame.K_F12:  # debug function
-                    plane_id = GE.atc.queue[0]
-                    runway_id = GE.atc.get_nearest_open_runway_to_plane(plane_id)
-                    LOG.info(f"Nearest open runway: {runway_id}")
-                    GE.play_audio(GE.user_interact_audio)
-
-                elif event.key == pygame.K_UP:  # pan up
-                    LOG.debug("Panning up")
-                    GE.origin[1] += GE.pan_amount * GE.screen_scale
-
-                elif event.key == pygame.K_DOWN:  # pan down
-                    LOG.debug("Panning down")
-                    GE.origin[1] -= GE.pan_amount * GE.screen_scale
-
-                elif event.key == pygame.K_LEFT:  # pan left
-                    LOG.debug("Panning left")
-                    GE.origin[0] += GE.pan_amount * GE.screen_scale
-
-                elif event.key == pygame.K_RIGHT:  # pan right
-                    LOG.debug("Panning right")
-                    GE.origin[0] -= GE.pan_amount * GE.screen_scale
-
-                elif event.key == pygame.K_KP_PLUS:  # zoom in
-                    LOG.debug("Incrementing zoom")
-                    GE.screen_scale += GE.zoom_amount
-
-                elif event.key == pygame.K_KP_MINUS:  # zoom out
-                    LOG.debug("Decrementing zoom")
-                    GE.screen_scale -= GE.zoom_amount
-
-            elif event.type == GE.events["CONNECTIONREQUEST"]:
-                GE.atc.add_plane(event.plane_id)
-
-            elif event.type == GE.events["CONNECTIONCONFIRMATION"]:
-                plane = [plane for plane in GE.planes if plane.id == event.plane_id][
-                    0
-                ]  # TODO: find more efficient approach
-                plane.transmit = True
-
-            elif event.type == GE.events["TELEMETRY"]:
-                GE.atc.update_telemetry(event.plane_id, event.telemetry)
-
-            elif event.type == GE.events["FLIGHTPLAN"]:
-                plane = [plane for plane in GE.planes if plane.id == event.plane_id][
-                    0
-                ]  # TODO: find more efficient approach
-
-                plane.follow_plan(event.plan)
-
-            elif event.type == GE.events["HOLD"]:
-                plane = [plane for plane in GE.planes if plane.id == event.plane_id][
-                    0
-                ]  # TODO: find more efficient approach
-
-                plane.hold()
+        with GE.profiler.phase("events"):
+            event_queue = pygame.event.get()
+            for event in event_queue:
+                handler = event_handlers.get(event.type)
+                if handler is not None:
+                    handler(event)
+        GE.profiler.count_events(event_queue)
         # endregion
         if not GE.paused:
             GE.update()
@@ -0,0 +1,216 @@
+"""Module for generating flight plans."""
+# stdlib
+import logging
+import math
+from functools import lru_cache
+
+# external
+from pygame.math import Vector2
+
+# project
+from aatc.game_objects import Path, Plane
+
+LOG = logging.getLogger(__name__)
+
+
+def heading_to(vector):
+    """Calculates the heading of a vector.
+
+    Args:
+        vector (pygame.Vector2): Some 2D vector.
+
+    Returns:
+        float: Heading in degrees. From -180 to 180, where 0 is due north, increasing
+            counterclockwise.
+    """
+    return math.degrees(math.atan2(-1 * vector.x, vector.y))
+
+
+def heading_vector(heading):
+    """Calculates the unit vector pointing along a heading.
+
+    Args:
+        heading (num): Heading in degrees, where 0 is due north, increasing
+            counterclockwise.
+
+    Returns:
+        pygame.Vector2: Unit vector.
+    """
+    return Vector2(
+        -1 * math.sin(math.radians(heading)), math.cos(math.radians(heading))
+    )
+
+
+class FlightPlanner:
+    """Generates flight plans from a plane's position to a runway's entry coordinate.
+
+    Waypoints are laid out in legs of fixed length, turning towards the target by no
+    more than a plane can turn over one leg. Approaches from each sector of the ATC
+    zone ring to each runway are precomputed on first use and memoized, so that the
+    plan for a new arrival is a cached approach plus a short connecting leg onto it.
+    Every turn is bounded, so a target too close to turn towards in time is reached
+    by flying on until it can be intercepted.
+
+    Args:
+        runways (dict): The controller's dictionary of runways.
+        zone_radius (float, optional): Radius of the ATC zone in km. Defaults to 10.
+        sectors (int, optional): Number of sectors to divide the ATC zone ring into.
+            Defaults to 32.
+        speed (float, optional): Plane speed in km/s. Defaults to `Plane.SPEED`.
+        turn_rate (float, optional): Plane turn rate in °/s. Defaults to
+            `Plane.TURN_RATE`.
+        leg_length (float, optional): Distance between waypoints in km. Defaults
+            to 1.
+        cache_size (int, optional): Max number of approaches to keep cached. Defaults
+            to 128.
+    """
+
+    def __init__(
+        self,
+        runways,
+        zone_radius=10,
+        sectors=32,
+        speed=Plane.SPEED,
+        turn_rate=Plane.TURN_RATE,
+        leg_length=1.0,
+        cache_size=128,
+    ):
+        self.runways = runways
+        self.zone_radius = zone_radius
+        self.sectors = sectors
+        self.speed = speed
+        self.turn_rate = turn_rate
+        self.leg_length = leg_length
+        self.path_radius = 0.1  # km
+
+        self.get_approach = lru_cache(maxsize=cache_size)(self._build_approach)
+
+    @property
+    def turn_per_leg(self):
+        """float: Max heading change in degrees over one leg."""
+        return self.turn_rate * self.leg_length / self.speed
+
+    @property
+    def turn_radius(self):
+        """float: Radius of the tightest turn in km."""
+        return self.speed / math.radians(self.turn_rate)
+
+    def can_fly_to(self, position, heading, target):
+        """Checks whether a plane can fly straight to a target, turning onto it within
+            the turn it could make over the distance.
+
+        Args:
+            position (pygame.Vector2): Plane position.
+            heading (num): Plane heading in degrees.
+            target (pygame.Vector2): Target position.
+
+        Returns:
+            bool: Whether the leg to the target is within the plane's turn rate.
+        """
+        offset = target - position
+        turn = abs((heading_to(offset) - heading + 180) % 360 - 180)
+        return turn <= self.turn_per_leg * offset.length() / self.leg_length + 1e-9
+
+    def _steer(self, position, heading, target):
+        """Lays out waypoints from a position and heading to a target, limiting the
+            heading change of each leg. A target inside the circle of the tightest turn
+            towards it cannot be reached by turning, so the plane flies straight on
+            until it can be intercepted.
+
+        Args:
+            position (pygame.Vector2): Start position.
+            heading (num): Start heading in degrees.
+            target (pygame.Vector2): Target position.
+
+        Returns:
+            list(pygame.Vector2): Waypoints after the start position, ending with the
+                target.
+        """
+        waypoints = []
+        # enough legs to cross the zone twice and make a full turn
+        legs_max = math.ceil(
+            4 * self.zone_radius / self.leg_length + 360 / self.turn_per_leg
+        )
+        for _ in range(legs_max):
+            if self.can_fly_to(position, heading, target):
+                break
+            offset = target - position
+            turn = (heading_to(offset) - heading + 180) % 360 - 180
+            center = (
+                position
+                + heading_vector(heading + math.copysign(90, turn)) * self.turn_radius
+            )
+            if (target - center).length() >= self.turn_radius:
+                heading += max(-self.turn_per_leg, min(self.turn_per_leg, turn))
+            position = position + heading_vector(heading) * self.leg_length
+            waypoints.append(position)
+        else:
+            LOG.warning(f"Ran out of legs steering to {target}")
+        waypoints.append(Vector2(target))
+
+        return waypoints
+
+    def get_sector(self, position):
+        """Finds the sector of the ATC zone ring a position lies in.
+
+        Args:
+            position (pygame.Vector2): Some position.
+
+        Returns:
+            int: Sector index.
+        """
+        angle = math.atan2(position.y, position.x) % (2 * math.pi)
+        return int(angle / (2 * math.pi) * self.sectors) % self.sectors
+
+    def _build_approach(self, sector, runway_id):
+        """Lays out the approach from the center of a sector on the ATC zone ring to a
+            runway, for a plane entering the zone towards its center.
+
+        Args:
+            sector (int): Sector index.
+            runway_id (str): ID of the runway.
+
+        Returns:
+            tuple(pygame.Vector2): Waypoints of the approach, starting on the ring.
+        """
+        LOG.debug(f"Building approach from sector {sector} to runway '{runway_id}'")
+        angle = (sector + 0.5) / self.sectors * 2 * math.pi
+        start = Vector2(math.cos(angle), math.sin(angle)) * self.zone_radius
+        heading = heading_to(-1 * start)
+        target = self.runways[runway_id]["entry_coord"]
+
+        return (start,) + tuple(self._steer(start, heading, target))
+
+    def plan(self, position, heading, runway_id):
+        """Generates a flight plan to a runway.
+
+        Args:
+            position (pygame.Vector2): Plane position.
+            heading (num): Plane heading in degrees.
+            runway_id (str): ID of the runway.
+
+        Returns:
+            aatc.game_objects.Path: The flight plan.
+        """
+        approach = self.get_approach(self.get_sector(position), runway_id)
+
+        # join the approach at the first waypoint past the nearest one which the plane
+        # can turn towards in time and then turn onto the approach from, flying
+        # straight to it as the connecting leg
+        nearest = min(
+            range(len(approach)), key=lambda i: (approach[i] - position).length()
+        )
+        for i in range(nearest + 1, len(approach)):
+            if not self.can_fly_to(position, heading, approach[i]):
+                continue
+            if i + 1 < len(approach) and not self.can_fly_to(
+                approach[i], heading_to(approach[i] - position), approach[i + 1]
+            ):
+                continue
+            waypoints = [Vector2(waypoint) for waypoint in approach[i:]]
+            break
+        else:
+            # no waypoint to join, so intercept the runway entry directly
+            waypoints = self._steer(Vector2(position), heading, approach[-1])
+
+        return Path(waypoints, radius=self.path_radius)
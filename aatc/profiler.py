@@ -0,0 +1,264 @@
+"""Module for profiling the phases of each frame."""
+# stdlib
+import csv
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# external
+import numpy as np
+import pygame
+
+LOG = logging.getLogger(__name__)
+
+
+class FrameProfiler:
+    """Times the phases of every frame, and counts the events handled and planes
+        simulated each frame.
+
+    Phases are timed exclusively: time spent in a phase entered from within another,
+    such as controller work while handling events, is only counted towards the inner
+    phase. The samples of the last `history` frames are kept in ring buffers, from
+    which rolling percentiles are computed and which can be exported for offline
+    analysis.
+
+    Args:
+        history (int, optional): Number of frames whose samples are kept. Defaults to
+            3600.
+        window (int, optional): Number of most recent frames rolling percentiles are
+            computed over. Defaults to 300.
+        event_names (dict, optional): Names of event types, for event types pygame
+            cannot name itself. Defaults to None.
+    """
+
+    PHASES = ("events", "update", "controller", "draw", "idle")
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, history=3600, window=300, event_names=None):
+        # region config
+        self.overlay_color = (255, 255, 255)
+        self.overlay_background = (0, 0, 0)
+        self.overlay_font_size = 16  # px
+        self.overlay_interval = 30  # frames between overlay text refreshes
+        # endregion
+
+        self.history = history
+        self.window = window
+        self.event_names = event_names or {}
+
+        self._size = history + 1  # ring buffer rows, with one for the open frame
+
+        self.frames = 0  # frames recorded
+        self.frame_times = np.zeros(self._size)  # sec, wall time of each frame
+        self.phase_times = np.zeros((self._size, len(self.PHASES)))  # sec
+        self.planes = np.zeros(self._size, dtype=np.int64)
+        self.event_counts = {}  # event name: events handled each frame
+
+        self._phase_index = {phase: i for i, phase in enumerate(self.PHASES)}
+        self._frame = None  # row of the open frame
+        self._frame_start = 0.0  # sec
+        self._stack = []  # [phase index, sec resumed at] of the phases entered
+        self._overlay = None  # rendered overlay text
+        self._overlay_frame = None  # frame the overlay text was rendered at
+        self._font = None
+
+    def start_frame(self, planes=0):
+        """Closes the open frame, if any, and opens a new one.
+
+        Args:
+            planes (int, optional): Number of planes simulated this frame. Defaults to
+                0.
+        """
+        now = time.perf_counter()
+        if self._frame is not None:
+            self.frame_times[self._frame] = now - self._frame_start
+            self.frames += 1
+
+        row = self.frames % self._size
+        self.frame_times[row] = 0
+        self.phase_times[row] = 0
+        self.planes[row] = planes
+        for counts in self.event_counts.values():
+            counts[row] = 0
+        self._frame = row
+        self._frame_start = now
+        self._stack.clear()
+
+    @contextmanager
+    def phase(self, name):
+        """Times a phase of the open frame, pausing the phase it is entered from.
+
+        Args:
+            name (str): Name of the phase, one of `PHASES`.
+        """
+        if self._frame is None:  # not profiling frames
+            yield
+            return
+
+        index = self._phase_index[name]
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.phase_times[self._frame, parent[0]] += now - parent[1]
+        self._stack.append([index, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, resumed = self._stack.pop()
+            self.phase_times[self._frame, index] += now - resumed
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def count_events(self, events):
+        """Counts the events handled during the open frame, per event type.
+
+        Args:
+            events (list(pygame.event.Event)): The events.
+        """
+        if self._frame is None:
+            return
+
+        for event in events:
+            name = self.event_names.get(event.type)
+            if name is None:
+                name = pygame.event.event_name(event.type)
+            counts = self.event_counts.get(name)
+            if counts is None:
+                counts = self.event_counts[name] = np.zeros(self._size, dtype=np.int64)
+            counts[self._frame] += 1
+
+    def get_samples(self):
+        """Gathers the samples of the recorded frames in the history, oldest first.
+
+        Returns:
+            dict: Arrays of the frame number, the frame time and the time of each phase
+                in sec, the plane count, and the count of each event type prefixed with
+                "events_".
+        """
+        frames = min(self.frames, self.history)
+        rows = np.arange(self.frames - frames, self.frames) % self._size
+        samples = {
+            "frame": np.arange(self.frames - frames, self.frames),
+            "frame_time": self.frame_times[rows],
+            **{phase: self.phase_times[rows, i] for i, phase in enumerate(self.PHASES)},
+            "planes": self.planes[rows],
+        }
+        for name, counts in sorted(self.event_counts.items()):
+            samples[f"events_{name}"] = counts[rows]
+
+        return samples
+
+    def get_percentiles(self, percentiles=PERCENTILES):
+        """Calculates rolling percentiles of the frame and phase times over the most
+            recent frames.
+
+        Args:
+            percentiles (tuple(float), optional): Percentiles to calculate. Defaults to
+                `PERCENTILES`.
+
+        Returns:
+            dict: Time in msec at each percentile, as {name: {"p50": time}} for the
+                frame and each phase, or an empty dict if no frame was recorded.
+        """
+        frames = min(self.frames, self.history, self.window)
+        if not frames:
+            return {}
+
+        rows = np.arange(self.frames - frames, self.frames) % self._size
+        times = np.column_stack((self.frame_times[rows], self.phase_times[rows]))
+        values = np.percentile(times, percentiles, axis=0) * 1000
+
+        return {
+            name: {f"p{p:g}": value for p, value in zip(percentiles, values[:, i])}
+            for i, name in enumerate(("frame",) + self.PHASES)
+        }
+
+    def export(self, path):
+        """Saves the samples of the recorded frames in the history, to a CSV file or a
+            NumPy `.npz` archive depending on the file's suffix.
+
+        Args:
+            path (pathlib.Path): File to save to, ending in `.csv` or `.npz`.
+        """
+        path = Path(path)
+        if path.suffix not in (".csv", ".npz"):
+            raise ValueError(f"Cannot export frame samples to '{path.suffix}' files")
+
+        samples = self.get_samples()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".npz":
+            np.savez(path, **samples)
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(samples)
+                writer.writerows(zip(*(column.tolist() for column in samples.values())))
+        LOG.info(f"Exported {len(samples['frame'])} frame samples to {path}")
+
+    def get_overlay_lines(self):
+        """Formats the rolling percentiles and the counts of the last recorded frame.
+
+        Returns:
+            list(str): Lines of overlay text.
+        """
+        percentiles = self.get_percentiles()
+        if not percentiles:
+            return ["No frames profiled"]
+
+        row = (self.frames - 1) % self._size
+        lines = [
+            f"{'msec':<10} " + " ".join(f"{f'p{p:g}':>6}" for p in self.PERCENTILES),
+            *(
+                f"{name:<10} " + " ".join(f"{value:6.2f}" for value in values.values())
+                for name, values in percentiles.items()
+            ),
+            f"planes {self.planes[row]}",
+        ]
+        lines.extend(
+            f"{name} {counts[row]}"
+            for name, counts in sorted(self.event_counts.items())
+            if counts[row]
+        )
+
+        return lines
+
+    def draw(self, surface, position=(0, 0)):
+        """Render the profiler overlay on screen. The text is only refreshed every
+            `overlay_interval` frames.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+            position (tuple, optional): Top left corner of the overlay in screen
+                coordinates. Defaults to (0, 0).
+
+        Returns:
+            pygame.Rect: Area of the surface drawn over.
+        """
+        if (
+            self._overlay is None
+            or self.frames - self._overlay_frame >= self.overlay_interval
+        ):
+            if self._font is None:
+                if not pygame.font.get_init():
+                    pygame.font.init()
+                self._font = pygame.font.Font(None, self.overlay_font_size)
+            lines = [
+                self._font.render(line, True, self.overlay_color)
+                for line in self.get_overlay_lines()
+            ]
+            self._overlay = pygame.Surface(
+                (
+                    max(line.get_width() for line in lines),
+                    sum(line.get_height() for line in lines),
+                )
+            )
+            self._overlay.fill(self.overlay_background)
+            y = 0
+            for line in lines:
+                self._overlay.blit(line, (0, y))
+                y += line.get_height()
+            self._overlay_frame = self.frames
+
+        return surface.blit(self._overlay, position)
@@ -0,0 +1,109 @@
+"""Module for recording simulation runs for deterministic replay."""
+# stdlib
+import json
+import logging
+from pathlib import Path
+
+# external
+from pygame.math import Vector2
+
+# project
+from aatc import game_objects
+
+LOG = logging.getLogger(__name__)
+
+
+class Recording:
+    """A compact record of a simulation run: its seed and timestep, the schedule of
+        plane spawns, and the commands the controller issued to the planes. Replaying
+        it headless reproduces the run's trajectories exactly.
+
+    Args:
+        seed (int, optional): Seed of the run's random number generator. Defaults to
+            None.
+        timestep (float, optional): Fixed simulation timestep in sec. Defaults to
+            1/60.
+    """
+
+    def __init__(self, seed=None, timestep=1 / 60):
+        self.seed = seed
+        self.timestep = timestep
+        self.time_end = 0  # msec
+        self.spawns = []  # [time, callsign, x, y, heading]
+        self.commands = []  # [time, channel name, plane handle, payload]
+
+    def record_spawn(self, time, plane_id, position, heading):
+        """Records a plane spawn.
+
+        Args:
+            time (num): Simulation time in msec.
+            plane_id (str): Callsign of the spawned plane.
+            position (pygame.Vector2): Spawn position.
+            heading (num): Spawn heading in degrees.
+        """
+        self.spawns.append([time, plane_id, position.x, position.y, heading])
+
+    def record_command(self, time, channel, plane_id, plan=None):
+        """Records a command received by a plane.
+
+        Args:
+            time (num): Simulation time in msec.
+            channel (str): Name of the command's event channel.
+            plane_id (int): Handle of the commanded plane.
+            plan (aatc.game_objects.Path, optional): Flight plan sent with the
+                command. Defaults to None.
+        """
+        payload = None
+        if plan is not None:
+            payload = {
+                "waypoints": [tuple(waypoint) for waypoint in plan.waypoints],
+                "radius": plan.radius,
+            }
+        self.commands.append([time, channel, plane_id, payload])
+
+    @staticmethod
+    def decode_plan(payload):
+        """Rebuilds a flight plan from its recorded payload.
+
+        Args:
+            payload (dict): The recorded flight plan.
+
+        Returns:
+            aatc.game_objects.Path: The flight plan.
+        """
+        return game_objects.Path(
+            [Vector2(waypoint) for waypoint in payload["waypoints"]],
+            radius=payload["radius"],
+        )
+
+    def save(self, path):
+        """Saves the recording to a JSON file.
+
+        Args:
+            path (pathlib.Path): File to save to.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(vars(self), file, separators=(",", ":"))
+        LOG.info(
+            f"Saved recording of {len(self.spawns)} spawns and {len(self.commands)} "
+            f"commands to '{path}'"
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Loads a recording from a JSON file.
+
+        Args:
+            path (pathlib.Path): File to load from.
+
+        Returns:
+            Recording: The recording.
+        """
+        with open(path) as file:
+            data = json.load(file)
+        recording = cls()
+        vars(recording).update(data)
+
+        return recording
@@ -0,0 +1,343 @@
+"""Module for rendering the simulation."""
+# stdlib
+import logging
+import time
+
+# external
+import numpy as np
+import pygame
+
+# project
+from aatc.game_objects import Plane
+
+LOG = logging.getLogger(__name__)
+
+
+class Renderer:
+    """Draws the simulation in two layers: a static background layer of the ATC zone,
+        runways and path gizmos, and a dynamic layer of planes.
+
+    The background is cached on an off-screen surface and only redrawn when the camera
+    (`origin` or `screen_scale`), the gizmo toggle or the controller's paths change.
+    Each frame then only restores the background under the planes drawn the previous
+    frame, draws the planes, and pushes just those dirty rectangles to the display.
+
+    Planes and paths outside the viewport are culled. Planes are drawn at one of
+    several levels of detail depending on their size on screen: "FULL" draws the plane
+    and its protected radius, "GLYPH" skips the protected radius once it would be
+    smaller than `lod_gizmo_size` pixels or gizmos are off, and "POINT" draws single
+    pixels once planes would be smaller than `lod_point_size` pixels. The time taken to
+    draw each frame is accumulated per level of detail.
+
+    In bulk mode, meant for dense traffic, plane markers and protected radii are
+    instead written straight into the screen's pixel buffer in a few vectorized
+    operations, in the colors shared by all planes, and the area they cover is pushed
+    as a single dirty rectangle.
+
+    The frame profiler's overlay is drawn on top when `draw_profiler` is set on the
+    game engine.
+
+    Args:
+        game_engine (aatc.game.GameEngine): The game engine to render.
+    """
+
+    LODS = ("FULL", "GLYPH", "POINT")
+
+    def __init__(self, game_engine):
+        # region config
+        self.lod_point_size = 2  # px, plane size below which planes are drawn as points
+        self.lod_gizmo_size = 1  # px, radius below which gizmos are not drawn
+        self.bulk = False  # write plane markers straight into the pixel buffer
+        self.bulk_marker_size = 3  # px, side of plane markers in bulk mode
+        self.gizmo_color = (0, 0, 255)
+        # endregion
+
+        self.game_engine = game_engine
+        self.background = None
+        self.background_rebuilds = 0
+        self.planes_drawn = 0  # planes in the viewport last frame
+        self.frame_times = {lod: [0, 0.0] for lod in self.LODS}  # frames, sec
+
+        self._plane_radius = max(point.length() for point in Plane.shape)  # km
+        self._ring_offsets = {}  # radius in px: pixel offsets of a circle outline
+
+        self._background_key = None
+        self._rects_prev = []  # screen areas drawn over by planes last frame
+
+    def invalidate(self):
+        """Forces the background to be redrawn and the whole screen to be pushed to the
+        display next frame."""
+        self._background_key = None
+
+    def _get_background_key(self):
+        """Gathers the state the background layer depends on.
+
+        Returns:
+            tuple: Hashable snapshot of the camera, gizmo toggle and active paths.
+        """
+        GE = self.game_engine
+        return (
+            tuple(GE.origin),
+            GE.screen_scale,
+            GE.draw_gizmos,
+            tuple(GE.atc.paths),  # holds the paths, so their identities stay unique
+        )
+
+    def update_background(self):
+        """Redraws the background layer if the state it depends on changed.
+
+        Returns:
+            bool: Whether the background was redrawn.
+        """
+        key = self._get_background_key()
+        if key == self._background_key:
+            return False
+
+        GE = self.game_engine
+        if (
+            self.background is None
+            or self.background.get_size() != GE.screen.get_size()
+        ):
+            self.background = pygame.Surface(GE.screen.get_size(), 0, GE.screen)
+        self.draw_background(self.background)
+        self._background_key = key
+        self.background_rebuilds += 1
+        LOG.debug(f"Redrew background layer ({self.background_rebuilds} redraws)")
+
+        return True
+
+    def draw_background(self, surface):
+        """Draws the static game objects.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+        """
+        GE = self.game_engine
+        surface.fill(GE.screen_color)
+
+        GE.atc_zone.draw(
+            surface=surface,
+            position=GE.vectors_to_screen((0, 0))[0],
+            scale=GE.screen_scale,
+        )
+
+        runway_coords = GE.vectors_to_screen(
+            [
+                tuple(coord)
+                for runway in GE.runways
+                for coord in (runway.entry_coord, runway.exit_coord)
+            ]
+        ).reshape(-1, 2, 2)
+        for runway, (position_start, position_end) in zip(GE.runways, runway_coords):
+            runway.draw(
+                surface=surface,
+                position_start=position_start,
+                position_end=position_end,
+            )
+
+        if GE.draw_gizmos:
+            viewport = surface.get_rect()
+            for path in tuple(GE.atc.paths):  # may change on the controller's thread
+                waypoints_tranformed = GE.vectors_to_screen(path.points)
+                corner_min = waypoints_tranformed.min(axis=0)
+                corner_max = waypoints_tranformed.max(axis=0)
+                margin = path.radius * GE.screen_scale + 1
+                if not viewport.colliderect(
+                    pygame.Rect(
+                        tuple(corner_min - margin),
+                        tuple(corner_max - corner_min + 2 * margin),
+                    )
+                ):
+                    continue
+                path.draw(
+                    surface=surface,
+                    waypoints_tranformed=waypoints_tranformed,
+                    scale=GE.screen_scale,
+                )
+
+    def get_lod(self):
+        """Chooses the level of detail to draw planes at, from their size on screen.
+
+        Returns:
+            str: One of `LODS`.
+        """
+        GE = self.game_engine
+        if 2 * self._plane_radius * GE.screen_scale < self.lod_point_size:
+            return "POINT"
+        if (
+            not GE.draw_gizmos
+            or GE.plane_protected_radius * GE.screen_scale < self.lod_gizmo_size
+        ):
+            return "GLYPH"
+        return "FULL"
+
+    def get_frame_times(self):
+        """Calculates the mean time taken to draw a frame at each level of detail.
+
+        Returns:
+            dict: Mean frame time in msec per level of detail, for the levels drawn so
+                far.
+        """
+        return {
+            lod: seconds / frames * 1000
+            for lod, (frames, seconds) in self.frame_times.items()
+            if frames
+        }
+
+    def cull(self, positions, radius):
+        """Finds the positions within the viewport.
+
+        Args:
+            positions (numpy.ndarray): Positions in screen coordinates of shape (n, 2).
+            radius (float): Radius in pixels drawn around each position.
+
+        Returns:
+            numpy.ndarray: Mask of the visible positions.
+        """
+        width, height = self.game_engine.screen.get_size()
+        margin = radius + 1
+        return (
+            (positions[:, 0] >= -1 * margin)
+            & (positions[:, 0] < width + margin)
+            & (positions[:, 1] >= -1 * margin)
+            & (positions[:, 1] < height + margin)
+        )
+
+    def draw_planes(self, surface, lod="FULL"):
+        """Draws the planes within the viewport and their gizmos.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+            lod (str, optional): Level of detail, one of `LODS`. Defaults to "FULL".
+
+        Returns:
+            list(pygame.Rect): Areas of the surface drawn over.
+        """
+        GE = self.game_engine
+        scale = GE.screen_scale
+        radius = self._plane_radius
+        if lod == "FULL":
+            radius = max(radius, GE.plane_protected_radius)
+
+        positions = GE.vectors_to_screen(GE.get_plane_positions())
+        visible = np.flatnonzero(self.cull(positions, radius * scale))
+        self.planes_drawn = len(visible)
+
+        rects = []
+        for i in visible.tolist():
+            plane, position = GE.planes[i], positions[i]
+            if lod == "POINT":
+                rects.append(surface.fill(plane.color, (*position, 1, 1)))
+                continue
+
+            rect = plane.draw(surface=surface, position=position, scale=scale)
+            if lod == "FULL":  # draw the plane's protected radius
+                rect = rect.union(
+                    pygame.draw.circle(
+                        surface=surface,
+                        color=self.gizmo_color,
+                        center=position,
+                        radius=GE.plane_protected_radius * scale,
+                        width=1,
+                    )
+                )
+            rects.append(rect)
+
+        return rects
+
+    def _get_ring_offsets(self, radius):
+        """Retrieves the pixel offsets of a circle outline, computing them once per
+            radius.
+
+        Args:
+            radius (int): Radius in pixels.
+
+        Returns:
+            numpy.ndarray: Unique offsets of shape (m, 2).
+        """
+        offsets = self._ring_offsets.get(radius)
+        if offsets is None:
+            angles = np.linspace(0, 2 * np.pi, 8 * radius + 8, endpoint=False)
+            offsets = np.unique(
+                np.rint(np.stack((np.cos(angles), np.sin(angles)), axis=1) * radius),
+                axis=0,
+            ).astype(np.intp)
+            self._ring_offsets[radius] = offsets
+
+        return offsets
+
+    def draw_planes_bulk(self, surface, lod="FULL"):
+        """Draws a square marker for each plane within the viewport, and its protected
+            radius, straight into the pixel buffer of the surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+            lod (str, optional): Level of detail, one of `LODS`. Defaults to "FULL".
+
+        Returns:
+            list(pygame.Rect): Area of the surface drawn over, as a single rectangle.
+        """
+        GE = self.game_engine
+        scale = GE.screen_scale
+        half = 0 if lod == "POINT" else self.bulk_marker_size // 2
+        marker = np.arange(-1 * half, half + 1)
+        layers = []  # pixel offsets and color, drawn in order
+        radius = half
+        if lod == "FULL":
+            radius_gizmo = round(GE.plane_protected_radius * scale)
+            layers.append((self._get_ring_offsets(radius_gizmo), self.gizmo_color))
+            radius = max(radius, radius_gizmo)
+        layers.append(
+            (np.stack(np.meshgrid(marker, marker), axis=-1).reshape(-1, 2), Plane.color)
+        )
+
+        positions = GE.vectors_to_screen(GE.get_plane_positions())
+        centers = np.rint(positions[self.cull(positions, radius)]).astype(np.intp)
+        self.planes_drawn = len(centers)
+        if not len(centers):
+            return []
+
+        size = np.array(surface.get_size())
+        pixels = pygame.surfarray.pixels2d(surface)  # locks the surface
+        for offsets, color in layers:
+            xs = (centers[:, 0, None] + offsets[None, :, 0]).ravel()
+            ys = (centers[:, 1, None] + offsets[None, :, 1]).ravel()
+            inside = (xs.view(np.uintp) < size[0]) & (ys.view(np.uintp) < size[1])
+            pixels[xs[inside], ys[inside]] = surface.map_rgb(color)
+        del pixels  # unlocks the surface
+
+        corner_min = np.clip(centers.min(axis=0) - radius, 0, size)
+        corner_max = np.clip(centers.max(axis=0) + radius + 1, 0, size)
+        return [pygame.Rect(tuple(corner_min), tuple(corner_max - corner_min))]
+
+    def draw(self):
+        """Draws a frame to the screen and pushes the changed areas to the display."""
+        time_start = time.perf_counter()
+        GE = self.game_engine
+        screen = GE.screen
+
+        redraw = self.update_background()
+        if redraw:
+            screen.blit(self.background, (0, 0))
+        else:  # erase the planes of the previous frame
+            for rect in self._rects_prev:
+                screen.blit(self.background, rect, rect)
+
+        lod = self.get_lod()
+        if self.bulk:
+            rects = self.draw_planes_bulk(screen, lod=lod)
+        else:
+            rects = self.draw_planes(screen, lod=lod)
+        if GE.draw_profiler:
+            rects.append(GE.profiler.draw(screen))
+
+        if not GE.headless:
+            if redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self._rects_prev + rects)
+        self._rects_prev = rects
+
+        frame_times = self.frame_times[lod]
+        frame_times[0] += 1
+        frame_times[1] += time.perf_counter() - time_start
@@ -0,0 +1,477 @@
+"""Module for sequencing plane landings."""
+# stdlib
+import bisect
+import heapq
+import itertools
+import logging
+
+# external
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+
+class PlanTable:
+    """Tracks the progress of many planes along their flight plans, stored in arrays
+        so that the distance each has left to fly is estimated for a whole telemetry
+        frame at once.
+
+    Each plane's flight plan is stored in a row, padded to the length of the longest
+    plan by repeating its last waypoint. A plane's remaining distance is its straight
+    line distance to its next waypoint plus the plan's length from there on. The next
+    waypoint is searched for from the one found at the plane's previous telemetry, over
+    the next `WINDOW` waypoints: as when following the plan, a plane has passed a
+    waypoint once it is within the plan's radius of it or ahead of it along its entry
+    direction.
+
+    Args:
+        capacity (int, optional): Number of plane rows to preallocate. Defaults to 64.
+    """
+
+    WINDOW = 8  # waypoints searched from a plane's next waypoint per telemetry
+
+    _ATTRIBUTES = ("points", "entry_directions", "remaining", "radii", "next")
+
+    def __init__(self, capacity=64):
+        self.points = np.zeros((capacity, 1, 2))  # km
+        self.entry_directions = np.zeros((capacity, 1, 2))
+        self.remaining = np.zeros((capacity, 1))  # km from each waypoint to the end
+        self.radii = np.zeros(capacity)  # km
+        self.next = np.full(capacity, -1, dtype=np.int64)  # -1 without a plan
+
+    @property
+    def capacity(self):
+        """int: Number of allocated rows."""
+        return len(self.next)
+
+    def _grow(self):
+        """Doubles the number of allocated rows."""
+        capacity = self.capacity * 2
+        LOG.debug(f"Growing plan arrays to {capacity} rows")
+        for name in self._ATTRIBUTES:
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+        self.next[capacity // 2 :] = -1
+
+    def _widen(self, length):
+        """Pads every plan to a number of waypoints by repeating its last one.
+
+        Args:
+            length (int): Number of waypoints.
+        """
+        padding = length - self.points.shape[1]
+        for name in ("points", "entry_directions", "remaining"):
+            array = getattr(self, name)
+            setattr(
+                self,
+                name,
+                np.concatenate(
+                    (array, np.repeat(array[:, -1:], padding, axis=1)), axis=1
+                ),
+            )
+
+    def set(self, row, plan):
+        """Stores a plane's flight plan, which it is yet to start along.
+
+        Args:
+            row (int): Row index of the plane.
+            plan (aatc.game_objects.Path): The flight plan.
+        """
+        while row >= self.capacity:
+            self._grow()
+        count = len(plan.points)
+        if count > self.points.shape[1]:
+            self._widen(max(count, 2 * self.points.shape[1]))
+
+        self.points[row, :count] = plan.points
+        self.points[row, count:] = plan.points[-1]
+        self.entry_directions[row, :count] = plan.entry_directions
+        self.entry_directions[row, count:] = plan.entry_directions[-1]
+        self.remaining[row, : count - 1] = np.cumsum(plan.lengths[::-1])[::-1]
+        self.remaining[row, count - 1 :] = 0
+        self.radii[row] = plan.radius
+        self.next[row] = 0
+
+    def clear(self, row):
+        """Forgets a plane's flight plan.
+
+        Args:
+            row (int): Row index of the plane.
+        """
+        if row < self.capacity:
+            self.next[row] = -1
+
+    def get_planned(self, rows):
+        """Finds which planes have a flight plan.
+
+        Args:
+            rows (numpy.ndarray): Row indices of the planes.
+
+        Returns:
+            numpy.ndarray: Boolean mask of the planes with a flight plan.
+        """
+        planned = np.zeros(len(rows), dtype=bool)
+        inside = rows < self.capacity
+        planned[inside] = self.next[rows[inside]] >= 0
+
+        return planned
+
+    def get_remaining_distances(self, rows, positions):
+        """Advances planes along their flight plans, and estimates the distance each
+            has left to fly.
+
+        Args:
+            rows (numpy.ndarray): Row indices of planes with a flight plan.
+            positions (numpy.ndarray): Plane positions of shape (n, 2) in km.
+
+        Returns:
+            numpy.ndarray: Distances in km.
+        """
+        window = np.minimum(
+            self.next[rows, None] + np.arange(self.WINDOW), self.points.shape[1] - 1
+        )
+        offsets = self.points[rows[:, None], window] - positions[:, None]
+        distances_squared = np.einsum("ijk,ijk->ij", offsets, offsets)
+        passed = (distances_squared <= self.radii[rows, None] ** 2) | (
+            np.einsum(
+                "ijk,ijk->ij", offsets, self.entry_directions[rows[:, None], window]
+            )
+            < 0
+        )
+        ahead = np.where(
+            passed.all(axis=1), self.WINDOW - 1, passed.argmin(axis=1)
+        )  # the first waypoint not passed yet, else the last searched
+        index = np.arange(len(rows))
+        self.next[rows] = window[index, ahead]
+
+        return (
+            np.sqrt(distances_squared[index, ahead])
+            + self.remaining[rows, self.next[rows]]
+        )
+
+
+class LandingSequencer:
+    """Orders the planes waiting to land by estimated time of arrival (ETA), and
+        allocates each a landing slot on a runway.
+
+    A plane's ETA to each open runway is estimated from its latest telemetry: from its
+    distance along its flight plan to the plan's runway once it has one (see
+    `PlanTable`), and from its straight line distance to each runway's entry coordinate
+    until then. Stationary planes are estimated to arrive far in the future. The ETAs
+    of a whole telemetry frame are estimated at once, and a plane only moves in the
+    order once its ETAs changed by more than `tolerance` since they were last recorded,
+    as planes flying on at a steady speed keep the same ETA.
+
+    The planes are kept in a heap by their earliest ETA, which each ETA update pushes a
+    new key onto, and the keys replaced since are dropped lazily once they reach the
+    top. Slots are allocated greedily in ETA order: each plane lands at its ETA, or
+    `interval` after the previous landing on the same runway if that is later, on its
+    plan's runway or else on the runway where it could land the earliest. Planes yet to
+    transmit telemetry have no ETA, and are sequenced last in arrival order.
+
+    The order and the time each runway is free again before each position in it are
+    kept from the last allocation. The next allocation merges the planes changed since
+    into that order, and reallocates the slots from the earliest position a changed
+    plane left or entered, until past every changed plane the runways are free at the
+    same times as before, from where on every slot is unchanged.
+
+    Args:
+        interval (float, optional): Minimum time between landings on a runway in sec.
+            Defaults to 10.
+        tolerance (float, optional): ETA change in sec below which a plane keeps its
+            recorded ETAs. Defaults to 0.1.
+    """
+
+    def __init__(self, interval=10, tolerance=0.1):
+        self.interval = interval
+        self.tolerance = tolerance
+
+        self.etas = {}  # plane handle: {runway id: ETA in msec}
+        self.runways = {}  # plane handle: runway of the plane's flight plan
+        self.plans = {}  # plane handle: flight plan
+        self.sequence = []  # plane handles in landing order, as of the last allocation
+        self.slots = {}  # plane handle: (runway id, landing time in msec)
+        self.delays = {}  # plane handle: sec from the ETA to the slot on its runway
+        self.first_etas = {}  # plane handle: earliest ETA from its first telemetry
+
+        self._arrivals = {}  # plane handle: arrival number, in arrival order
+        self._counter = itertools.count()
+        self._keys = {}  # plane handle: (earliest ETA, arrival number, plane handle)
+        self._heap = []  # keys, of which those no longer in `_keys` are stale
+        self._waiting = {}  # plane handle: None, for the planes without ETA in order
+
+        self._rows = {}  # plane handle: row of its recorded ETAs and flight plan
+        self._rows_free = []
+        self._columns = ()  # runway ids of the recorded ETAs
+        self._recorded = np.zeros((0, 0))  # ETAs in msec, row per plane
+        self._plans = PlanTable()
+
+        self._order = []  # keys in landing order, as of the last allocation
+        self._free = [{}]  # runway id: next landing time, before each position
+        self._changed = {}  # plane handle: key in the order, of the planes changed
+        self._invalidated = False  # every slot is to be reallocated
+
+    def __len__(self):
+        return len(self._arrivals)
+
+    def __contains__(self, plane_id):
+        return plane_id in self._arrivals
+
+    def _mark_changed(self, plane_id):
+        """Records that a plane's key or slot changed since the last allocation.
+
+        Args:
+            plane_id (int): Handle of the plane.
+        """
+        self._changed.setdefault(plane_id, self._keys.get(plane_id))
+
+    def _prune(self):
+        """Drops the stale keys from the top of the heap, and rebuilds the heap once
+        most of its keys are stale."""
+        heap = self._heap
+        if len(heap) > 2 * len(self._keys):
+            heap = self._heap = list(self._keys.values())
+            heapq.heapify(heap)
+        while heap and self._keys.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+
+    def add(self, plane_id):
+        """Adds a plane to the end of the sequence, with no ETA yet.
+
+        Args:
+            plane_id (int): Handle of the plane.
+        """
+        self._mark_changed(plane_id)
+        self._arrivals[plane_id] = next(self._counter)
+        self._waiting[plane_id] = None
+
+        if self._rows_free:
+            row = self._rows_free.pop()
+        else:
+            row = len(self._rows)
+            if row == len(self._recorded):
+                recorded = np.full((max(2 * row, 64), len(self._columns)), np.nan)
+                recorded[:row] = self._recorded
+                self._recorded = recorded
+        self._rows[plane_id] = row
+        self._recorded[row] = np.nan
+        self._plans.clear(row)
+
+    def remove(self, plane_id):
+        """Removes a plane from the sequence.
+
+        Args:
+            plane_id (int): Handle of the plane.
+        """
+        self._mark_changed(plane_id)
+        self._keys.pop(plane_id, None)
+        self._arrivals.pop(plane_id)
+        self._waiting.pop(plane_id, None)
+        self.etas.pop(plane_id, None)
+        self.first_etas.pop(plane_id, None)
+        self.runways.pop(plane_id, None)
+        self.plans.pop(plane_id, None)
+        self._rows_free.append(self._rows.pop(plane_id))
+        self._prune()
+
+    def assign(self, plane_id, runway_id, plan):
+        """Commits a plane to the runway of the flight plan it was sent.
+
+        Args:
+            plane_id (int): Handle of the plane.
+            runway_id (str): ID of the runway.
+            plan (aatc.game_objects.Path): The flight plan.
+        """
+        self._mark_changed(plane_id)
+        self.runways[plane_id] = runway_id
+        self.plans[plane_id] = plan
+        row = self._rows[plane_id]
+        self._recorded[row] = np.nan  # re-recorded for the new runway
+        self._plans.set(row, plan)
+
+    def invalidate(self):
+        """Forces the slots to be reallocated, e.g. after a runway status changed."""
+        self._invalidated = True
+
+    def _push(self, plane_id, etas):
+        """Records a plane's ETAs and pushes its new key onto the heap.
+
+        Args:
+            plane_id (int): Handle of the plane.
+            etas (dict): ETA in msec to each runway the plane may land on.
+        """
+        self._mark_changed(plane_id)
+        self.etas[plane_id] = etas
+        self._waiting.pop(plane_id, None)
+        key = (min(etas.values()), self._arrivals[plane_id], plane_id)
+        self.first_etas.setdefault(plane_id, key[0])
+        self._keys[plane_id] = key
+        heapq.heappush(self._heap, key)
+        self._prune()
+
+    def update_frame(self, time, plane_ids, positions, velocities, runway_ids, coords):
+        """Updates the ETAs of many planes from their telemetry.
+
+        Args:
+            time (num): Simulation time of the telemetry in msec.
+            plane_ids (list(int)): Handles of the planes.
+            positions (numpy.ndarray): Plane positions of shape (n, 2) in km.
+            velocities (numpy.ndarray): Plane velocities of shape (n, 2) in km/s.
+            runway_ids (list(str)): IDs of the open runways.
+            coords (numpy.ndarray): Entry coordinates of the open runways of shape
+                (m, 2).
+        """
+        if not runway_ids:
+            return
+        if tuple(runway_ids) != self._columns:  # ETAs recorded to other runways
+            self._columns = tuple(runway_ids)
+            self._recorded = np.full((len(self._recorded), len(runway_ids)), np.nan)
+
+        rows = np.array(
+            [self._rows.get(plane_id, -1) for plane_id in plane_ids], dtype=np.int64
+        )
+        sequenced = np.flatnonzero(rows >= 0)
+        if not len(sequenced):
+            return
+        rows = rows[sequenced]
+        positions = np.asarray(positions, dtype=float)[sequenced]
+        velocities = np.asarray(velocities, dtype=float)[sequenced]
+
+        speeds = np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+        seconds_per_km = 1 / np.maximum(speeds, 1e-9)  # finite for stationary planes
+        offsets = positions[:, None, :] - coords[None]
+        etas = time + np.sqrt(np.einsum("ijk,ijk->ij", offsets, offsets)) * (
+            seconds_per_km[:, None] * 1000
+        )
+        planned = np.flatnonzero(self._plans.get_planned(rows))
+        if len(planned):  # ETA to the plan's runway only, in the first column
+            distances = self._plans.get_remaining_distances(
+                rows[planned], positions[planned]
+            )
+            etas[planned] = np.inf
+            etas[planned, 0] = time + distances * (seconds_per_km[planned] * 1000)
+
+        recorded = self._recorded[rows]
+        with np.errstate(invalid="ignore"):  # infinite or not yet recorded ETAs
+            steady = (etas == recorded) | (
+                np.abs(etas - recorded) <= self.tolerance * 1000
+            )
+        changed = np.flatnonzero(~steady.all(axis=1))
+        self._recorded[rows[changed]] = etas[changed]
+
+        for i in changed.tolist():
+            plane_id = plane_ids[sequenced[i]]
+            runway_id = self.runways.get(plane_id)
+            if runway_id is None:
+                self._push(plane_id, dict(zip(runway_ids, etas[i].tolist())))
+            else:
+                self._push(plane_id, {runway_id: float(etas[i, 0])})
+
+    def update(self, plane_id, time, position, velocity, runway_ids, coords):
+        """Updates the ETA of a plane from its telemetry.
+
+        Args:
+            plane_id (int): Handle of the plane.
+            time (num): Simulation time of the telemetry in msec.
+            position (list-like): Plane position in km.
+            velocity (list-like): Plane velocity in km/s.
+            runway_ids (list(str)): IDs of the open runways.
+            coords (numpy.ndarray): Entry coordinates of the open runways of shape
+                (m, 2).
+        """
+        self.update_frame(
+            time,
+            [plane_id],
+            np.array([tuple(position)], dtype=float),
+            np.array([tuple(velocity)], dtype=float),
+            runway_ids,
+            coords,
+        )
+
+    def peek(self):
+        """Retrieves the plane with the earliest ETA, without changing the sequencer.
+
+        Returns:
+            int: Handle of the plane, or None if the sequence is empty.
+        """
+        if self._heap:  # pruned, so the top key is current
+            return self._heap[0][2]
+
+        return next(iter(self._waiting), None)
+
+    def allocate_slots(self, runway_ids):
+        """Orders the planes by ETA and allocates them landing slots, if anything
+            changed since the last allocation.
+
+        Args:
+            runway_ids (list(str)): IDs of the open runways.
+
+        Returns:
+            dict: Runway ID and landing time in msec of each plane with an ETA,
+                updated in place. The order is kept in `sequence`, and the delays in
+                `delays`.
+        """
+        changed = self._changed
+        if not changed and not self._invalidated:
+            return self.slots
+
+        order = self._order
+        keys_prev = [key for key in changed.values() if key is not None]
+        keys = sorted(key for key in map(self._keys.get, changed) if key is not None)
+        if self._invalidated:
+            start, last = 0, None
+        else:
+            start = min(
+                (bisect.bisect_left(order, key) for key in keys_prev + keys),
+                default=len(order),
+            )
+            last = max(keys_prev + keys, default=None)
+        ranked = list(
+            heapq.merge([key for key in order[start:] if key[2] not in changed], keys)
+        )
+        for plane_id in changed:
+            if plane_id not in self._keys:
+                self.slots.pop(plane_id, None)
+                self.delays.pop(plane_id, None)
+
+        runways_open = set(runway_ids)
+        interval = self.interval * 1000
+        free = self._free[: start + 1]
+        runways_free = dict(free[-1])  # runway id: next landing in msec
+        for i, key in enumerate(ranked):
+            if last is not None and key > last:  # the same planes follow as before
+                position = len(order) - len(ranked) + i
+                if runways_free == self._free[position]:
+                    free.extend(self._free[position + 1 :])
+                    break
+            plane_id = key[2]
+            etas = self.etas[plane_id]
+            if plane_id not in self.runways:
+                etas = {r: eta for r, eta in etas.items() if r in runways_open}
+            if etas:
+                runway_id, slot = min(
+                    (
+                        (r, max(eta, runways_free.get(r, -1 * np.inf)))
+                        for r, eta in etas.items()
+                    ),
+                    key=lambda candidate: candidate[1],
+                )
+                self.slots[plane_id] = (runway_id, slot)
+                self.delays[plane_id] = (slot - etas[runway_id]) / 1000
+                runways_free[runway_id] = slot + interval
+            else:
+                self.slots.pop(plane_id, None)
+                self.delays.pop(plane_id, None)
+            free.append(dict(runways_free))
+
+        self._order = order[:start] + ranked
+        self._free = free
+        self.sequence = (
+            self.sequence[:start] + [key[2] for key in ranked] + list(self._waiting)
+        )
+        self._changed = {}
+        self._invalidated = False
+
+        return self.slots
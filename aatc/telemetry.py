@@ -0,0 +1,475 @@
+"""Module for plane telemetry transport and storage."""
+# stdlib
+import logging
+from collections import namedtuple
+from collections.abc import Mapping
+from pathlib import Path
+from pprint import pformat
+
+# external
+import numpy as np
+from pygame.math import Vector2
+
+# project
+from aatc.fleet import STATUS_CODES, STATUSES
+
+LOG = logging.getLogger(__name__)
+
+TelemetryFrame = namedtuple(
+    "TelemetryFrame", ["time", "plane_ids", "positions", "velocities", "statuses"]
+)
+TelemetryFrame.__doc__ = """Telemetry of every plane transmitting at a given simulation
+    time in msec. Holds an array of plane handles, position and velocity arrays of
+    shape (n, 2), and an array of status codes indexing `aatc.fleet.STATUSES`."""
+
+
+class TelemetryTable(Mapping):
+    """The controller's database of the latest telemetry of each plane, stored in
+        arrays so that whole telemetry frames can be ingested in one step.
+
+    Each connected plane's telemetry is stored in the row at its handle (see
+    `aatc.identity.PlaneHandles`), so that whole frames are ingested by plain indexing.
+    Behaves as a read-only mapping of plane handle to a dictionary of that plane's
+    telemetry, whose entries are None until the plane first transmits.
+
+    The most recent samples of each plane are also kept in a fixed-capacity ring
+    buffer. Every sample is written twice, `history` slots apart, so that the
+    samples in the buffer can always be read back in order as one contiguous view.
+
+    Args:
+        capacity (int, optional): Number of plane rows to preallocate. Defaults to 64.
+        history (int, optional): Number of samples of history to keep per plane.
+            Defaults to 0.
+    """
+
+    _ATTRIBUTES = (
+        "connected",
+        "callsigns",
+        "positions",
+        "velocities",
+        "statuses",
+        "received",
+        "history_times",
+        "history_positions",
+        "history_statuses",
+        "history_head",
+        "history_count",
+    )
+
+    def __init__(self, capacity=64, history=0):
+        self.history = history
+
+        self.connected = np.zeros(capacity, dtype=bool)
+        self.callsigns = np.empty(capacity, dtype=object)
+        self.positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.statuses = np.zeros(capacity, dtype=np.int8)
+        self.received = np.zeros(capacity, dtype=bool)  # telemetry received yet
+
+        self.history_times = np.zeros((capacity, 2 * history))  # msec
+        self.history_positions = np.zeros((capacity, 2 * history, 2))
+        self.history_statuses = np.zeros((capacity, 2 * history), dtype=np.int8)
+        self.history_head = np.zeros(capacity, dtype=np.int64)  # next slot to write
+        self.history_count = np.zeros(capacity, dtype=np.int64)
+
+        self._count = 0  # connected planes
+
+    def __getitem__(self, plane_id):
+        row = plane_id
+        if not (0 <= row < len(self.connected) and self.connected[row]):
+            raise KeyError(plane_id)
+        if not self.received[row]:
+            return {"position": None, "velocity": None, "status": None}
+        return {
+            "position": Vector2(*self.positions[row]),
+            "velocity": Vector2(*self.velocities[row]),
+            "status": STATUSES[self.statuses[row]],
+        }
+
+    def __iter__(self):
+        return iter(np.flatnonzero(self.connected).tolist())
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return pformat(dict(self.items()))
+
+    def _grow(self):
+        """Doubles the number of allocated rows."""
+        capacity = len(self.received) * 2
+        for name in self._ATTRIBUTES:
+            array = getattr(self, name)
+            if array.dtype == object:
+                grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            else:
+                grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    def add(self, plane_id, callsign=None):
+        """Adds a plane to the table, with no telemetry yet.
+
+        Args:
+            plane_id (int): Handle of the plane to add.
+            callsign (str, optional): Callsign of the plane. Defaults to None.
+
+        Raises:
+            ValueError: If a connected plane already holds the handle.
+        """
+        row = plane_id
+        while row >= len(self.connected):
+            self._grow()
+        if self.connected[row]:
+            raise ValueError(f"Plane handle {plane_id} is already connected")
+        self.connected[row] = True
+        self.callsigns[row] = callsign
+        self.received[row] = False
+        self.history_head[row] = 0
+        self.history_count[row] = 0
+        self._count += 1
+
+    def remove(self, plane_id):
+        """Removes a plane from the table.
+
+        Args:
+            plane_id (int): Handle of the plane to remove.
+        """
+        row = plane_id
+        if not (0 <= row < len(self.connected) and self.connected[row]):
+            raise KeyError(plane_id)
+        self.connected[row] = False
+        self.callsigns[row] = None
+        self.received[row] = False
+        self._count -= 1
+
+    def _append_history(self, rows, time):
+        """Appends the latest telemetry of some rows to their history.
+
+        Args:
+            rows (numpy.ndarray): Row indices.
+            time (num): Simulation time of the telemetry in msec.
+        """
+        if not self.history:
+            return
+
+        head = self.history_head[rows]
+        for slot in (head, head + self.history):
+            self.history_times[rows, slot] = time
+            self.history_positions[rows, slot] = self.positions[rows]
+            self.history_statuses[rows, slot] = self.statuses[rows]
+        self.history_head[rows] = (head + 1) % self.history
+        self.history_count[rows] = np.minimum(
+            self.history_count[rows] + 1, self.history
+        )
+
+    def update(self, plane_id, time, position, velocity, status):
+        """Records the telemetry of a single plane. Telemetry of planes which are not
+            connected, e.g. sent just before they disconnected, is ignored.
+
+        Args:
+            plane_id (int): Handle of the plane.
+            time (num): Simulation time of the telemetry in msec.
+            position (list-like): Plane position in km.
+            velocity (list-like): Plane velocity in km/s.
+            status (str): Plane status, one of `aatc.fleet.STATUSES`.
+
+        Returns:
+            bool: Whether the telemetry was recorded.
+        """
+        row = plane_id
+        if not (0 <= row < len(self.connected) and self.connected[row]):
+            return False
+        self.positions[row] = tuple(position)
+        self.velocities[row] = tuple(velocity)
+        self.statuses[row] = STATUS_CODES[status]
+        self.received[row] = True
+        self._append_history(np.array([row]), time)
+
+        return True
+
+    def update_frame(self, frame):
+        """Records the telemetry of every connected plane in a frame. Telemetry of
+            planes which are not connected is ignored, like in `update`.
+
+        Args:
+            frame (TelemetryFrame): The telemetry frame.
+
+        Returns:
+            TelemetryFrame: The frame, without the planes which are not connected.
+        """
+        rows = np.asarray(frame.plane_ids, dtype=np.int64)
+        connected = self._get_connected(rows)
+        if not connected.all():
+            rows = rows[connected]
+            frame = TelemetryFrame(
+                frame.time,
+                rows,
+                np.asarray(frame.positions)[connected],
+                np.asarray(frame.velocities)[connected],
+                np.asarray(frame.statuses)[connected],
+            )
+        self.positions[rows] = frame.positions
+        self.velocities[rows] = frame.velocities
+        self.statuses[rows] = frame.statuses
+        self.received[rows] = True
+        self._append_history(rows, frame.time)
+
+        return frame
+
+    def _get_connected(self, rows):
+        """Checks which of some rows hold a connected plane.
+
+        Args:
+            rows (numpy.ndarray): Row indices, possibly out of range.
+
+        Returns:
+            numpy.ndarray: Boolean mask of the connected rows.
+        """
+        connected = (rows >= 0) & (rows < len(self.connected))
+        connected[connected] = self.connected[rows[connected]]
+
+        return connected
+
+    def get_rows(self, plane_ids):
+        """Looks up the rows of some connected planes.
+
+        Args:
+            plane_ids (list-like): Handles of the planes.
+
+        Returns:
+            numpy.ndarray: Row indices.
+
+        Raises:
+            KeyError: If a handle is not connected.
+        """
+        rows = np.asarray(plane_ids, dtype=np.int64).reshape(-1)
+        connected = self._get_connected(rows)
+        if not connected.all():
+            raise KeyError(rows[np.argmin(connected)].item())
+
+        return rows
+
+    def get_positions(self, plane_ids):
+        """Gathers the latest positions of some connected planes.
+
+        Args:
+            plane_ids (list-like): Handles of the planes.
+
+        Returns:
+            numpy.ndarray: Plane positions of shape (n, 2) in km, which are only
+                meaningful for planes which have transmitted, see `received`.
+
+        Raises:
+            KeyError: If a handle is not connected.
+        """
+        return self.positions[self.get_rows(plane_ids)]
+
+    def get_tracked(self):
+        """Gathers the telemetry of every plane which has transmitted.
+
+        Returns:
+            tuple(list, numpy.ndarray, numpy.ndarray): Plane handles, and their
+                positions and velocities of shape (n, 2).
+        """
+        rows = np.flatnonzero(self.connected & self.received)
+
+        return rows.tolist(), self.positions[rows], self.velocities[rows]
+
+    def get_history(self, plane_id):
+        """Retrieves the telemetry history of a plane, oldest first, as views into the
+            ring buffer. The views are only valid until the plane's next update.
+
+        Args:
+            plane_id (int): Handle of the plane.
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray): Sample times in msec,
+                positions of shape (n, 2) in km, and status codes.
+
+        Raises:
+            KeyError: If the plane is not connected.
+        """
+        row = plane_id
+        if not (0 <= row < len(self.connected) and self.connected[row]):
+            raise KeyError(plane_id)
+        end = self.history_head[row] + self.history
+        window = slice(end - self.history_count[row], end)
+
+        return (
+            self.history_times[row, window],
+            self.history_positions[row, window],
+            self.history_statuses[row, window],
+        )
+
+
+class TelemetryRecorder:
+    """Streams telemetry to an append-only, memory-mapped binary file.
+
+    The file holds a fixed header followed by records of `RECORD_DTYPE`, in the order
+    they were received. The header stores the number of records written, so a file
+    can be read back even if the recorder was never closed. The file is grown in
+    chunks as records are appended.
+
+    Args:
+        path (pathlib.Path): Path of the file to record to. Overwritten if it exists.
+        chunk (int, optional): Number of records to grow the file by when full.
+            Defaults to 65536.
+    """
+
+    MAGIC = b"AATCTLM1"
+    HEADER_DTYPE = np.dtype([("magic", "S8"), ("count", "<u8")])
+    RECORD_DTYPE = np.dtype(
+        [
+            ("time", "<f8"),  # msec
+            ("plane_id", "S8"),  # callsign
+            ("position", "<f8", (2,)),  # km
+            ("velocity", "<f8", (2,)),  # km/s
+            ("status", "i1"),  # index into aatc.fleet.STATUSES
+        ]
+    )
+
+    def __init__(self, path, chunk=65536):
+        self.path = Path(path)
+        self.chunk = chunk
+        self.count = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as file:
+            file.truncate(self.HEADER_DTYPE.itemsize)
+        self._header = np.memmap(self.path, dtype=self.HEADER_DTYPE, mode="r+", shape=1)
+        self._header["magic"] = self.MAGIC
+        self._header["count"] = 0
+        self._records = None
+        self._grow()
+
+    def _grow(self):
+        """Extends the file by one chunk and remaps the records."""
+        capacity = (0 if self._records is None else len(self._records)) + self.chunk
+        if self._records is not None:
+            self._records.flush()
+        self._records = np.memmap(
+            self.path,
+            dtype=self.RECORD_DTYPE,
+            mode="r+",
+            offset=self.HEADER_DTYPE.itemsize,
+            shape=capacity,
+        )  # extends the file to fit
+
+    def append_frame(self, frame, callsigns=None):
+        """Appends every sample of a telemetry frame.
+
+        Args:
+            frame (TelemetryFrame): The telemetry frame.
+            callsigns (list-like, optional): Callsign of each plane in the frame, which
+                is recorded instead of its handle, as handles are reused. Defaults to
+                the frame's plane IDs.
+        """
+        n = len(frame.plane_ids)
+        while self.count + n > len(self._records):
+            self._grow()
+
+        records = self._records[self.count : self.count + n]
+        records["time"] = frame.time
+        records["plane_id"] = frame.plane_ids if callsigns is None else callsigns
+        records["position"] = frame.positions
+        records["velocity"] = frame.velocities
+        records["status"] = frame.statuses
+
+        self.count += n
+        self._header["count"] = self.count
+
+    def append(self, plane_id, time, position, velocity, status):
+        """Appends the telemetry of a single plane.
+
+        Args:
+            plane_id (str): Callsign of the plane.
+            time (num): Simulation time of the telemetry in msec.
+            position (list-like): Plane position in km.
+            velocity (list-like): Plane velocity in km/s.
+            status (str): Plane status, one of `aatc.fleet.STATUSES`.
+        """
+        self.append_frame(
+            TelemetryFrame(
+                time=time,
+                plane_ids=[plane_id],
+                positions=[tuple(position)],
+                velocities=[tuple(velocity)],
+                statuses=[STATUS_CODES[status]],
+            )
+        )
+
+    def close(self):
+        """Flushes the records and trims the file to the records written."""
+        self._records.flush()
+        self._header.flush()
+        self._records = None
+        self._header = None
+        with open(self.path, "r+b") as file:
+            file.truncate(
+                self.HEADER_DTYPE.itemsize + self.count * self.RECORD_DTYPE.itemsize
+            )
+
+
+class TelemetryLog:
+    """Read-only view over a file written by `TelemetryRecorder`. Records are memory
+        mapped rather than loaded, so queries by time return zero-copy views.
+
+    Args:
+        path (pathlib.Path): Path of the recorded file.
+    """
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=TelemetryRecorder.HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != TelemetryRecorder.MAGIC:
+            raise ValueError(f"'{path}' is not a telemetry recording")
+
+        count = int(header["count"][0])
+        if count:
+            self.records = np.memmap(
+                path,
+                dtype=TelemetryRecorder.RECORD_DTYPE,
+                mode="r",
+                offset=TelemetryRecorder.HEADER_DTYPE.itemsize,
+                shape=count,
+            )
+        else:  # memmap cannot map zero bytes
+            self.records = np.empty(0, dtype=TelemetryRecorder.RECORD_DTYPE)
+
+        self._plane_order = None  # record indices sorted by plane, built on demand
+        self._plane_ids_sorted = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_between(self, time_start, time_end):
+        """Retrieves the records received in a span of time.
+
+        Args:
+            time_start (num): Start of the span in msec, inclusive.
+            time_end (num): End of the span in msec, exclusive.
+
+        Returns:
+            numpy.ndarray: View of the records in the span.
+        """
+        start, end = np.searchsorted(self.records["time"], [time_start, time_end])
+        return self.records[start:end]
+
+    def get_plane(self, plane_id):
+        """Retrieves the records of a plane, oldest first.
+
+        Args:
+            plane_id (str): Callsign of the plane.
+
+        Returns:
+            numpy.ndarray: Records of the plane.
+        """
+        if self._plane_order is None:
+            self._plane_order = np.argsort(self.records["plane_id"], kind="stable")
+            self._plane_ids_sorted = self.records["plane_id"][self._plane_order]
+
+        key = np.array(plane_id, dtype=self.records.dtype["plane_id"])
+        start = np.searchsorted(self._plane_ids_sorted, key, side="left")
+        end = np.searchsorted(self._plane_ids_sorted, key, side="right")
+
+        return self.records[self._plane_order[start:end]]
@@ -0,0 +1,218 @@
+"""Module for running the controller on its own thread."""
+# stdlib
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+# external
+import numpy as np
+import pygame
+
+LOG = logging.getLogger(__name__)
+
+
+class ControllerWorker:
+    """Runs the automated air traffic controller on a worker thread, so that slow
+        controller work never stalls the frame loop.
+
+    The frame loop submits controller calls, such as telemetry updates and update
+    ticks, to a bounded inbox without ever blocking. Calls marked droppable, which a
+    later call supersedes, are dropped while the inbox is full. Other calls, such as
+    connections and disconnections, are held back in order and resubmitted on the next
+    `poll`. The controller's commands are published to a thread-safe outbox instead of
+    the event queue, and posted as events by `poll` on the frame loop's thread.
+
+    Args:
+        atc (aatc.controller.AATC): The controller to run.
+        maxsize (int, optional): Capacity of the inbox in calls. Defaults to 64.
+        latency_history (int, optional): Number of most recent calls whose latency is
+            kept for the metrics. Defaults to 1000.
+    """
+
+    def __init__(self, atc, maxsize=64, latency_history=1000):
+        self.atc = atc
+        self.atc.outbox = queue.SimpleQueue()
+        self.inbox = queue.Queue(maxsize=maxsize)
+
+        self.processed = 0  # calls completed
+        self.dropped = {}  # controller method: calls dropped while the inbox was full
+        self.errors = 0  # calls which raised
+        self.published = 0  # commands posted as events
+        self.inbox_length_max = 0
+        self.latencies = deque(maxlen=latency_history)  # sec from submit to done
+
+        self._pending = deque()  # calls held back while the inbox was full
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="ControllerWorker", daemon=True
+        )
+
+    def start(self):
+        """Starts the worker thread."""
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Finishes the submitted calls and stops the worker thread. Calls not started
+            by the deadline are abandoned, and a call still running at the deadline
+            is left to finish on the thread in the background.
+
+        Args:
+            timeout (float, optional): Time to wait for the calls to finish and the
+                thread to stop in sec. Defaults to waiting until it stops.
+
+        Returns:
+            bool: Whether the thread stopped in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.join(timeout)
+        self._stopping.set()
+        try:
+            self.inbox.put(None, timeout=self._get_remaining(deadline))  # wake up
+        except queue.Full:
+            pass
+        self._thread.join(self._get_remaining(deadline))
+        if self._thread.is_alive():
+            LOG.warning(f"Controller worker did not stop within {timeout} sec")
+            return False
+
+        return True
+
+    def join(self, timeout=None):
+        """Blocks until every submitted call was processed, including those held
+            back.
+
+        Args:
+            timeout (float, optional): Time to wait in sec. Defaults to waiting until
+                every call was processed.
+
+        Returns:
+            bool: Whether every call was processed in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while self._pending:
+                self.inbox.put(self._pending[0], timeout=self._get_remaining(deadline))
+                self._pending.popleft()
+        except queue.Full:
+            return False
+
+        with self.inbox.all_tasks_done:
+            while self.inbox.unfinished_tasks:
+                remaining = self._get_remaining(deadline)
+                if remaining == 0:
+                    return False
+                self.inbox.all_tasks_done.wait(remaining)
+
+        return True
+
+    @staticmethod
+    def _get_remaining(deadline):
+        """Calculates the time left until a deadline.
+
+        Args:
+            deadline (float): Deadline in `time.monotonic` sec, or None.
+
+        Returns:
+            float: Time left in sec, at least 0, or None without a deadline.
+        """
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def _run(self):
+        while not self._stopping.is_set():
+            call = self.inbox.get()
+            if call is None:
+                self.inbox.task_done()
+                return
+            method, args, time_submitted = call
+            try:
+                getattr(self.atc, method)(*args)
+            except Exception:
+                self.errors += 1
+                LOG.exception(f"Controller call '{method}' failed")
+            self.latencies.append(time.perf_counter() - time_submitted)
+            self.processed += 1
+            self.inbox.task_done()
+
+    def _flush(self):
+        """Moves the calls held back to the inbox, while it has room.
+
+        Returns:
+            bool: Whether no call is held back anymore.
+        """
+        while self._pending:
+            try:
+                self.inbox.put_nowait(self._pending[0])
+            except queue.Full:
+                return False
+            self._pending.popleft()
+
+        return True
+
+    def submit(self, method, *args, droppable=False):
+        """Submits a controller call to the worker without blocking.
+
+        Args:
+            method (str): Name of the controller method to call.
+            *args: Arguments of the call.
+            droppable (bool, optional): Whether the call may be dropped if the inbox
+                is full, because a later call supersedes it. Defaults to False.
+
+        Returns:
+            bool: Whether the call was submitted.
+        """
+        call = (method, args, time.perf_counter())
+        if self._flush():
+            try:
+                self.inbox.put_nowait(call)
+                self.inbox_length_max = max(self.inbox_length_max, self.inbox.qsize())
+                return True
+            except queue.Full:
+                pass
+
+        if droppable:
+            self.dropped[method] = self.dropped.get(method, 0) + 1
+            return False
+        self._pending.append(call)
+
+        return True
+
+    def poll(self):
+        """Resubmits the calls held back, and posts the commands published by the
+        controller to the event queue. Called once per frame."""
+        self._flush()
+        while True:
+            try:
+                channel, attributes = self.atc.outbox.get_nowait()
+            except queue.Empty:
+                return
+            pygame.event.post(
+                pygame.event.Event(self.atc.channels[channel], **attributes)
+            )
+            self.published += 1
+
+    def get_metrics(self):
+        """Gathers the back-pressure and latency metrics of the worker.
+
+        Returns:
+            dict: Inbox and held back call counts, dropped, processed and failed call
+                counts, published command count, and the p50, p95 and max latency from
+                submitting a call to completing it in msec.
+        """
+        latencies = np.array(list(self.latencies)) * 1000  # copied at once
+        return {
+            "inbox_length": self.inbox.qsize(),
+            "inbox_length_max": self.inbox_length_max,
+            "pending": len(self._pending),
+            "dropped": dict(self.dropped),
+            "processed": self.processed,
+            "errors": self.errors,
+            "published": self.published,
+            **{
+                f"latency_{name}": (
+                    float(np.percentile(latencies, q)) if len(latencies) else None
+                )
+                for name, q in (("p50", 50), ("p95", 95), ("max", 100))
+            },
+        }
@@ -0,0 +1,45 @@
+"""Tests for the asset manager."""
+# stdlib
+import logging
+
+# external
+import pygame
+import pytest
+
+# project
+from aatc.asset_manager import ASSETS_PATH, AssetManager
+
+LOG = logging.getLogger(__name__)
+
+ASSETS_AUDIO_PATH = ASSETS_PATH / "audio"
+ASSETS_IMAGES_PATH = ASSETS_PATH / "images"
+
+
+def test_assetmanager_no_audio():
+    """Test that images are cached and playback is a no-op without audio."""
+    assets = AssetManager(ASSETS_AUDIO_PATH, ASSETS_IMAGES_PATH, audio=False)
+    assert assets.images == {}  # loaded on first use
+
+    assert assets.get_image("paper_plane.png") is assets.get_image("paper_plane.png")
+    assets.play("plane_spawn.wav")
+    assert assets.sounds == {}
+
+
+def test_assetmanager_play_coalesces(monkeypatch):
+    """Test that repeated sounds within a frame are coalesced."""
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    assets = AssetManager(ASSETS_AUDIO_PATH, ASSETS_IMAGES_PATH, channels=2)
+    assets.load()
+    if not assets.audio:
+        pytest.skip("No mixer available")
+    LOG.info(f"Loaded sounds: {list(assets.sounds)}")
+
+    for _ in range(5):
+        assets.play("plane_spawn.wav")
+    assert pygame.mixer.get_busy()
+    assert assets._sounds_played == {"plane_spawn.wav"}
+
+    assets.play("plane_land.wav")
+    assets.end_frame()
+    assets.play("plane_crash.wav")  # both channels busy
+    assert assets.sounds_dropped == 1
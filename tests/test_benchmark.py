@@ -0,0 +1,40 @@
+"""Tests for the benchmark suite."""
+# stdlib
+import logging
+
+# external
+import pytest
+
+# project
+from aatc import benchmark
+
+LOG = logging.getLogger(__name__)
+
+
+@pytest.mark.timed
+def test_run_benchmarks_compare():
+    """Test that every benchmark runs, and that comparing against a slower or faster
+    baseline flags only the regressions."""
+    benchmarks = benchmark.run_benchmarks(sizes=(10,), repeat=1)
+    LOG.info(f"Benchmarks: {benchmarks}")
+
+    assert set(benchmarks["results"]) == set(benchmark.BENCHMARKS)
+    assert all(times["10"] > 0 for times in benchmarks["results"].values())
+
+    baseline = {
+        "results": {
+            "GameEngine.update": {
+                "10": benchmarks["results"]["GameEngine.update"]["10"] / 2
+            },
+            "GameEngine.draw": {
+                "10": benchmarks["results"]["GameEngine.draw"]["10"] * 2
+            },
+            "Plane.update": {"1000": 1.0},  # size not benchmarked
+        }
+    }
+    comparisons = benchmark.compare(benchmarks, baseline, threshold=0.2)
+
+    assert [(c["name"], c["regression"]) for c in comparisons] == [
+        ("GameEngine.update", True),
+        ("GameEngine.draw", False),
+    ]
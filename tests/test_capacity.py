@@ -0,0 +1,43 @@
+"""Tests for the Monte Carlo runway capacity study."""
+# stdlib
+import json
+import logging
+
+# project
+from aatc import capacity
+
+LOG = logging.getLogger(__name__)
+
+
+def test_run_capacity_study(tmp_path):
+    """Test that a parameter sweep runs every trial in the process pool with its own
+    seed, and aggregates the results into one file."""
+    output = tmp_path / "capacity.json"
+    sweep = {
+        "spawn_planes_interval_avg": [3, 10],
+        "spawn_planes_interval_min": [1],
+        "spawn_planes_interval_max": [30],
+    }
+    study = capacity.run_capacity_study(
+        sweep, runs=2, duration=120, seed=1, processes=2, output=output
+    )
+    LOG.info(f"Summary: {study['summary']}")
+
+    with open(output) as file:
+        assert json.load(file) == study
+    assert len(study["trials"]) == 4
+    assert len({trial["seed"] for trial in study["trials"]}) == 4
+    assert [entry["spawn_planes_interval_avg"] for entry in study["summary"]] == [3, 10]
+    assert all(entry["runs"] == 2 for entry in study["summary"])
+    assert all(trial["planes_landed"] > 0 for trial in study["trials"])
+    assert all(trial["flight_time_mean"] > 0 for trial in study["trials"])
+    assert all(trial["landing_delay_mean"] is not None for trial in study["trials"])
+    assert all(
+        trial["queue_length_max"] <= trial["planes_spawned"]
+        for trial in study["trials"]
+    )
+
+    trial = capacity.get_trials(sweep, runs=2, duration=120, seed=1)[0]
+    result, result_pooled = capacity.run_trial(trial), study["trials"][0]
+    del result["time_elapsed"], result_pooled["time_elapsed"]
+    assert result == result_pooled  # reproducible outside the pool
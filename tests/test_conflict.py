@@ -0,0 +1,133 @@
+"""Tests for separation loss detection."""
+# stdlib
+import logging
+import timeit
+
+# external
+import numpy as np
+import pytest
+
+# project
+from aatc.conflict import ConflictDetector, ConflictPredictor, SpatialHash
+
+LOG = logging.getLogger(__name__)
+
+
+def test_spatialhash_get_pairs_within():
+    """Test that get_pairs_within() finds the same pairs as a brute force search."""
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-10, 10, size=(500, 2))
+    radius = 0.5
+
+    grid = SpatialHash(cell_size=radius)
+    grid.build(positions)
+    i, j, _ = grid.get_pairs_within(radius)
+    pairs = {tuple(sorted(pair)) for pair in zip(i.tolist(), j.tolist())}
+
+    distance = np.linalg.norm(positions[:, None] - positions[None, :], axis=-1)
+    a, b = np.nonzero(np.triu(distance < radius, k=1))
+    pairs_expected = set(zip(a.tolist(), b.tolist()))
+    LOG.info(f"Found {len(pairs)} pairs, expected {len(pairs_expected)}")
+
+    assert len(i) == len(pairs)  # no duplicates
+    assert pairs == pairs_expected
+
+
+def test_conflictdetector_update():
+    """Test that the conflict detector reports new conflicts once and answers
+    queries."""
+    detector = ConflictDetector(separation=0.5)
+
+    conflicts_new = detector.update(
+        plane_ids=["A", "B", "C"], positions=[(0, 0), (0.3, 0), (5, 5)]
+    )
+    assert conflicts_new == [("A", "B")]
+    assert detector.get_conflicts("C") == {}
+    assert sorted(detector.query((0.1, 0))) == ["A", "B"]
+
+    conflicts_new = detector.update(
+        plane_ids=["A", "B", "C"], positions=[(0, 0), (0.2, 0), (5, 5)]
+    )
+    assert conflicts_new == []
+    assert list(detector.get_conflicts()) == [("A", "B")]
+
+
+def test_conflictpredictor_predict():
+    """Test that the predictor forecasts converging planes, soonest first, and
+    ignores diverging ones."""
+    predictor = ConflictPredictor(separation=0.5, horizon=60)
+
+    conflicts = predictor.predict(
+        plane_ids=["A", "B", "C", "D", "E", "F"],
+        positions=[(-2, 0), (2, 0), (-2, 5), (2, 5), (0, -5), (0, 5.1)],
+        velocities=[(0.1, 0), (-0.1, 0), (0.05, 0), (-0.05, 0), (0, -0.1), (0, 0.1)],
+    )
+    LOG.info(f"Predicted conflicts: {conflicts}")
+
+    assert [(c.plane_id_a, c.plane_id_b) for c in conflicts] == [("A", "B"), ("C", "D")]
+    assert conflicts[0].time == pytest.approx(20)
+    assert conflicts[1].time == pytest.approx(40)
+    assert conflicts[0].distance == pytest.approx(0)
+
+
+@pytest.mark.timed
+def test_conflictpredictor_predict_timed():
+    """Time the predictor for a few hundred planes spread over the ATC zone, and test
+    that the broad phase prunes most pairs."""
+    rng = np.random.default_rng(0)
+    n = 300
+    angle = rng.uniform(0, 2 * np.pi, n)
+    positions = rng.uniform(-10, 10, size=(n, 2))
+    velocities = np.stack((np.cos(angle), np.sin(angle)), axis=1) * 0.14
+    predictor = ConflictPredictor(separation=0.5, horizon=30)
+
+    runs = 100
+    time_best = min(
+        timeit.repeat(
+            lambda: predictor.predict(list(range(n)), positions, velocities),
+            number=runs,
+            repeat=5,
+        )
+    )
+    LOG.info(
+        f"Predicted conflicts for {n} planes in {time_best / runs * 1e3:.3f}ms, "
+        f"checking {predictor.pairs_checked} pairs"
+    )
+
+    assert predictor.pairs_checked < n * (n - 1) / 2 / 10  # of every pair
+
+
+def test_conflictpredictor_matches_brute_force():
+    """Test that the time-sliced broad phase never misses a conflict found by checking
+    every pair."""
+    rng = np.random.default_rng(1)
+    n = 200
+    positions = rng.uniform(-10, 10, size=(n, 2))
+    velocities = rng.uniform(-0.2, 0.2, size=(n, 2))
+    velocities[:5] = 0  # stationary planes
+    predictor = ConflictPredictor(separation=0.5, horizon=30)
+
+    expected = set()
+    for a in range(n):
+        for b in range(a + 1, n):
+            dp, dv = positions[b] - positions[a], velocities[b] - velocities[a]
+            dv_squared = dv @ dv
+            time = 0 if dv_squared == 0 else np.clip(-(dp @ dv) / dv_squared, 0, 30)
+            if np.linalg.norm(dp + dv * time) < 0.5:
+                expected.add((a, b))
+
+    conflicts = predictor.predict(list(range(n)), positions, velocities)
+    LOG.info(f"Predicted {len(conflicts)} conflicts")
+
+    assert {(c.plane_id_a, c.plane_id_b) for c in conflicts} == expected
+
+
+def test_conflict_empty():
+    """Test that no planes, or no nearby planes, yield no conflicts."""
+    detector = ConflictDetector(separation=0.5)
+
+    assert detector.update(plane_ids=[], positions=[]) == []
+    assert detector.query((0, 0)) == []
+
+    predictor = ConflictPredictor(separation=0.5)
+    assert predictor.predict(["A", "B"], [(0, 0), (50, 0)], [(0, 0), (0, 0)]) == []
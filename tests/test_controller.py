@@ -0,0 +1,134 @@
+"""Tests for the automated air traffic controller."""
+# stdlib
+import logging
+
+# external
+import numpy as np
+import pygame
+import pytest
+from pygame.math import Vector2
+
+# project
+from aatc import controller, game
+from aatc.game_objects import Plane, Runway
+from aatc.planner import FlightPlanner, heading_to
+
+LOG = logging.getLogger(__name__)
+
+
+def test_aatc_get_nearest_open_runways():
+    """Test the batch nearest open runway query against a per-plane search, and
+    that closing a runway invalidates the cache."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    rng = np.random.default_rng(0)
+    runways = [
+        Runway(f"R{i}", Vector2(tuple(entry)), Vector2(tuple(entry + (0, 1))))
+        for i, entry in enumerate(rng.uniform(-10, 10, size=(50, 2)))
+    ]
+    atc = controller.AATC(channels=GE.events, runways=runways)
+
+    plane_ids = list(range(1000))
+    positions = rng.uniform(-10, 10, size=(1000, 2))
+    for plane_id, position in zip(plane_ids, positions):
+        atc.planes.add(plane_id)
+        atc.planes.update(
+            plane_id, time=0, position=position, velocity=(0, 0), status="CRUISING"
+        )
+
+    def nearest_expected():
+        runways_open = [r for r in runways if atc.runways[r.id]["status"] == "OPEN"]
+        return [
+            min(
+                runways_open, key=lambda r: (Vector2(tuple(p)) - r.entry_coord).length()
+            ).id
+            for p in positions
+        ]
+
+    assert atc.get_nearest_open_runways(plane_ids, chunk=300) == nearest_expected()
+
+    nearest_first = atc.get_nearest_open_runway_to_plane(plane_ids[0])
+    atc.set_runway_status(nearest_first, "CLOSED")
+    LOG.info(f"Closed runway {nearest_first}")
+
+    assert atc.get_nearest_open_runway_to_plane(plane_ids[0]) != nearest_first
+    assert atc.get_nearest_open_runways(plane_ids) == nearest_expected()
+
+
+def test_aatc_get_nearest_open_runways_untracked():
+    """Test that planes without telemetry get no runway, and that unknown planes
+    raise."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    runways = [Runway("R0", Vector2(0, 0), Vector2(0, 1))]
+    atc = controller.AATC(channels=GE.events, runways=runways)
+    atc.planes.add(0)
+    atc.planes.add(1)
+    atc.planes.update(0, time=0, position=(1, 1), velocity=(0, 0), status="CRUISING")
+
+    assert atc.get_nearest_open_runways([0, 1]) == ["R0", None]
+    assert atc.get_nearest_open_runway_to_plane(1) is None
+
+    atc.planes.remove(1)
+    for plane_id in (1, 2, -1):
+        with pytest.raises(KeyError):
+            atc.get_nearest_open_runways([0, plane_id])
+
+
+def test_aatc_generate_flight_plan():
+    """Test that flight plans reach the runway within the plane's turn rate, reusing
+    the cached approach of the plane's sector."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    GE.spawn_planes = False
+    atc = GE.atc
+    planner = atc.planner
+
+    plans = []
+    for i, angle in enumerate((0.1, 0.15)):  # same sector
+        position = Vector2(np.cos(angle), np.sin(angle)) * 10
+        atc.planes.add(i)
+        atc.planes.update(
+            i,
+            time=0,
+            position=position,
+            velocity=-0.14 * position.normalize(),
+            status="CRUISING",
+        )
+        plans.append(atc.generate_flight_plan(i, runway_id="B"))
+    LOG.info(f"Flight plan: {plans[0].waypoints}")
+
+    approach = planner.get_approach(planner.get_sector(position), "B")
+    for a, b, c in zip(approach, approach[1:], approach[2:]):
+        assert planner.can_fly_to(b, heading_to(b - a), c)
+    assert planner.get_approach.cache_info().misses == 1
+    assert planner.get_approach.cache_info().hits == 2
+    for plan in plans:
+        assert plan.waypoints[-1] == atc.runways["B"]["entry_coord"]
+        assert plan.waypoints == list(approach[-len(plan.waypoints) :])
+
+    atc.send_flight_plan(0, plans[0])
+    events = pygame.event.get(GE.events["FLIGHTPLAN"])
+    assert len(events) == 1
+    assert events[0].plan is plans[0]
+    assert atc.paths == [plans[0]]
+
+
+def test_flightplanner_plan_turn_limited():
+    """Test that every leg of a plan is within the plane's turn rate, including
+    intercepting a runway entry too close to turn towards."""
+    runways = {"B": {"entry_coord": Vector2(2, 1)}}
+    planner = FlightPlanner(runways, speed=Plane.SPEED, turn_rate=Plane.TURN_RATE)
+    rng = np.random.default_rng(0)
+
+    cases = [(Vector2(2, -1), 0)]  # runway entry dead ahead, well within a turn
+    for angle, radius, heading in zip(
+        rng.uniform(0, 2 * np.pi, 50),
+        rng.uniform(1, 10, 50),
+        rng.uniform(-180, 180, 50),
+    ):
+        cases.append((Vector2(np.cos(angle), np.sin(angle)) * radius, heading))
+
+    for position, heading in cases:
+        waypoints = planner.plan(position, heading, "B").waypoints
+        assert waypoints[-1] == runways["B"]["entry_coord"]
+        for waypoint in waypoints:
+            assert planner.can_fly_to(position, heading, waypoint)
+            position, heading = waypoint, heading_to(waypoint - position)
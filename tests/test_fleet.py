@@ -0,0 +1,148 @@
+"""Tests for the array-backed fleet state engine."""
+# stdlib
+import logging
+
+# external
+import pytest
+from pygame.math import Vector2
+
+# project
+from aatc import game
+from aatc.fleet import Fleet
+from aatc.game_objects import Path, Plane
+
+LOG = logging.getLogger(__name__)
+
+
+def test_fleet_step_matches_plane_physics():
+    """Test that Fleet.step() advances planes exactly like per-plane physics."""
+    GE = game.GameEngine(screen_size=(100, 100))
+    fleet = Fleet(capacity=2)  # small capacity to exercise growth
+    dt = 0.5  # sec
+
+    planes_loose = []
+    planes_fleet = []
+    for i, heading in enumerate((0, 45, 90, 200, 315)):
+        planes_loose.append(Plane(i, Vector2(1, 2), heading, GE.events))
+        plane = Plane(i, Vector2(1, 2), heading, GE.events)
+        plane.attach(fleet)
+        planes_fleet.append(plane)
+
+    for _ in range(10):
+        fleet.step(dt)
+        for plane in planes_loose:
+            plane.position += plane.get_velocity() * dt
+
+    for plane_loose, plane_fleet in zip(planes_loose, planes_fleet):
+        LOG.info(f"Loose: {plane_loose.position}, fleet: {plane_fleet.position}")
+        assert (plane_loose.position - plane_fleet.position).length() < 1e-9
+
+    assert len(fleet) == 5
+
+
+def test_fleet_detach_frees_row():
+    """Test that a detached plane keeps its state and its row is taken again by the
+    next plane holding its handle."""
+    GE = game.GameEngine(screen_size=(100, 100))
+    fleet = Fleet()
+
+    plane = Plane(0, Vector2(3, 4), 90, GE.events)
+    plane.attach(fleet)
+    plane.status = "HOLDING"
+    row = plane._fleet_row
+    fleet.step(1)
+    plane.detach()
+
+    assert plane.position == Vector2(3 - plane.speed, 4)
+    assert plane.status == "HOLDING"
+    assert len(fleet) == 0
+
+    plane_new = Plane(0, Vector2(0, 0), 0, GE.events, callsign="B")
+    plane_new.attach(fleet)
+    assert plane_new._fleet_row == row
+
+    with pytest.raises(ValueError):
+        Plane(0, Vector2(0, 0), 0, GE.events).attach(fleet)  # handle already held
+
+
+def test_fleet_navigate_matches_plane():
+    """Test that Fleet.navigate() steers planes along their flight plans exactly like
+    per-plane navigation, landing them at the end of their plans."""
+    GE = game.GameEngine(screen_size=(100, 100))
+    fleet = Fleet()
+    dt = 0.5  # sec
+    plans = [
+        Path([(0, 2), (2, 3), (2, 5)], radius=0.2),
+        Path([(-1, 1), (-3, 0)], radius=0.2),
+        Path([(0.5, -2)], radius=0.2),
+    ]
+
+    planes_loose = []
+    planes_fleet = []
+    for planes, attach in ((planes_loose, False), (planes_fleet, True)):
+        for i, plan in enumerate(plans + [None]):
+            plane = Plane(i, Vector2(0, 0), 0, GE.events)
+            plane.turn_rate = 20  # °/s
+            if attach:
+                plane.attach(fleet)
+            if plan is None:
+                plane.hold()
+            else:
+                plane.follow_plan(plan)
+            planes.append(plane)
+
+    landed_loose, landed_fleet = [], []
+    for _ in range(200):
+        rows = fleet.navigate(dt)
+        landed_fleet.extend(rows.tolist())
+        fleet.step(dt)
+        for plane in planes_loose:
+            if plane.navigate(dt):
+                landed_loose.append(plane.id)
+            plane.position += plane.get_velocity() * dt
+
+    for plane_loose, plane_fleet in zip(planes_loose, planes_fleet):
+        LOG.info(f"Loose: {plane_loose.position}, fleet: {plane_fleet.position}")
+        assert (plane_loose.position - plane_fleet.position).length() < 1e-9
+        assert plane_loose.waypoint_index == plane_fleet.waypoint_index
+        assert plane_loose.status == plane_fleet.status
+
+    assert landed_loose == landed_fleet
+    assert sorted(landed_fleet) == [0, 1, 2]
+    assert planes_fleet[0].waypoint_index == 3
+    assert planes_fleet[3].status == "HOLDING"
+
+
+def test_navigate_single_waypoint():
+    """Test that loose and fleet planes at their default turn rate pass a single
+    waypoint they cannot turn onto exactly, instead of circling it."""
+    GE = game.GameEngine(screen_size=(100, 100))
+    fleet = Fleet()
+    dt = 0.1  # sec
+    plan = Path([(0.5, 2)], radius=0.1)  # too far off the nose to hit
+
+    plane_loose = Plane(0, Vector2(0, 0), 0, GE.events)
+    plane_fleet = Plane(1, Vector2(0, 0), 0, GE.events)
+    plane_fleet.attach(fleet)
+    for plane in (plane_loose, plane_fleet):
+        plane.follow_plan(plan)
+
+    landed_loose, landed_fleet = False, False
+    for _ in range(300):  # 30 sec, about twice the time to fly by the waypoint
+        landed_fleet = landed_fleet or len(fleet.navigate(dt)) > 0
+        fleet.step(dt)
+        landed_loose = landed_loose or plane_loose.navigate(dt)
+        plane_loose.position += plane_loose.get_velocity() * dt
+
+    assert landed_loose and landed_fleet
+    assert plane_loose.status == plane_fleet.status == "LANDING"
+
+
+def test_path_segments():
+    """Test the segment arrays precomputed by Path."""
+    path = Path([(0, 0), (3, 4), (3, 4), (3, 6)])
+
+    assert path.lengths.tolist() == [5, 0, 2]
+    assert path.distances.tolist() == [0, 5, 5, 7]
+    assert path.directions.tolist() == [[0.6, 0.8], [0, 0], [0, 1]]
+    assert path.entry_directions.tolist() == [[0.6, 0.8], [0.6, 0.8], [0, 0], [0, 1]]
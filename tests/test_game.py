@@ -1,8 +1,14 @@
 """Tests for game object functionality."""
 # stdlib
 import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
 
 # external
+import numpy as np
 from pygame.math import Vector2
 
 # project
@@ -11,6 +17,38 @@ from aatc import game
 LOG = logging.getLogger(__name__)
 
 
+def test_gameengine_lazy_startup():
+    """Test that the window, mixer and assets are only set up on first use, and that
+    the time to the first frame is measured."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    assert GE._screen is None
+    assert GE.assets.images == {}
+
+    GE.step()
+    GE.draw()
+    LOG.info(f"Time to first frame: {GE.time_to_first_frame:.3f}s")
+
+    assert GE.screen.get_size() == (100, 100)
+    assert GE.time_to_first_frame > 0
+
+
+def test_main_import_has_no_side_effects(tmp_path):
+    """Test that importing the entry script outside of the repository neither creates
+    logs nor configures logging, and that assets resolve relative to the package."""
+    code = (
+        "import logging, aatc.main;"
+        "assert not logging.getLogger().handlers;"
+        "GE = aatc.main.game.GameEngine(headless=True);"
+        "GE.assets.load();"
+        "assert GE.assets.images"
+    )
+    package_path = str(Path(game.__file__).parents[1])
+    env = {**os.environ, "PYTHONPATH": package_path, "SDL_AUDIODRIVER": "dummy"}
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+
+    assert list(tmp_path.iterdir()) == []
+
+
 def test_gameengine_vector_to_screen():
     """Test vector_to_screen()."""
     GE = game.GameEngine(screen_size=(100, 100))
@@ -25,3 +63,62 @@ def test_gameengine_vector_to_screen():
     LOG.info(f"Vector in screen coordinates: {vector_screen}, ({type(vector_screen)})")
 
     assert vector_screen == (52, 48)
+
+
+def test_gameengine_simulate_headless():
+    """Test that a headless simulation advances simulated time faster than real
+    time and drives spawning, telemetry, the controller and landing."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    GE.spawn_planes_interval_avg = 10  # sec
+
+    time_start = time.perf_counter()
+    GE.simulate(duration=300)  # sec
+    time_elapsed = time.perf_counter() - time_start
+    LOG.info(f"Simulated 300s with {len(GE.planes)} planes in {time_elapsed:.2f}s")
+
+    assert GE.time >= 300 * 1000
+    assert GE.atc.time == GE.time
+    assert time_elapsed < 300
+    assert len(GE.planes) > 1
+    assert len(GE.atc.planes) == len(GE.planes)
+    assert all(plane["position"] is not None for plane in GE.atc.planes.values())
+    assert GE.planes_landed > 0
+    assert len(GE.atc.paths) <= len(GE.planes)
+
+
+def test_gameengine_plane_registry():
+    """Test that the plane registry stays in sync with spawning and removal."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True, fleet=True)
+    for _ in range(3):
+        GE.spawn_plane()
+
+    for handle, plane in enumerate(GE.planes):
+        assert plane.id == handle
+        assert GE.get_plane(plane.id) is plane
+        assert GE.handles.get_callsign(plane.id) == plane.callsign
+
+    plane = GE.planes[1]
+    GE.remove_plane(plane.id)
+
+    assert plane.id not in GE.plane_registry
+    assert plane not in GE.planes
+    assert len(GE.planes) == len(GE.plane_registry) == len(GE.fleet) == 2
+
+
+def test_gameengine_vectors_to_screen():
+    """Test that vectors_to_screen() matches vector_to_screen() point by point, and
+    follows the camera."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    vectors = np.random.default_rng(0).uniform(-10, 10, size=(50, 2))
+
+    for pan, scale in ((0, 25), (10, 25), (10, 3)):
+        GE.origin[0] += pan
+        GE.screen_scale = scale
+        vectors_screen = GE.vectors_to_screen(vectors)
+
+        assert vectors_screen.shape == (50, 2)
+        for vector, vector_screen in zip(vectors, vectors_screen):
+            v = Vector2(tuple(vector))
+            v_expected = GE.origin - Vector2(v.x * -1, v.y) * GE.screen_scale
+            assert GE.vector_to_screen(v) == v_expected
+            assert tuple(vector_screen) == tuple(v_expected)
@@ -0,0 +1,35 @@
+"""Tests for game objects."""
+# stdlib
+import logging
+
+# external
+import numpy as np
+
+# project
+from aatc.game_objects import GlyphCache, Plane
+
+LOG = logging.getLogger(__name__)
+
+
+def test_glyphcache():
+    """Test that cached glyphs match rotating the shape directly, and that the cache is
+    bounded and cleared on zoom."""
+    glyphs = GlyphCache(Plane.shape, resolution=1, size=90)
+
+    for heading in (0, 33, 90, 181, 359.6):
+        glyph = glyphs.get(heading, scale=25)
+        expected = np.array(
+            [tuple(point.rotate(-1 * round(heading) + 180)) for point in Plane.shape]
+        )
+        LOG.info(f"Glyph for heading {heading}: {glyph.tolist()}")
+        assert np.allclose(glyph, expected * 25)
+
+    assert glyphs.get(359.6, scale=25) is glyphs.get(0.2, scale=25)  # same quantum
+    assert glyphs.hits == 3  # 359.6° also hit the glyph built for 0°
+
+    for heading in range(360):
+        glyphs.get(heading, scale=25)
+    assert len(glyphs) == 90
+
+    glyphs.get(0, scale=26)  # zoom
+    assert len(glyphs) == 1
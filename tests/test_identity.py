@@ -0,0 +1,42 @@
+"""Tests for plane identities."""
+# stdlib
+import logging
+import sys
+
+# external
+import numpy as np
+
+# project
+from aatc.identity import PlaneHandles
+
+LOG = logging.getLogger(__name__)
+
+
+def test_planehandles_callsigns_unique():
+    """Test that generated callsigns never collide and are interned."""
+    handles = PlaneHandles(rng=np.random.default_rng(0))
+    callsigns = [handles.generate_callsign() for _ in range(100000)]
+    LOG.info(f"First callsigns: {callsigns[:5]}")
+
+    assert len(set(callsigns)) == len(callsigns)
+    assert all(len(callsign) == 6 for callsign in callsigns[:100])
+    assert sys.intern("".join(callsigns[0])) is callsigns[0]
+
+    small = PlaneHandles(size=2, rng=np.random.default_rng(1))
+    assert len({small.generate_callsign() for _ in range(36 ** 2)}) == 36 ** 2
+
+
+def test_planehandles_reuse_after_quarantine():
+    """Test that handles stay dense, and that released handles are reissued first in
+    first out only once more than the quarantine are free."""
+    handles = PlaneHandles(quarantine=2)
+    assert [handles.allocate() for _ in range(5)] == [0, 1, 2, 3, 4]
+
+    for handle in (3, 1, 4):
+        handles.release(handle)
+    assert handles.get_callsign(1) is None
+    assert len(handles) == 2
+
+    assert handles.allocate(callsign="ABC123") == 3  # oldest released first
+    assert handles.get_callsign(3) == "ABC123"
+    assert handles.allocate() == 5  # only the quarantine is free
@@ -0,0 +1,83 @@
+"""Tests for the logging pipeline."""
+# stdlib
+import logging
+
+# project
+from aatc import log
+from aatc.log import TELEMETRY, RateLimitFilter, allow, configure_logging
+
+LOG = logging.getLogger(__name__)
+
+
+def test_ratelimitfilter_limits_categories():
+    """Test that only tagged records beyond the burst are dropped."""
+    rate_limit = RateLimitFilter({"telemetry": 1e-6}, burst=3)
+    record_telemetry = logging.makeLogRecord({"msg": "telemetry", **TELEMETRY})
+    record_other = logging.makeLogRecord({"msg": "other"})
+
+    passed = [rate_limit.filter(record_telemetry) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert rate_limit.suppressed == {"telemetry": 7}
+    assert all(rate_limit.filter(record_other) for _ in range(10))
+
+
+def test_configure_logging_writes_in_background(tmp_path, monkeypatch):
+    """Test that records reach the log file through the writer thread, with telemetry
+    rate limited and disabled levels never formatted."""
+    monkeypatch.setattr(log, "_rate_limiter", None)  # restored after the test
+
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError("formatted a disabled record")
+
+    path = tmp_path / "main.log"
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    listener = configure_logging(path=path, rates={"telemetry": 1e-6}, stdout=False)
+    try:
+        for i in range(100):
+            LOG.info("Telemetry %d", i, extra=TELEMETRY)
+        LOG.info("Done")
+        LOG.debug("Disabled %s", Unformattable())
+        listener.stop()
+    finally:
+        root.handlers, root.level = handlers, level
+
+    lines = path.read_text().splitlines()
+    LOG.info(f"Logged {len(lines)} lines")
+    assert len(lines) == 11  # the telemetry burst and the last record
+    assert "Telemetry 0" in lines[0]
+    assert "Done" in lines[-1]
+
+
+def test_allow_skips_records_over_the_limit(tmp_path, monkeypatch):
+    """Test that guarded log sites build no record or arguments over the rate limit,
+    and share the limit with tagged records."""
+    monkeypatch.setattr(log, "_rate_limiter", None)
+    assert allow("telemetry")  # not configured yet
+
+    path = tmp_path / "main.log"
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    listener = configure_logging(
+        path=path, level=logging.DEBUG, rates={"telemetry": 1e-6}, stdout=False
+    )
+    arguments_built = 0
+
+    def build_argument():
+        nonlocal arguments_built
+        arguments_built += 1
+        return arguments_built
+
+    try:
+        for _ in range(100):
+            if LOG.isEnabledFor(logging.DEBUG) and allow("telemetry"):
+                LOG.debug("Telemetry %d", build_argument())
+        LOG.debug("Tagged", extra=TELEMETRY)  # the bucket is empty
+        listener.stop()
+    finally:
+        root.handlers, root.level = handlers, level
+
+    assert arguments_built == 10
+    assert log._rate_limiter.suppressed == {"telemetry": 91}
+    assert len(path.read_text().splitlines()) == 10
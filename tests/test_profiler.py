@@ -0,0 +1,70 @@
+"""Tests for the frame profiler."""
+# stdlib
+import csv
+import logging
+
+# external
+import numpy as np
+
+# project
+from aatc import game
+from aatc.profiler import FrameProfiler
+
+LOG = logging.getLogger(__name__)
+
+
+def test_profiler_phases_are_exclusive():
+    """Test that time spent in a nested phase is only counted towards that phase."""
+    profiler = FrameProfiler(history=4)
+
+    with profiler.phase("update"):  # no frame open, not timed
+        pass
+    assert profiler.frames == 0
+
+    for _ in range(6):
+        profiler.start_frame(planes=3)
+        with profiler.phase("update"):
+            with profiler.phase("controller"):
+                sum(range(10000))
+    profiler.start_frame()
+
+    samples = profiler.get_samples()
+    LOG.info(f"Samples: {samples}")
+
+    assert samples["frame"].tolist() == [2, 3, 4, 5]  # the last 4 frames
+    assert np.all(samples["controller"] > samples["update"])
+    assert np.all(samples["frame_time"] >= samples["update"] + samples["controller"])
+    assert samples["planes"].tolist() == [3, 3, 3, 3]
+
+
+def test_profiler_game_engine(tmp_path):
+    """Test that profiling a headless run times each phase, counts the events handled,
+    and exports the samples."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True, seed=0)
+    GE.draw_profiler = True
+    for _ in range(120):
+        GE.step()
+        GE.draw()
+    GE.profiler.start_frame()  # close the last frame
+
+    percentiles = GE.profiler.get_percentiles()
+    LOG.info(f"Percentiles: {percentiles}")
+    LOG.info("\n" + "\n".join(GE.profiler.get_overlay_lines()))
+
+    assert set(percentiles) == {"frame", *FrameProfiler.PHASES}
+    for name in ("frame", "events", "update", "controller", "draw"):
+        assert 0 < percentiles[name]["p50"] <= percentiles[name]["p95"]
+        assert percentiles[name]["p95"] <= percentiles[name]["p99"]
+    assert percentiles["idle"]["p99"] == 0  # headless runs uncapped
+    samples = GE.profiler.get_samples()
+    assert samples["events_TELEMETRYFRAME"].sum() > 0
+    assert samples["planes"].max() == len(GE.planes)
+
+    GE.profiler.export(tmp_path / "frames.npz")
+    with np.load(tmp_path / "frames.npz") as archive:
+        assert np.array_equal(archive["draw"], samples["draw"])
+    GE.profiler.export(tmp_path / "frames.csv")
+    with open(tmp_path / "frames.csv") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 120
+    assert float(rows[-1]["update"]) == samples["update"][-1]
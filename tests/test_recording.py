@@ -0,0 +1,78 @@
+"""Tests for deterministic recording and replay of simulation runs."""
+# stdlib
+import logging
+
+# external
+import pytest
+from pygame.math import Vector2
+
+# project
+from aatc import game
+from aatc.game_objects import Path
+from aatc.recording import Recording
+
+LOG = logging.getLogger(__name__)
+
+
+def get_trajectories(GE):
+    """Collects the ID and position of every plane in a game engine."""
+    return [(plane.id, tuple(plane.position)) for plane in GE.planes]
+
+
+def test_gameengine_seed_is_deterministic():
+    """Test that headless runs with the same seed are identical."""
+    trajectories = []
+    for _ in range(2):
+        GE = game.GameEngine(screen_size=(100, 100), headless=True, seed=42)
+        GE.simulate(duration=60)  # sec
+        trajectories.append(get_trajectories(GE))
+    LOG.info(f"Trajectories: {trajectories[0]}")
+
+    assert len(trajectories[0]) > 1
+    assert trajectories[0] == trajectories[1]
+
+
+def test_gameengine_replay(tmp_path):
+    """Test that replaying a saved recording reproduces the recorded run."""
+    GE = game.GameEngine(
+        screen_size=(100, 100), headless=True, fleet=True, seed=7, record=True
+    )
+    GE.simulate(duration=60)  # sec
+    path = tmp_path / "recording.json"
+    GE.recording.save(path)
+
+    GE_replay = game.GameEngine.replay(path, screen_size=(100, 100), fleet=True)
+
+    assert GE_replay.time == GE.time
+    assert get_trajectories(GE_replay) == get_trajectories(GE)
+
+
+def test_recording_save_load(tmp_path):
+    """Test that spawns and commands survive a save and load."""
+    recording = Recording(seed=1, timestep=0.1)
+    recording.record_spawn(100, "ABC123", position=Vector2(1, 2), heading=45)
+    recording.record_command(
+        200, "FLIGHTPLAN", 0, plan=Path([(1, 2), (3, 4)], radius=0.2)
+    )
+    recording.record_command(300, "HOLD", 0)
+    path = tmp_path / "recording.json"
+    recording.save(path)
+
+    recording_loaded = Recording.load(path)
+    plan = Recording.decode_plan(recording_loaded.commands[0][3])
+
+    assert recording_loaded.spawns == [[100, "ABC123", 1, 2, 45]]
+    assert recording_loaded.commands[1] == [300, "HOLD", 0, None]
+    assert plan.waypoints == [Vector2(1, 2), Vector2(3, 4)]
+    assert plan.radius == 0.2
+
+
+def test_gameengine_recording_is_opt_in():
+    """Test that runs are only recorded on request, and only with a fixed timestep."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True, seed=1)
+    GE.simulate(duration=10)  # sec
+
+    assert GE.recording is None
+    assert GE.planes_spawned > 0
+    with pytest.raises(ValueError):
+        game.GameEngine(screen_size=(100, 100), record=True)  # variable timestep
@@ -0,0 +1,124 @@
+"""Tests for rendering the simulation."""
+# stdlib
+import logging
+import time
+
+# external
+import numpy as np
+import pygame
+from pygame.math import Vector2
+
+# project
+from aatc import game
+from aatc.game_objects import Path, Plane
+
+LOG = logging.getLogger(__name__)
+
+
+def test_renderer_background_cache():
+    """Test that the background layer is only redrawn when the camera or the paths
+    change."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    renderer = GE.renderer
+
+    for _ in range(3):
+        GE.draw()
+    assert renderer.background_rebuilds == 1
+
+    GE.origin[0] += 10  # pan
+    GE.draw()
+    GE.screen_scale += 1  # zoom
+    GE.draw()
+    GE.atc.paths.append(Path([(0, 0), (1, 1)]))
+    GE.draw()
+    GE.draw()
+    LOG.info(f"Background redrawn {renderer.background_rebuilds} times")
+
+    assert renderer.background_rebuilds == 4
+
+
+def test_renderer_dirty_rects_match_full_redraw():
+    """Test that drawing only the dirty rectangles of moving planes produces the same
+    frame as redrawing the whole screen."""
+    GE = game.GameEngine(screen_size=(200, 200), headless=True, seed=0)
+    GE.spawn_planes_interval_avg = 1  # sec
+    GE.simulate(duration=10)  # sec
+    GE.draw()
+    for _ in range(30):
+        GE.step()
+        GE.draw()  # dirty rects only, unless a path changed
+    frame_dirty = pygame.surfarray.array2d(GE.screen)
+    assert GE.renderer.background_rebuilds < 31
+
+    GE.renderer.invalidate()
+    GE.draw()
+    frame_full = pygame.surfarray.array2d(GE.screen)
+
+    assert len(GE.planes) > 1
+    assert (frame_dirty == frame_full).all()
+
+
+def test_renderer_culling_and_lod():
+    """Test that planes outside the viewport are culled, and that the level of detail
+    drops as the view zooms out."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    GE.spawn_planes = False
+    renderer = GE.renderer
+    for x in (0, 1, 30):  # the last one off screen at the default scale
+        GE.spawn_plane(spawn_position=Vector2(x, 0))
+
+    GE.draw()
+    assert renderer.planes_drawn == 2
+    assert renderer.get_lod() == "FULL"
+
+    GE.origin[0] += 1000  # pan everything off screen
+    GE.draw()
+    assert renderer.planes_drawn == 0
+
+    GE.origin[0] -= 1000
+    GE.draw_gizmos = False
+    assert renderer.get_lod() == "GLYPH"
+    GE.screen_scale = 5  # zoom out, planes 2 px across
+    assert renderer.get_lod() == "GLYPH"
+    GE.screen_scale = 1
+    GE.draw()
+    assert renderer.get_lod() == "POINT"
+    assert renderer.planes_drawn == 3
+    LOG.info(f"Frame times: {renderer.get_frame_times()}")
+
+    assert set(renderer.get_frame_times()) == {"FULL", "POINT"}
+
+
+def test_renderer_bulk():
+    """Test that bulk mode writes every plane's marker and protected radius into the
+    pixel buffer, and that its dirty rectangle erases the previous frame."""
+    GE = game.GameEngine(screen_size=(200, 200), headless=True, fleet=True, seed=0)
+    GE.spawn_planes = False
+    GE.renderer.bulk = True
+    for _ in range(2000):
+        GE.spawn_plane(
+            spawn_position=Vector2(tuple(GE.RNG.uniform(-3.9, 3.9, size=2))),
+            spawn_heading=GE.RNG.uniform(0, 360),
+        )
+
+    time_start = time.perf_counter()
+    GE.draw()
+    time_elapsed = time.perf_counter() - time_start
+    LOG.info(f"Drew {GE.renderer.planes_drawn} planes in {time_elapsed * 1000:.1f}ms")
+
+    pixels = pygame.surfarray.array2d(GE.screen)
+    centers = np.rint(GE.vectors_to_screen(GE.get_plane_positions())).astype(int)
+    assert GE.renderer.planes_drawn == 2000
+    assert np.all(
+        pixels[centers[:, 0], centers[:, 1]] == GE.screen.map_rgb(Plane.color)
+    )
+    assert np.any(pixels == GE.screen.map_rgb(GE.renderer.gizmo_color))
+
+    for _ in range(10):
+        GE.step()
+        GE.draw()
+    frame_dirty = pygame.surfarray.array2d(GE.screen)
+    GE.renderer.invalidate()
+    GE.draw()
+
+    assert (frame_dirty == pygame.surfarray.array2d(GE.screen)).all()
@@ -0,0 +1,153 @@
+"""Tests for sequencing plane landings."""
+# stdlib
+import logging
+
+# external
+import numpy as np
+
+# project
+from aatc.game_objects import Path
+from aatc.sequencer import LandingSequencer
+
+LOG = logging.getLogger(__name__)
+
+RUNWAY_IDS = ["A", "B"]
+COORDS = np.array([[0.0, 0.0], [10.0, 0.0]])
+
+
+def test_landingsequencer_orders_by_eta():
+    """Test that planes are sequenced by ETA as their telemetry arrives, planes without
+    telemetry last, and that each plane is kept in the order once."""
+    sequencer = LandingSequencer(interval=10)
+    for plane_id in ("P0", "P1", "P2", "P3"):
+        sequencer.add(plane_id)
+    sequencer.update_frame(
+        time=0,
+        plane_ids=["P0", "P1", "P2"],
+        positions=np.array([[0.0, 3.0], [0.0, 1.0], [0.0, 2.0]]),
+        velocities=np.array([[0.0, -1.0], [0.0, -1.0], [0.0, -1.0]]),
+        runway_ids=RUNWAY_IDS,
+        coords=COORDS,
+    )
+    sequencer.allocate_slots(RUNWAY_IDS)
+
+    assert sequencer.sequence == ["P1", "P2", "P0", "P3"]
+    assert sequencer.peek() == "P1"
+    assert sequencer.etas["P1"] == {"A": 1000, "B": 1000 * np.sqrt(101)}
+
+    for i in range(1000):  # P1 turns away, P0 approaches
+        sequencer.update("P1", 0, (0, 1 + i), (0, -1), RUNWAY_IDS, COORDS)
+        sequencer.update("P0", 0, (0, 0.5), (0, -1), RUNWAY_IDS, COORDS)
+        sequencer.allocate_slots(RUNWAY_IDS)
+    sequencer.remove("P2")
+    sequencer.allocate_slots(RUNWAY_IDS)
+    LOG.info(f"Sequence: {sequencer.sequence}")
+
+    assert sequencer.sequence == ["P0", "P1", "P3"]
+    assert sequencer.peek() == "P0"
+    assert [key[2] for key in sequencer._order] == ["P0", "P1"]
+    assert len(sequencer._heap) <= 2 * len(sequencer._keys)  # stale keys pruned
+
+
+def test_landingsequencer_allocates_slots():
+    """Test that landings on a runway are at least the interval apart, that planes are
+    spread over the runways, and that planes with a flight plan keep its runway."""
+    sequencer = LandingSequencer(interval=10)
+    positions = np.array([[0.0, 1.0], [0.0, 2.0], [0.0, 3.0], [10.0, 1.0]])
+    for i in range(len(positions)):
+        sequencer.add(f"P{i}")
+    sequencer.assign("P3", "A", Path([(10, 1), (5, 0), (0, 0)]))
+    sequencer.update_frame(
+        time=0,
+        plane_ids=["P0", "P1", "P2", "P3"],
+        positions=positions,
+        velocities=np.tile([0.0, -1.0], (4, 1)),
+        runway_ids=RUNWAY_IDS,
+        coords=COORDS,
+    )
+    slots = sequencer.allocate_slots(RUNWAY_IDS)
+    LOG.info(f"Slots: {slots}, delays: {sequencer.delays}")
+
+    assert slots["P0"] == ("A", 1000)
+    assert slots["P1"][0] == "B"  # lands earlier on the far runway than after P0
+    assert slots["P2"] == ("A", 11000)  # interval after P0
+    assert slots["P3"] == ("A", 21000)  # committed, interval after P2
+    assert sequencer.etas["P3"] == {"A": 1000 * (np.sqrt(26) + 5)}
+    assert sequencer.delays["P2"] == 8
+
+    assert sequencer.allocate_slots(["B"]) is slots  # unchanged until invalidated
+    sequencer.invalidate()
+    slots = sequencer.allocate_slots(["B"])
+    assert {runway_id for runway_id, _ in slots.values()} == {"A", "B"}
+    assert slots["P3"][0] == "A"  # committed
+    assert slots["P0"][0] == "B"
+
+
+def test_landingsequencer_follows_flight_plan():
+    """Test that a plane flying along its flight plan keeps its ETA without being
+    reordered, and is reordered once it strays from it."""
+    sequencer = LandingSequencer(interval=10)
+    sequencer.add("P0")
+    sequencer.assign("P0", "A", Path([(0, 10), (0, 5), (0, 0)]))
+    for step in range(10):
+        sequencer.update("P0", step * 1000, (0, 10 - step), (0, -1), ["A"], COORDS[:1])
+        sequencer.allocate_slots(["A"])
+        if step == 0:
+            key = sequencer._keys["P0"]
+
+        assert sequencer.etas["P0"] == {"A": 10000}
+        assert sequencer._keys["P0"] is key  # not pushed again
+
+    sequencer.update("P0", 10000, (5, 1), (1, 0), ["A"], COORDS[:1])
+    assert sequencer.etas["P0"]["A"] > 10000
+    assert sequencer._keys["P0"] is not key
+
+
+def test_landingsequencer_reallocates_incrementally():
+    """Test that reallocating only the slots after the earliest change gives the same
+    slots as reallocating every slot."""
+    rng = np.random.default_rng(0)
+    sequencer = LandingSequencer(interval=10)
+    for i in range(50):
+        sequencer.add(i)
+
+    for step in range(200):
+        plane_ids = rng.choice(50, size=5, replace=False).tolist()
+        sequencer.update_frame(
+            time=step * 100,
+            plane_ids=plane_ids,
+            positions=rng.uniform(-10, 10, size=(5, 2)),
+            velocities=rng.uniform(-0.2, 0.2, size=(5, 2)),
+            runway_ids=RUNWAY_IDS,
+            coords=COORDS,
+        )
+        if step % 50 == 0:
+            sequencer.remove(plane_ids[0])
+            sequencer.add(plane_ids[0])
+        slots = dict(sequencer.allocate_slots(RUNWAY_IDS))
+        sequence = list(sequencer.sequence)
+
+        sequencer.invalidate()
+        assert sequencer.allocate_slots(RUNWAY_IDS) == slots
+        assert sequencer.sequence == sequence
+
+
+def test_landingsequencer_stationary_plane():
+    """Test that a stationary plane gets a finite ETA, immediate at the runway."""
+    sequencer = LandingSequencer()
+    sequencer.add("P0")
+    sequencer.add("P1")
+    sequencer.update_frame(
+        time=0,
+        plane_ids=["P0", "P1"],
+        positions=COORDS[:1].repeat(2, axis=0) + [[0, 0], [0, 1]],
+        velocities=np.zeros((2, 2)),
+        runway_ids=RUNWAY_IDS,
+        coords=COORDS,
+    )
+    slots = sequencer.allocate_slots(RUNWAY_IDS)
+
+    assert sequencer.etas["P0"]["A"] == 0
+    assert np.isfinite(sequencer.etas["P1"]["A"])
+    assert sequencer.sequence == ["P0", "P1"]
+    assert slots["P0"] == ("A", 0)
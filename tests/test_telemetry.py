@@ -0,0 +1,186 @@
+"""Tests for telemetry transport and storage."""
+# stdlib
+import logging
+
+# external
+import numpy as np
+import pygame
+import pytest
+from pygame.math import Vector2
+
+# project
+from aatc import game
+from aatc.fleet import STATUS_CODES, Fleet
+from aatc.game_objects import Plane
+from aatc.telemetry import (
+    TelemetryFrame,
+    TelemetryLog,
+    TelemetryRecorder,
+    TelemetryTable,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+def test_fleet_poll_transmit_matches_plane():
+    """Test that the fleet's batched transmit schedule matches the per-plane one."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    fleet = Fleet()
+
+    plane_loose = Plane(0, Vector2(0, 0), 0, GE.events)
+    plane_fleet = Plane(0, Vector2(0, 0), 0, GE.events)
+    plane_fleet.attach(fleet)
+    for plane in (plane_loose, plane_fleet):
+        plane.transmit = True
+        plane.transmit_frequency = 4  # Hz
+
+    times_loose, times_fleet = [], []
+    for time in np.arange(0, 2000, 1000 / 60):
+        if plane_loose.poll_transmit(time):
+            times_loose.append(time)
+        if len(fleet.poll_transmit(time)):
+            times_fleet.append(time)
+    LOG.info(f"Transmit times: {times_fleet}")
+
+    assert times_loose == times_fleet
+    assert len(times_fleet) == 7
+
+
+def test_gameengine_transmit_telemetry_frame():
+    """Test that one telemetry frame carries every plane due to transmit."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True, fleet=True)
+    GE.spawn_planes = False
+    for _ in range(5):
+        GE.spawn_plane()
+    for plane in GE.planes[:3]:
+        plane.transmit = True
+
+    pygame.event.get()
+    GE.time = 1000  # msec
+    GE.transmit_telemetry_frame()
+    events = pygame.event.get(GE.events["TELEMETRYFRAME"])
+
+    assert len(events) == 1
+    frame = events[0].frame
+    assert frame.plane_ids.tolist() == [plane.id for plane in GE.planes[:3]]
+    assert frame.positions.shape == (3, 2)
+    assert tuple(frame.positions[0]) == tuple(GE.planes[0].position)
+
+    GE.transmit_telemetry_frame()  # not due again yet
+    assert not pygame.event.get(GE.events["TELEMETRYFRAME"])
+
+
+def test_telemetrytable_update_frame():
+    """Test ingesting a telemetry frame into the telemetry table."""
+    table = TelemetryTable(capacity=2)
+    for plane_id, callsign in enumerate(("A", "B", "C")):
+        table.add(plane_id, callsign=callsign)
+
+    frame = TelemetryFrame(
+        time=0,
+        plane_ids=np.array([2, 0]),
+        positions=np.array([(1.0, 2.0), (3.0, 4.0)]),
+        velocities=np.array([(0.1, 0.0), (0.0, 0.1)]),
+        statuses=np.array([STATUS_CODES["HOLDING"], STATUS_CODES["CRUISING"]]),
+    )
+    table.update_frame(frame)
+    LOG.info(f"Telemetry table: {table}")
+
+    assert table[2]["position"] == Vector2(1, 2)
+    assert table[2]["status"] == "HOLDING"
+    assert table[0]["velocity"] == Vector2(0, 0.1)
+    assert table[1]["position"] is None
+    assert table.callsigns[2] == "C"
+
+    plane_ids, positions, _ = table.get_tracked()
+    assert plane_ids == [0, 2]
+    assert positions.tolist() == [[3, 4], [1, 2]]
+
+
+def test_telemetrytable_get_history():
+    """Test that the history ring buffer returns the latest samples in order."""
+    table = TelemetryTable(history=4)
+    table.add(0)
+
+    times, _, _ = table.get_history(0)
+    assert len(times) == 0
+
+    for time in range(6):
+        table.update(
+            0, time=time, position=(time, 0), velocity=(1, 0), status="CRUISING"
+        )
+
+    times, positions, _ = table.get_history(0)
+    LOG.info(f"History times: {times}")
+
+    assert times.tolist() == [2, 3, 4, 5]
+    assert positions[:, 0].tolist() == [2, 3, 4, 5]
+    assert np.shares_memory(times, table.history_times)
+
+
+def test_telemetrytable_ignores_disconnected():
+    """Test that late telemetry of disconnected or unknown planes is ignored, and that
+    their history cannot be read."""
+    table = TelemetryTable(capacity=2, history=4)
+    table.add(0)
+    table.add(1)
+    table.remove(1)
+
+    assert table.update(0, time=0, position=(1, 0), velocity=(1, 0), status="CRUISING")
+    assert not table.update(
+        1, time=0, position=(1, 0), velocity=(1, 0), status="CRUISING"
+    )
+    assert not table.update(
+        7, time=0, position=(1, 0), velocity=(1, 0), status="CRUISING"
+    )
+    assert not table.received[1]
+
+    frame = table.update_frame(
+        TelemetryFrame(
+            time=100,
+            plane_ids=np.array([1, 0, 7]),
+            positions=np.array([(1.0, 2.0), (3.0, 4.0), (5.0, 6.0)]),
+            velocities=np.zeros((3, 2)),
+            statuses=np.full(3, STATUS_CODES["CRUISING"]),
+        )
+    )
+
+    assert frame.plane_ids.tolist() == [0]
+    assert frame.positions.tolist() == [[3, 4]]
+    assert table.get_tracked()[0] == [0]
+    assert table[0]["position"] == Vector2(3, 4)
+    for plane_id in (1, 7):
+        with pytest.raises(KeyError):
+            table.get_history(plane_id)
+
+
+def test_telemetryrecorder(tmp_path):
+    """Test recording telemetry from a headless simulation and querying it back."""
+    path = tmp_path / "telemetry.bin"
+    GE = game.GameEngine(
+        screen_size=(100, 100), headless=True, fleet=True, record_telemetry=path
+    )
+    GE.atc.recorder = TelemetryRecorder(path, chunk=64)  # exercise file growth
+    GE.simulate(duration=30)  # sec
+
+    log = TelemetryLog(path)  # readable before the recorder is closed
+    LOG.info(f"Recorded {len(log)} telemetry samples")
+    assert len(log) == GE.atc.recorder.count > 64
+
+    GE.close()
+    GE.close()  # already closed
+    log = TelemetryLog(path)
+    assert len(log) == GE.atc.recorder.count
+    assert path.stat().st_size == (
+        TelemetryRecorder.HEADER_DTYPE.itemsize
+        + len(log) * TelemetryRecorder.RECORD_DTYPE.itemsize
+    )  # trimmed
+
+    records = log.get_between(10000, 20000)
+    assert np.all((records["time"] >= 10000) & (records["time"] < 20000))
+    assert np.shares_memory(records, log.records)
+
+    plane = GE.planes[0]
+    records = log.get_plane(plane.callsign)
+    assert np.all(records["plane_id"] == plane.callsign.encode())
+    assert np.all(np.diff(records["time"]) > 0)
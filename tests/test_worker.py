@@ -0,0 +1,93 @@
+"""Tests for running the controller on a worker thread."""
+# stdlib
+import logging
+import threading
+import time
+
+# external
+import pygame
+
+# project
+from aatc import game
+from aatc.worker import ControllerWorker
+
+LOG = logging.getLogger(__name__)
+
+
+def test_controllerworker_back_pressure():
+    """Test that a full inbox drops droppable calls, holds back the others in order,
+    and that the controller's commands are only posted when polled."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    worker = ControllerWorker(GE.atc, maxsize=2)  # not started, the inbox fills up
+
+    for i in range(4):
+        assert worker.submit("add_plane", i, f"P{i}")
+    assert not worker.submit("update", 0, droppable=True)
+    metrics = worker.get_metrics()
+    LOG.info(f"Metrics while full: {metrics}")
+
+    assert metrics["inbox_length"] == 2
+    assert metrics["pending"] == 2
+    assert metrics["dropped"] == {"update": 1}
+
+    pygame.event.clear()
+    worker.start()
+    worker.stop()
+    GE.atc.dispatch_flight_plans()  # allocates the slots
+    assert list(GE.atc.queue) == [0, 1, 2, 3]
+    assert pygame.event.get(GE.events["CONNECTIONCONFIRMATION"]) == []
+
+    worker.poll()
+    events = pygame.event.get(GE.events["CONNECTIONCONFIRMATION"])
+    metrics = worker.get_metrics()
+    LOG.info(f"Metrics when stopped: {metrics}")
+
+    assert [event.plane_id for event in events] == [0, 1, 2, 3]
+    assert metrics["processed"] == 4
+    assert metrics["published"] == 4
+    assert metrics["latency_p50"] <= metrics["latency_max"]
+
+
+def test_controllerworker_stop_timeout():
+    """Test that stopping a worker stuck in a controller call gives up at the
+    deadline, and that the thread exits once the call returns."""
+    GE = game.GameEngine(screen_size=(100, 100), headless=True)
+    worker = ControllerWorker(GE.atc, maxsize=2)
+    release = threading.Event()
+    GE.atc.wedge = release.wait  # a call which never returns on its own
+
+    worker.start()
+    worker.submit("wedge")
+    for i in range(4):
+        worker.submit("add_plane", i)  # fills the inbox and holds back the rest
+
+    time_start = time.monotonic()
+    assert not worker.stop(timeout=0.2)
+    time_elapsed = time.monotonic() - time_start
+    LOG.info(f"Gave up stopping after {time_elapsed:.3f}sec")
+
+    assert time_elapsed < 0.5
+    release.set()
+    worker._thread.join(timeout=1)
+    assert not worker._thread.is_alive()
+    assert worker.processed == 1  # the calls submitted after the wedge are abandoned
+
+
+def test_gameengine_controller_thread():
+    """Test that planes are connected, planned and landed with the controller on a
+    worker thread."""
+    GE = game.GameEngine(
+        screen_size=(100, 100),
+        headless=True,
+        fleet=True,
+        seed=3,
+        controller_thread=True,
+    )
+    GE.spawn_planes_interval_avg = 1  # sec
+    GE.simulate(duration=240)  # sec
+    GE.close()
+    LOG.info(f"Metrics: {GE.atc_worker.get_metrics()}")
+
+    assert GE.planes_landed > 0
+    assert GE.atc_worker.errors == 0
+    assert set(GE.atc.flight_plans) <= {plane.id for plane in GE.planes}